@@ -0,0 +1,179 @@
+import logging
+import sys
+import tkinter as tk
+from tkinter import ttk
+from types import ModuleType
+from typing import Any
+
+
+class Config:
+    """
+    In-memory stand-in for the EDMC config object.
+    """
+
+    def __init__(self, app_dir: str, settings: dict[str, Any] | None = None):
+        self.app_dir_path = app_dir
+        self.plugin_dir_path = app_dir
+        self.internal_plugin_dir_path = app_dir
+        self.default_journal_dir = app_dir
+        self.shutting_down = False
+        self._settings: dict[str, Any] = {'journaldir': app_dir, 'language': 'en'}
+        self._settings.update(settings or {})
+
+    def get_str(self, key: str, default: str | None = None) -> str | None:
+        return str(self._settings[key]) if key in self._settings else default
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        return int(self._settings.get(key, default))
+
+    def get_bool(self, key: str, default: bool | None = None) -> bool | None:
+        return bool(self._settings[key]) if key in self._settings else default
+
+    def get_list(self, key: str, default: list | None = None) -> list | None:
+        return list(self._settings[key]) if key in self._settings else default
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._settings.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        self._settings[key] = value
+
+    def delete(self, key: str, suppress: bool = False) -> None:
+        self._settings.pop(key, None)
+
+
+class Monitor:
+    """
+    Stand-in for the EDMC journal monitor. The replay harness keeps the state in step with the replayed events.
+    """
+
+    def __init__(self):
+        self.cmdr: str | None = None
+        self.is_beta = False
+        self.mode = 'Solo'
+        self.state: dict[str, Any] = {
+            'ShipID': None,
+            'ShipName': None,
+            'ShipType': None,
+            'SystemName': None,
+            'SystemAddress': None,
+            'StarPos': None,
+            'StationName': None,
+            'SuitCurrent': None,
+        }
+
+    def game_running(self) -> bool:
+        return True
+
+    def update(self, entry: dict[str, Any]) -> None:
+        """
+        Track the parts of the EDMC state used by the plugins.
+
+        :param entry: The journal entry being replayed
+        """
+
+        match entry['event']:
+            case 'Commander' | 'NewCommander':
+                self.cmdr = entry['Name']
+            case 'LoadGame':
+                self.cmdr = entry['Commander']
+                self.state['ShipID'] = entry.get('ShipID')
+                self.state['ShipName'] = entry.get('ShipName')
+                self.state['ShipType'] = entry.get('Ship', '').lower() or None
+            case 'Location' | 'FSDJump' | 'CarrierJump':
+                self.state['SystemName'] = entry['StarSystem']
+                self.state['SystemAddress'] = entry.get('SystemAddress')
+                self.state['StarPos'] = tuple(entry['StarPos'])
+                self.state['StationName'] = entry.get('StationName')
+            case 'Docked':
+                self.state['StationName'] = entry['StationName']
+            case 'Undocked':
+                self.state['StationName'] = None
+            case 'SuitLoadout':
+                self.state['SuitCurrent'] = {'name': entry['SuitName'], 'suitid': entry['SuitID']}
+
+
+class Theme:
+    """ Stand-in for the EDMC theme manager. Every method is a no-op. """
+
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args, **kwargs: None
+
+
+class Translations:
+    """ Stand-in for the EDMC translation API. Returns the untranslated string. """
+
+    @staticmethod
+    def tl(text: str, context: str | None = None, lang: str | None = None) -> str:
+        return text
+
+    translate = tl
+
+
+class Overlay:
+    """
+    Stand-in for the edmcoverlay client, recording every message sent. Exposes a connection attribute so BioScan
+    treats it as EDMCOverlay.
+    """
+
+    sent: int = 0
+
+    def __init__(self):
+        self.connection = None
+
+    def connect(self) -> None:
+        pass
+
+    def send_message(self, msgid: str, text: str, color: str, x: int, y: int, ttl: int = 4,
+                     size: str = 'normal') -> None:
+        Overlay.sent += 1
+
+    def send_raw(self, msg: dict[str, Any]) -> None:
+        Overlay.sent += 1
+
+    def send_shape(self, shapeid: str, shape: str, color: str, fill: str, x: int, y: int, w: int, h: int,
+                   ttl: int) -> None:
+        Overlay.sent += 1
+
+
+class HyperlinkLabel(ttk.Label):
+    """ Stand-in for the EDMC hyperlink label widget """
+
+    def __init__(self, master: tk.Misc | None = None, **kw: Any):
+        kw.pop('url', None)
+        kw.pop('popup_copy', None)
+        super().__init__(master, **kw)
+
+
+def _module(name: str, **attributes: Any) -> ModuleType:
+    module = ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def install(app_dir: str, settings: dict[str, Any] | None = None) -> tuple[Config, Monitor]:
+    """
+    Install the EDMC module stubs needed to import the plugins outside of EDMC. Must run before either plugin is
+    imported.
+
+    :param app_dir: Directory for the ExploData database and EDMC paths
+    :param settings: Initial config values
+    :return: The config and monitor stubs
+    """
+
+    config = Config(app_dir, settings)
+    monitor = Monitor()
+    _module('config', config=config, appname='EDMarketConnector', appversion=lambda: '5.12.0')
+    _module('monitor', monitor=monitor)
+    _module('theme', theme=Theme())
+    _module('l10n', translations=Translations(), Translations=Translations)
+    _module('EDMCLogging', get_plugin_logger=lambda name, *args: logging.getLogger(name),
+            get_main_logger=lambda *args: logging.getLogger('EDMarketConnector'))
+    _module('edmc_data', ship_name_map={})
+    _module('ttkHyperlinkLabel', HyperlinkLabel=HyperlinkLabel)
+    notebook = _module('myNotebook')
+    notebook.__getattr__ = lambda name: getattr(ttk, name)
+    overlay = _module('edmcoverlay.edmcoverlay', Overlay=Overlay)
+    _module('edmcoverlay', edmcoverlay=overlay, __path__=[])
+    return config, monitor
@@ -0,0 +1,341 @@
+import argparse
+import importlib
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Any, Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import bio_scan.bio_data.vectorized as vectorized  # noqa: E402
+import bio_scan.predict as predict  # noqa: E402
+from bio_scan.bio_data.regions import guardian_nebulae, tuber_zones  # noqa: E402
+from bio_scan.bio_data.species import rules as bio_types  # noqa: E402
+from bio_scan.body_data.star_class import STAR_CLASSES  # noqa: E402
+from bio_scan.nebula_data.reference_stars import coordinates as nebula_coordinates, planetary_coordinates  # noqa: E402
+from bio_scan.nebula_data.sectors import data as nebula_sectors  # noqa: E402
+from bio_scan.predict import BodyRecord, StarRecord, SystemRecord  # noqa: E402
+from reference import ReferenceSystem, reference_species  # noqa: E402
+
+GRAVITY_UNIT = 9.797759
+PRESSURE_UNIT = 101231.656250
+REGIONS = range(1, 43)
+STAR_TYPES = (*STAR_CLASSES, 'A_BlueWhiteSuperGiant', 'K_OrangeGiant', 'M_RedGiant', 'M_RedSuperGiant', 'DA', 'DB',
+              'DC', 'WN', 'WC', 'CN', 'CJ')
+LUMINOSITIES = ('I', 'II', 'III', 'IV', 'V', 'Va', 'Vab', 'Vb', 'Vz', 'VI', 'VII')
+# Values never named by a ruleset, so the "other" paths are covered too
+EXTRA_ATMOSPHERES = ('', 'EarthLike', 'SulphurDioxideRich')
+EXTRA_BODY_TYPES = ('Earthlike body', 'Water world', 'Ammonia world')
+EXTRA_VOLCANISM = ('', 'minor water magma volcanism', 'major silicate vapour geysers volcanism')
+
+Corpus = list[tuple[SystemRecord, dict[str, StarRecord], dict[str, BodyRecord]]]
+Evaluator = Callable[..., dict[str, dict[str, list[tuple[str, list[str]]]]]]
+
+
+def vocabulary() -> tuple[list[str], list[str], list[str]]:
+    """
+    Collect every atmosphere, body type and volcanism value referenced by the rulesets.
+
+    :return: Atmospheres, body types, and journal volcanism strings
+    """
+
+    atmospheres: set[str] = {'None', *EXTRA_ATMOSPHERES}
+    body_types: set[str] = set(EXTRA_BODY_TYPES)
+    volcanism: set[str] = set(EXTRA_VOLCANISM)
+    for species_data in bio_types.values():
+        for data in species_data.values():
+            for ruleset in data['rulesets']:
+                if isinstance(ruleset.get('atmosphere'), list):
+                    atmospheres.update(ruleset['atmosphere'])
+                body_types.update(ruleset.get('body_type', []))
+                values = ruleset.get('volcanism', [])
+                for value in values if isinstance(values, list) else [values]:
+                    value = value.lstrip('=!')
+                    if value in ('Any', 'None'):
+                        continue
+                    volcanism.add(value if value.endswith('volcanism') else f'{value} volcanism')
+                    volcanism.add(f'minor {value} volcanism' if not value.startswith('major') else value)
+    return sorted(atmospheres), sorted(body_types), sorted(volcanism)
+
+
+def _locations(rng: random.Random) -> list[tuple[str, tuple[float, float, float], int | None]]:
+    """
+    Build the system locations: every galactic region, near large and planetary nebulae, nebula sectors, guardian
+    and tuber zones, and a system without coordinates.
+    """
+
+    def near(point: tuple[float, float, float], distance: float) -> tuple[float, float, float]:
+        return tuple(axis + rng.uniform(-distance, distance) for axis in point)
+
+    locations: list[tuple[str, tuple[float, float, float], int | None]] = [
+        (f'Region {region} AA-A d1', (rng.uniform(-40000, 40000), rng.uniform(-1000, 1000),
+                                             rng.uniform(-20000, 65000)), region)
+        for region in REGIONS
+    ]
+    for name, point in rng.sample(sorted(nebula_coordinates.items()), 20):
+        locations.append((f'{name} Near AB-C d1', near(point, 80), rng.choice(REGIONS)))
+    for name, point in rng.sample(sorted(planetary_coordinates.items()), 20):
+        locations.append((f'{name} Near AB-C d2', near(point, 60), rng.choice(REGIONS)))
+    for sector in rng.sample(nebula_sectors, 10):
+        locations.append((f'{sector} AB-C d3', (rng.uniform(-5000, 5000), 0.0, rng.uniform(0, 30000)),
+                          rng.choice(REGIONS)))
+    for _, (max_distance, point) in guardian_nebulae.items():
+        locations.append(('Guardian Zone AB-C d4', near(point, max_distance / 2), rng.choice(REGIONS)))
+    for _, ((min_distance, max_distance), point) in tuber_zones.items():
+        locations.append(('Tuber Zone AB-C d5', near(point, max_distance * 0.6), rng.choice(REGIONS)))
+    locations.append(('Unknown Location', (0.0, 0.0, 0.0), None))
+    return locations
+
+
+def _stars(rng: random.Random, system_name: str) -> tuple[dict[str, StarRecord], list[str]]:
+    """
+    Build the stars of a system. Some systems have a single star named for the system, some have a black hole
+    primary, and some have a barycentre.
+    """
+
+    layout = rng.random()
+    if layout < 0.3:
+        star_type = rng.choice(STAR_TYPES)
+        return {system_name: StarRecord(system_name, star_type, rng.choice(LUMINOSITIES), 0.0)}, [system_name]
+    names = ['A', 'B', 'C'][:rng.randint(2, 3)]
+    stars = {name: StarRecord(name, rng.choice(STAR_TYPES), rng.choice(LUMINOSITIES),
+                              0.0 if index == 0 else rng.uniform(10.0, 200000.0))
+             for index, name in enumerate(names)}
+    if layout < 0.5:
+        stars['A'].type = 'H'
+    parents = names + ['AB 1', 'B 1'] if layout > 0.8 else names
+    if 'B 1' in parents:
+        stars['B 1'] = StarRecord('B 1', rng.choice(STAR_TYPES), rng.choice(LUMINOSITIES), rng.uniform(10.0, 5000.0))
+    return stars, parents
+
+
+def _numeric(rng: random.Random, ruleset: dict[str, Any], key: str, low: float, high: float) -> float:
+    """ Sample within a ruleset's bounds, spilling 10% past them to hit both sides of each edge """
+
+    minimum = ruleset.get(f'min_{key}', low)
+    maximum = ruleset.get(f'max_{key}', high)
+    spread = (maximum - minimum) * 0.1
+    return rng.uniform(max(low, minimum - spread), maximum + spread)
+
+
+def build_corpus(seed: int = 1, bodies_per_system: int = 8, scale: int = 1) -> Corpus:
+    """
+    Generate a reproducible corpus of systems. Every combination of ruleset atmosphere, body type and volcanism is
+    placed on a planet, spread over systems across every galactic region and near nebulae. Numeric properties are
+    sampled around the bounds of a ruleset allowing the planet's atmosphere and body type, when there is one.
+
+    :param seed: Random seed
+    :param bodies_per_system: Planets per system
+    :param scale: Number of times to repeat every combination
+    :return: List of system, stars, and planets
+    """
+
+    rng = random.Random(seed)
+    atmospheres, body_types, volcanism = vocabulary()
+    rulesets = [ruleset for species_data in bio_types.values() for data in species_data.values()
+                for ruleset in data['rulesets']]
+    combinations = list(itertools.product(atmospheres, body_types, volcanism)) * scale
+    rng.shuffle(combinations)
+    locations = _locations(rng)
+    materials = ('antimony', 'polonium', 'ruthenium', 'tellurium', 'technetium', 'yttrium', 'cadmium', 'mercury',
+                 'molybdenum', 'niobium', 'tin', 'tungsten')
+
+    corpus: Corpus = []
+    for number, start in enumerate(range(0, len(combinations), bodies_per_system)):
+        name, location, region = locations[number % len(locations)]
+        system = SystemRecord(f'{name} {number}', *location, region)
+        stars, parents = _stars(rng, system.name)
+        planets: dict[str, BodyRecord] = {}
+        for index, (atmosphere, body_type, volcanism_type) in enumerate(combinations[start:start + bodies_per_system]):
+            matching = [ruleset for ruleset in rulesets
+                        if atmosphere in ruleset.get('atmosphere', [atmosphere])
+                        and body_type in ruleset.get('body_type', [body_type])]
+            ruleset = rng.choice(matching) if matching else {}
+            parent = rng.choice(parents)
+            body_name = f'{parent} {index + 1}' if parent != system.name else f'{index + 1}'
+            planets[body_name] = BodyRecord(
+                body_name, body_type, atmosphere,
+                {gas: rng.uniform(0.0, 100.0) for gas in ('SulphurDioxide', 'CarbonDioxide', 'Methane')},
+                _numeric(rng, ruleset, 'gravity', 0.01, 1.5) * GRAVITY_UNIT,
+                _numeric(rng, ruleset, 'temperature', 20.0, 1000.0) if rng.random() > 0.05 else 0.0,
+                _numeric(rng, ruleset, 'pressure', 0.0, 0.2) * PRESSURE_UNIT if atmosphere not in ('', 'None')
+                else 0.0,
+                rng.uniform(0.0, ruleset.get('max_orbital_period', 2.0e7) * 1.2), volcanism_type,
+                [part for part in parent.split(' ')[0]] if parent != system.name else [system.name],
+                ruleset.get('distance', 0.0) * rng.uniform(0.5, 1.5) + rng.uniform(0.0, 5000.0),
+                rng.sample(materials, 4)
+            )
+        corpus.append((system, stars, planets))
+    return corpus
+
+
+def time_evaluator(corpus: Corpus) -> dict[str, Any]:
+    """
+    Time the species evaluator per genus. Each system gets a fresh context and body filter, and every planet and
+    genus is evaluated once cold (system facts, body filter and color stars computed on first use) and once warm
+    (all of these memoized). The warm pass is the cost of a cache refresh in the plugin.
+
+    :param corpus: The corpus
+    :return: Timings in microseconds per body
+    """
+
+    cold: dict[str, int] = dict.fromkeys(bio_types, 0)
+    warm: dict[str, int] = dict.fromkeys(bio_types, 0)
+    matches: dict[str, int] = dict.fromkeys(bio_types, 0)
+    filter_time = 0
+    bodies = 0
+    for system, stars, planets in corpus:
+        start = time.perf_counter_ns()
+        ctx = predict.system_context(system, stars, planets)
+        filters, residual_rules = predict.body_filters(planets)
+        filter_time += time.perf_counter_ns() - start
+        bodies += len(planets)
+        for timings in (cold, warm):
+            for name, body in planets.items():
+                for genus in bio_types:
+                    start = time.perf_counter_ns()
+                    species = predict.possible_species(body, genus, ctx, filters[name].get(genus, ()), residual_rules)
+                    timings[genus] += time.perf_counter_ns() - start
+                    if timings is cold and species:
+                        matches[genus] += 1
+
+    def per_body(total: int) -> float:
+        return round(total / bodies / 1000, 3) if bodies else 0.0
+
+    return {
+        'filter_us': per_body(filter_time),
+        'all_genera_cold_us': per_body(sum(cold.values()) + filter_time),
+        'all_genera_warm_us': per_body(sum(warm.values())),
+        'genera': {
+            genus: {
+                'name': genus.removeprefix('$Codex_Ent_').removesuffix('_Name;'),
+                'cold_us': per_body(cold[genus]),
+                'warm_us': per_body(warm[genus]),
+                'bodies_with_species': matches[genus],
+            } for genus in bio_types
+        },
+    }
+
+
+def diff_evaluator(corpus: Corpus, evaluate: Evaluator, limit: int = 20) -> list[dict[str, Any]]:
+    """
+    Diff an evaluator against the reference interpreter, body by body and genus by genus.
+
+    :param corpus: The corpus
+    :param evaluate: Evaluator with the signature of bio_scan.predict.predict_system
+    :param limit: Maximum number of mismatches to return
+    :return: The mismatches, with the system, body and both results
+    """
+
+    mismatches: list[dict[str, Any]] = []
+    for system, stars, planets in corpus:
+        results = evaluate(system, stars, planets)
+        ref = ReferenceSystem(system, stars, planets)
+        for name, body in planets.items():
+            for genus in bio_types:
+                expected = reference_species(body, genus, ref)
+                actual = [(species, list(colors)) for species, colors in results.get(name, {}).get(genus, [])]
+                if expected != actual:
+                    mismatches.append({
+                        'system': system.name, 'region': system.region, 'body': name, 'genus': genus,
+                        'expected': expected, 'actual': actual,
+                        'planet': {slot: getattr(body, slot) for slot in BodyRecord.__slots__ if slot != 'materials'},
+                    })
+                    if len(mismatches) >= limit:
+                        return mismatches
+    return mismatches
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """
+    Compare timings against a saved baseline.
+
+    :param results: The current timings
+    :param baseline: The saved timings
+    :param tolerance: Allowed slowdown, as a fraction
+    :return: Descriptions of the timings which regressed
+    """
+
+    regressions: list[str] = []
+    pairs = [(key, results[key], baseline.get(key)) for key in ('filter_us', 'all_genera_cold_us',
+                                                                  'all_genera_warm_us')]
+    for genus, timings in results['genera'].items():
+        for key in ('cold_us', 'warm_us'):
+            pairs.append((f'{timings["name"]} {key}', timings[key], baseline.get('genera', {}).get(genus, {}).get(key)))
+    for label, current, previous in pairs:
+        if previous:
+            ratio = current / previous
+            print(f'{label:<30}{previous:>10.3f}{current:>10.3f}{ratio:>8.2f}x')
+            if ratio > 1 + tolerance:
+                regressions.append(label)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Time the species evaluator per genus over a synthetic corpus covering every ruleset '
+                    'atmosphere, body type and volcanism in every galactic region, and diff it against the reference '
+                    'interpreter.'
+    )
+    parser.add_argument('--seed', type=int, default=1, help='corpus seed')
+    parser.add_argument('--scale', type=int, default=1, help='repeat every corpus combination this many times')
+    parser.add_argument('--no-numpy', action='store_true', help='use the prefilter indexes instead of NumPy')
+    parser.add_argument('--output', metavar='FILE', help='write the timings as a JSON baseline')
+    parser.add_argument('--baseline', metavar='FILE', help='compare the timings with a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown against the baseline, as a fraction (default 0.2)')
+    parser.add_argument('--check', action='store_true', help='diff the evaluator against the reference interpreter')
+    parser.add_argument('--evaluator', default='bio_scan.predict:predict_system',
+                        help='evaluator to diff, as module:function with the signature of predict_system')
+    args = parser.parse_args(argv)
+
+    if args.no_numpy:
+        vectorized.np = None
+    corpus = build_corpus(args.seed, scale=args.scale)
+    body_count = sum(len(planets) for _, _, planets in corpus)
+    print(f'Corpus: {len(corpus)} systems, {body_count} bodies, NumPy: {vectorized.available()}, '
+          f'colors: {bool(predict.bio_genus)}')
+
+    status = 0
+    if args.check:
+        module, function = args.evaluator.split(':')
+        mismatches = diff_evaluator(corpus, getattr(importlib.import_module(module), function))
+        for mismatch in mismatches:
+            print(json.dumps(mismatch))
+        print(f'Reference check: {"FAILED" if mismatches else "passed"}')
+        status = 1 if mismatches else 0
+
+    results = time_evaluator(corpus)
+    results['corpus'] = {'seed': args.seed, 'scale': args.scale, 'systems': len(corpus), 'bodies': body_count}
+    results['environment'] = {'python': platform.python_version(), 'numpy': vectorized.available(),
+                              'colors': bool(predict.bio_genus)}
+    print(f'{"genus":<24}{"cold us":>10}{"warm us":>10}{"matches":>9}')
+    for timings in results['genera'].values():
+        print(f'{timings["name"]:<24}{timings["cold_us"]:>10.3f}{timings["warm_us"]:>10.3f}'
+              f'{timings["bodies_with_species"]:>9}')
+    print(f'Per body: filter {results["filter_us"]:.3f} us, all genera cold {results["all_genera_cold_us"]:.3f} us, '
+          f'warm {results["all_genera_warm_us"]:.3f} us')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as target:
+            json.dump(results, target, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as source:
+            baseline = json.load(source)
+        for key in ('corpus', 'environment'):
+            if baseline.get(key) != results[key]:
+                print(f'Warning: baseline {key} differs: {baseline.get(key)}')
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f'Regressions: {", ".join(regressions)}')
+            status = status or 2
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
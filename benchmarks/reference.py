@@ -0,0 +1,215 @@
+import math
+from typing import Any, Mapping
+
+from bio_scan.bio_data.regions import guardian_nebulae, region_map, tuber_zones
+from bio_scan.bio_data.species import rules as bio_types
+from bio_scan.body_data.star_class import star_check
+from bio_scan.nebula_data.reference_stars import nebulae_sort
+from bio_scan.nebula_data.sectors import data as nebula_sectors
+from bio_scan.predict import bio_genus
+
+
+class ReferenceSystem:
+    """
+    System state for the reference interpreter, matching the plugin globals the original value_estimate read.
+    """
+
+    def __init__(self, system: Any, stars: Mapping[str, Any], planets: Mapping[str, Any], main_star_name: str = ''):
+        self.system = system
+        self.stars = stars
+        self.planets = planets
+        if not main_star_name:
+            main_star_name = next((name for name, star in stars.items() if not star.get_distance()), '')
+        self.main_star_name = main_star_name
+        main_star = stars.get(main_star_name)
+        self.main_star_type = main_star.get_type() if main_star else ''
+        self.main_star_luminosity = main_star.get_luminosity() if main_star else ''
+
+
+def _eliminated(rule_type: str, value: Any, body: Any, ref: ReferenceSystem) -> bool:
+    """
+    Interpret a single rule the way the original value_estimate did, straight from the ruleset data.
+    """
+
+    system = ref.system
+    match rule_type:
+        case 'atmosphere':
+            if value == 'Any':
+                return body.get_atmosphere() in ['', 'None']
+            return body.get_atmosphere() not in value
+        case 'atmosphere_component':
+            return any(body.get_gas(gas) < percent for gas, percent in value.items())
+        case 'max_gravity':
+            return body.get_gravity() / 9.797759 > value
+        case 'min_gravity':
+            return body.get_gravity() / 9.797759 < value
+        case 'max_temperature':
+            return bool(body.get_temp()) and body.get_temp() > value
+        case 'min_temperature':
+            return bool(body.get_temp()) and body.get_temp() < value
+        case 'min_pressure':
+            return bool(body.get_pressure()) and body.get_pressure() / 101231.656250 < value
+        case 'max_pressure':
+            return bool(body.get_pressure()) and body.get_pressure() / 101231.656250 >= value
+        case 'max_orbital_period':
+            return body.get_orbital_period() >= value
+        case 'volcanism':
+            if isinstance(value, list):
+                for volc_type in value:
+                    if volc_type.startswith('='):
+                        if body.get_volcanism() == volc_type[1:]:
+                            return False
+                    elif body.get_volcanism().find(volc_type) != -1:
+                        return False
+                return True
+            if value == 'Any':
+                return body.get_volcanism() == ''
+            if value == 'None':
+                return body.get_volcanism() != ''
+            if value.startswith('!'):  # 'not' values assume there must be some volcanism
+                return body.get_volcanism().find(value[1:]) != -1 or body.get_volcanism() == ''
+            return False
+        case 'body_type':
+            return body.get_type() not in value
+        case 'regions':
+            if system.region is None:
+                return False
+            for region in value:
+                if region.startswith('!') and system.region in region_map[region[1:]]:
+                    return True
+            positives = [region for region in value if not region.startswith('!')]
+            return bool(positives) and not any(system.region in region_map[region] for region in positives)
+        case 'guardian':
+            location = (system.x, system.y, system.z)
+            return value and not any(math.dist(location, coordinates) < max_distance
+                                     for max_distance, coordinates in guardian_nebulae.values())
+        case 'tuber':
+            location = (system.x, system.y, system.z)
+            for zone, ((min_distance, max_distance), coordinates) in tuber_zones.items():
+                if (value == 'Any' or zone in value) and \
+                        min_distance <= math.dist(location, coordinates) <= max_distance:
+                    return False
+            return True
+        case 'bodies':
+            return not any(planet.get_type() in value for planet in ref.planets.values())
+        case 'main_star':
+            for star_info in (value if isinstance(value, list) else [value]):
+                if isinstance(star_info, tuple):
+                    if star_check(star_info[0], ref.main_star_type) and any(
+                            star_info[1] + flag == ref.main_star_luminosity for flag in ['', 'a', 'b', 'ab', 'z']):
+                        return False
+                elif star_check(star_info, ref.main_star_type):
+                    return False
+            return True
+        case 'parent_star':
+            if any(star_check(star_type, ref.main_star_type) for star_type in value):
+                return False
+            for star in body.get_parent_stars():
+                if star in ref.stars and any(star_check(star_type, ref.stars[star].get_type()) for star_type in value):
+                    return False
+            return True
+        case 'star':
+            for star in ref.stars.values():
+                for star_info in (value if isinstance(value, list) else [value]):
+                    if isinstance(star_info, tuple):
+                        if star_check(star_info[0], star.get_type()) and any(
+                                star_info[1] + flag == star.get_luminosity() for flag in ['', 'a', 'b', 'ab', 'z']):
+                            return False
+                    elif star_check(star_info, star.get_type()):
+                        return False
+            return True
+        case 'nebula':
+            if not system.x:
+                return False
+            if any(system.name.startswith(sector) for sector in nebula_sectors):
+                return False
+            location = (system.x, system.y, system.z)
+            # Brute force nearest nebula, independent of the k-d tree used by the plugin
+            if math.dist(location, nebulae_sort(location)[0][1]) < 150.0:
+                return False
+            if value == 'all':
+                if math.dist(location, nebulae_sort(location, 'planetary')[0][1]) < 100.0:
+                    return False
+            return True
+        case 'distance':
+            return body.get_distance() < value
+        case 'system':
+            return system.name != value
+    return False
+
+
+def _parent_is_black_hole(star_name: str, star: Any, body: Any, ref: ReferenceSystem) -> bool:
+    if star_name == ref.system.name or not body.get_name().startswith(star_name + ' '):
+        return False
+    if ref.main_star_name == ref.system.name:
+        return ref.main_star_type == 'H'
+    star_parts = star_name.split(' ')
+    if len(star_parts[0]) > 1:  # Barycentre
+        return any(part in ref.stars and ref.stars[part].get_type() == 'H' for part in star_parts[0])
+    if len(star_parts) == 1:
+        return star.get_type() == 'H'
+    return star_parts[0] in ref.stars and ref.stars[star_parts[0]].get_type() == 'H'
+
+
+def _star_colors(colors: Mapping[str, str], body: Any, ref: ReferenceSystem) -> set[str]:
+    found_colors: set[str] = set()
+    for star in body.get_parent_stars():
+        if star in ref.stars:
+            color = next((color for star_type, color in colors.items()
+                          if star_check(star_type, ref.stars[star].get_type())), '')
+            if color:
+                found_colors.add(color)
+                break
+    for star_name, star in ref.stars.items():
+        if star_name in body.get_parent_stars():
+            continue
+        if star.get_distance() == 0 or _parent_is_black_hole(star_name, star, body, ref):
+            color = next((color for star_type, color in colors.items() if star_check(star_type, star.get_type())), '')
+            if color:
+                found_colors.add(color)
+    return found_colors
+
+
+def reference_species(body: Any, genus: str, ref: ReferenceSystem) -> list[tuple[str, list[str]]]:
+    """
+    Determine the possible species of a genus with the original, uncompiled rule interpreter. Used as a correctness
+    oracle for the optimized evaluator.
+
+    :param body: The planet data
+    :param genus: The genus code
+    :param ref: The system state
+    :return: List of possible species and their sorted colors, in order of species value
+    """
+
+    possible_species: dict[str, set[str]] = {}
+    for species, data in bio_types[genus].items():
+        for ruleset in data['rulesets']:
+            if not any(_eliminated(rule_type, value, body, ref) for rule_type, value in ruleset.items()):
+                possible_species[species] = set()
+                break
+
+    eliminated_species: set[str] = set()
+    if 'colors' in bio_genus.get(genus, {}):
+        colors = bio_genus[genus]['colors']
+        if 'species' in colors:
+            for species in possible_species:
+                if 'star' in colors['species'][species]:
+                    possible_species[species].update(_star_colors(colors['species'][species]['star'], body, ref))
+                elif 'element' in colors['species'][species]:
+                    for element, color in colors['species'][species]['element'].items():
+                        if element in body.get_materials():
+                            possible_species[species].add(color)
+                if not possible_species[species]:
+                    eliminated_species.add(species)
+        else:
+            found_colors = _star_colors(colors['star'], body, ref)
+            if not found_colors:
+                possible_species.clear()
+            for species in possible_species:
+                possible_species[species].update(found_colors)
+
+    return sorted(
+        ((species, sorted(colors)) for species, colors in possible_species.items()
+         if species not in eliminated_species),
+        key=lambda item: bio_types[genus][item[0]]['value']
+    )
@@ -0,0 +1,260 @@
+import argparse
+import importlib.util
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+from collections import defaultdict
+from types import ModuleType
+from typing import Any, Callable, Iterable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(ROOT, 'src')
+sys.path.insert(0, SOURCE)
+
+import edmc_stubs  # noqa: E402
+from scenarios import SCENARIOS  # noqa: E402
+
+# Settings which enable every display path, including the overlay and radar
+BENCH_SETTINGS: dict[str, Any] = {
+    'bioscan_overlay': True,
+    'bioscan_radar_enabled': True,
+    'bioscan_waypoints': True,
+    'bioscan_focus': 'On Approach',
+}
+PERCENTILES = (50, 90, 99)
+
+
+class Recorder:
+    """
+    Collects per-event latencies and counters while a replay runs.
+    """
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.queries: dict[str, int] = defaultdict(int)
+        self.events: dict[str, int] = defaultdict(int)
+        self.display_requests = 0
+        self.renders = 0
+        self.query_count = 0
+
+    def timed(self, name: str, function: Callable, key: Callable[..., str] | None = None) -> Callable:
+        """
+        Wrap a function to record its latency.
+
+        :param name: Name to record the latency under
+        :param function: The function to wrap
+        :param key: Optional function of the call arguments returning a suffix for the name, such as the event type
+        :return: The wrapped function
+        """
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                label = f'{name}:{key(*args, **kwargs)}' if key else name
+                self.latencies[label].append(time.perf_counter() - start)
+
+        return wrapper
+
+    def counted(self, attribute: str, function: Callable) -> Callable:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    def count_query(self, *args: Any) -> None:
+        self.query_count += 1
+
+    def report(self, overlay_messages: int) -> dict[str, Any]:
+        """
+        Summarize the recorded data.
+
+        :param overlay_messages: Number of overlay messages sent
+        :return: JSON-ready summary with latency percentiles in milliseconds
+        """
+
+        latencies: dict[str, dict[str, float]] = {}
+        for name, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            summary = {'count': len(ordered), 'total': sum(ordered) * 1000}
+            for percentile in PERCENTILES:
+                rank = max(0, math.ceil(percentile / 100 * len(ordered)) - 1)  # Nearest rank
+                summary[f'p{percentile}'] = ordered[rank] * 1000
+            summary['max'] = ordered[-1] * 1000
+            latencies[name] = summary
+        return {
+            'events': dict(self.events),
+            'latency_ms': latencies,
+            'update_display_calls': self.display_requests,
+            'renders': self.renders,
+            'sql_queries': self.query_count,
+            'sql_queries_by_event': dict(self.queries),
+            'overlay_messages': overlay_messages,
+        }
+
+
+def load_plugin(name: str, directory: str) -> ModuleType:
+    """
+    Import a plugin's load.py the way EDMC does, under a unique module name.
+
+    :param name: Plugin name
+    :param directory: Plugin directory
+    :return: The plugin module
+    """
+
+    sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(f'plugin_{name}', os.path.join(directory, 'load.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(entries: Iterable[dict[str, Any]], explodata_dir: str) -> dict[str, Any]:
+    """
+    Replay journal and status entries through BioScan and ExploData with stubbed EDMC modules and a throwaway
+    database. Must run in a fresh process, as both plugins keep module-level state.
+
+    :param entries: Journal entries, and Status.json entries with the 'Status' event
+    :param explodata_dir: Path to the ExploData plugin directory
+    :return: The replay report
+    """
+
+    app_dir = tempfile.mkdtemp(prefix='bioscan-bench-')
+    config, monitor = edmc_stubs.install(app_dir, BENCH_SETTINGS)
+    recorder = Recorder()
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    event.listen(Engine, 'before_cursor_execute', recorder.count_query)
+
+    root = tk.Tk()
+    root.withdraw()
+    parent = tk.Frame(root)
+    sys.path.append(os.path.dirname(os.path.abspath(explodata_dir)))  # EDMC adds the plugin folder to the path
+    # EDMC loads plugins in folder name order
+    bioscan = load_plugin('BioScan', SOURCE)
+    explodata = load_plugin('ExploData', explodata_dir)
+    bioscan.version_check = lambda: ''
+    bioscan.update_display = recorder.counted('display_requests', bioscan.update_display)
+    bioscan.render_display = recorder.timed('render_display', recorder.counted('renders', bioscan.render_display))
+    bioscan.process_data_event = recorder.timed('process_data_event', bioscan.process_data_event,
+                                                lambda entry: entry['event'])
+    bioscan.journal_entry = recorder.timed('journal_entry', bioscan.journal_entry,
+                                           lambda cmdr, is_beta, system, station, entry, state: entry['event'])
+    bioscan.dashboard_entry = recorder.timed('dashboard_entry', bioscan.dashboard_entry)
+    explodata.journal_entry = recorder.timed('explodata.journal_entry', explodata.journal_entry,
+                                             lambda cmdr, is_beta, system, station, entry, state: entry['event'])
+    plugins = [bioscan, explodata]
+    for plugin in plugins:
+        plugin.plugin_start3(os.path.dirname(plugin.__file__))
+    for plugin in plugins:
+        if hasattr(plugin, 'plugin_app'):
+            plugin.plugin_app(parent)
+    root.update()
+
+    for entry in entries:
+        queries = recorder.query_count
+        recorder.events[entry['event']] += 1
+        if entry['event'] == 'Status':
+            for plugin in plugins:
+                if hasattr(plugin, 'dashboard_entry'):
+                    plugin.dashboard_entry(monitor.cmdr, False, entry)
+        else:
+            monitor.update(entry)
+            for plugin in plugins:
+                if hasattr(plugin, 'journal_entry'):
+                    plugin.journal_entry(monitor.cmdr, False, monitor.state['SystemName'],
+                                         monitor.state['StationName'], entry, monitor.state)
+        root.update()  # Run scheduled renders and any callbacks the plugins queued
+        recorder.queries[entry['event']] += recorder.query_count - queries
+
+    if bioscan.this.display_pending is not None:
+        root.after_cancel(bioscan.this.display_pending)
+        bioscan.flush_display()
+    for plugin in plugins:
+        if hasattr(plugin, 'plugin_stop'):
+            plugin.plugin_stop()
+    config.shutting_down = True
+    root.destroy()
+    return recorder.report(edmc_stubs.Overlay.sent)
+
+
+def read_entries(paths: list[str]) -> list[dict[str, Any]]:
+    """
+    Read recorded journal and status files. Entries from several files are merged by timestamp.
+
+    :param paths: JSON-lines files, such as journal logs and recorded Status.json snapshots
+    :return: The merged entries
+    """
+
+    entries: list[dict[str, Any]] = []
+    for path in paths:
+        with open(path, encoding='utf-8') as source:
+            entries.extend(json.loads(line) for line in source if line.strip())
+    entries.sort(key=lambda entry: entry.get('timestamp', ''))
+    return entries
+
+
+def format_report(name: str, report: dict[str, Any]) -> str:
+    lines = [
+        f'== {name}: {sum(report["events"].values())} events, {report["update_display_calls"]} display requests, '
+        f'{report["renders"]} renders, {report["sql_queries"]} SQL queries, '
+        f'{report["overlay_messages"]} overlay messages',
+        f'{"hook:event":<45}{"count":>7}{"p50":>10}{"p90":>10}{"p99":>10}{"max":>10}{"total":>11}',
+    ]
+    for hook, summary in report['latency_ms'].items():
+        lines.append(f'{hook:<45}{summary["count"]:>7}{summary["p50"]:>10.3f}{summary["p90"]:>10.3f}'
+                     f'{summary["p99"]:>10.3f}{summary["max"]:>10.3f}{summary["total"]:>11.3f}')
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Replay journal and Status.json sequences through the plugin hooks and report per-event '
+                    'latency percentiles (ms), display updates, SQL queries and overlay messages. Requires the '
+                    'ExploData plugin and a display for Tk (use xvfb-run on headless machines).'
+    )
+    parser.add_argument('--explodata', required=True, help='path to the ExploData plugin directory')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='built-in scenario to run, may be repeated (default: all)')
+    parser.add_argument('--replay', nargs='+', metavar='FILE',
+                        help='recorded journal and status JSON-lines files to replay instead of the scenarios')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the built-in scenarios')
+    parser.add_argument('--json', metavar='FILE', help='write the full results as JSON')
+    parser.add_argument('--run', help=argparse.SUPPRESS)  # Worker mode: run a single scenario, print JSON
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.run:
+        entries = read_entries(args.replay) if args.run == 'replay' else SCENARIOS[args.run](random.Random(args.seed))
+        print(json.dumps(run(entries, args.explodata)))
+        return 0
+
+    names = ['replay'] if args.replay else args.scenario or list(SCENARIOS)
+    results: dict[str, Any] = {}
+    for name in names:
+        command = [sys.executable, os.path.abspath(__file__), '--explodata', args.explodata, '--run', name,
+                   '--seed', str(args.seed)]
+        if args.replay:
+            command += ['--replay', *args.replay]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+        print(format_report(name, results[name]))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as target:
+            json.dump(results, target, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,271 @@
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator
+
+from bio_scan.bio_data.species import rules as bio_types
+from bio_scan.status_flags import StatusFlags, StatusFlags2
+
+GRAVITY_UNIT = 9.797759
+PRESSURE_UNIT = 101231.656250
+
+COMMANDER = 'Bench Runner'
+SYSTEM_NAME = 'Synuefe BENCH-1'
+SYSTEM_ADDRESS = 1234567890123
+STAR_POS = [-9530.5, -910.28125, 19808.125]
+
+SUPERCRUISE = StatusFlags.SUPERCRUISE | StatusFlags.IN_SHIP | StatusFlags.SHIELDS_UP
+APPROACH = StatusFlags.IN_SHIP | StatusFlags.SHIELDS_UP | StatusFlags.HAVE_LATLONG | StatusFlags.HAVE_ALTITUDE
+LANDED = APPROACH | StatusFlags.LANDED | StatusFlags.LANDING_GEAR
+ON_FOOT = StatusFlags.HAVE_LATLONG
+ON_FOOT_2 = StatusFlags2.ON_FOOT | StatusFlags2.PLANET_ON_FOOT | StatusFlags2.EXTERIOR_ON_FOOT
+DOCKED = StatusFlags.DOCKED | StatusFlags.IN_SHIP | StatusFlags.LANDING_GEAR | StatusFlags.SHIELDS_UP
+
+ATMOSPHERE_TEXT = {
+    'None': '', 'CarbonDioxideRich': 'carbon dioxide-rich', 'ArgonRich': 'argon-rich', 'NeonRich': 'neon-rich',
+    'MethaneRich': 'methane-rich', 'WaterRich': 'water-rich', 'SulphurDioxide': 'sulphur dioxide',
+    'CarbonDioxide': 'carbon dioxide',
+}
+PLANET_CLASSES = ('Rocky body', 'High metal content body', 'Icy body', 'Rocky ice body', 'Metal rich body')
+
+# The on-foot session samples a species which only needs a thin carbon dioxide atmosphere on a rocky body
+TARGET_BODY = 3
+TARGET_GENUS = ('$Codex_Ent_Bacterial_Genus_Name;', 'Bacterium')
+TARGET_SPECIES = ('$Codex_Ent_Bacterial_01_Name;', 'Bacterium Aurasus')
+TARGET_VARIANT = ('$Codex_Ent_Bacterial_01_K_Name;', 'Bacterium Aurasus - Teal')
+TARGET_VALUE = 1000000
+
+
+class Timeline:
+    """
+    Builds a list of journal and status entries with increasing timestamps.
+    """
+
+    def __init__(self, start: datetime = datetime(2024, 5, 1, 12, 0, 0)):
+        self.time = start
+        self.entries: list[dict[str, Any]] = []
+
+    def add(self, event: str, seconds: float = 1.0, **fields: Any) -> None:
+        self.time += timedelta(seconds=seconds)
+        self.entries.append({'timestamp': self.time.strftime('%Y-%m-%dT%H:%M:%SZ'), 'event': event, **fields})
+
+    def status(self, flags: StatusFlags, flags2: StatusFlags2 = StatusFlags2(0), seconds: float = 1.0,
+               **fields: Any) -> None:
+        self.add('Status', seconds, Flags=flags.value, Flags2=flags2.value, **fields)
+
+
+def _planet_name(index: int) -> str:
+    return f'{SYSTEM_NAME} {index}'
+
+
+def _arrival(timeline: Timeline) -> None:
+    timeline.add('Fileheader', 0, part=1, language='English/UK', Odyssey=True, gameversion='4.0.0.1904',
+                 build='r304032/r0 ')
+    timeline.add('Commander', FID='F0000001', Name=COMMANDER)
+    timeline.add('LoadGame', FID='F0000001', Commander=COMMANDER, Horizons=True, Odyssey=True, Ship='Krait_Light',
+                 Ship_Localised='Krait Phantom', ShipID=7, ShipName='Bench', ShipIdent='BN-01', FuelLevel=32.0,
+                 FuelCapacity=32.0, GameMode='Solo', Credits=1000000, Loan=0)
+    timeline.add('SuitLoadout', SuitID=1700000000, SuitName='utilitysuit_class1', SuitName_Localised='Maverick Suit',
+                 SuitMods=[], LoadoutID=4293000001, LoadoutName='Bench', Modules=[])
+    timeline.status(SUPERCRUISE, GuiFocus=0)
+    timeline.add('FSDJump', 20, Taxi=False, Multicrew=False, StarSystem=SYSTEM_NAME, SystemAddress=SYSTEM_ADDRESS,
+                 StarPos=STAR_POS, SystemAllegiance='', SystemEconomy='$economy_None;',
+                 SystemGovernment='$government_None;', SystemSecurity='$GAlAXY_MAP_INFO_state_anarchy;', Population=0,
+                 Body=SYSTEM_NAME, BodyID=0,
+                 BodyType='Star', JumpDist=42.5, FuelUsed=2.1, FuelLevel=29.9)
+    timeline.add('Scan', ScanType='AutoScan', BodyName=SYSTEM_NAME, BodyID=0, StarSystem=SYSTEM_NAME,
+                 SystemAddress=SYSTEM_ADDRESS, DistanceFromArrivalLS=0.0, StarType='K', Subclass=3, StellarMass=0.71,
+                 Radius=520000000.0, AbsoluteMagnitude=6.6, Age_MY=9000, SurfaceTemperature=4500.0, Luminosity='Va',
+                 RotationPeriod=250000.0, AxialTilt=0.0, WasDiscovered=True, WasMapped=False)
+    timeline.status(SUPERCRUISE, GuiFocus=0)
+
+
+def _planet_scan(timeline: Timeline, rng: random.Random, index: int, ruleset: dict[str, Any] | None) -> None:
+    """
+    Scan a planet. Planets built from a ruleset fall within its bounds, others are random.
+    """
+
+    ruleset = ruleset or {}
+    atmosphere = ruleset['atmosphere'] if isinstance(ruleset.get('atmosphere'), list) else ['None', 'CarbonDioxide']
+    atmosphere_type = rng.choice(atmosphere)
+    planet_class = rng.choice(ruleset.get('body_type', PLANET_CLASSES))
+    gravity = rng.uniform(ruleset.get('min_gravity', 0.04), ruleset.get('max_gravity', 0.6))
+    temperature = rng.uniform(ruleset.get('min_temperature', 20.0), ruleset.get('max_temperature', 500.0))
+    pressure = rng.uniform(ruleset.get('min_pressure', 0.0), ruleset.get('max_pressure', 0.1))
+    if atmosphere_type == 'None':
+        pressure = 0.0
+    volcanism = ruleset.get('volcanism') if isinstance(ruleset.get('volcanism'), list) else None
+    volcanism_text = f'minor {rng.choice(volcanism).lstrip("=")} volcanism' if volcanism else ''
+    atmosphere_text = ATMOSPHERE_TEXT.get(atmosphere_type, atmosphere_type.lower())
+    timeline.add(
+        'Scan', rng.uniform(2, 8), ScanType='Detailed', BodyName=_planet_name(index), BodyID=index,
+        Parents=[{'Star': 0}], StarSystem=SYSTEM_NAME, SystemAddress=SYSTEM_ADDRESS,
+        DistanceFromArrivalLS=ruleset.get('distance', 0.0) + rng.uniform(10.0, 5000.0), TidalLock=True,
+        TerraformState='', PlanetClass=planet_class,
+        Atmosphere=f'thin {atmosphere_text} atmosphere' if atmosphere_text else '',
+        AtmosphereType=atmosphere_type,
+        AtmosphereComposition=[{'Name': atmosphere_type.removesuffix('Rich'), 'Percent': 100.0}]
+        if atmosphere_type != 'None' else [],
+        Volcanism=volcanism_text, MassEM=0.05, Radius=2000000.0, SurfaceGravity=gravity * GRAVITY_UNIT,
+        SurfaceTemperature=temperature, SurfacePressure=pressure * PRESSURE_UNIT, Landable=True,
+        Materials=[{'Name': 'iron', 'Percent': 20.0}, {'Name': 'sulphur', 'Percent': 18.0},
+                   {'Name': 'carbon', 'Percent': 15.0}, {'Name': rng.choice(['ruthenium', 'tellurium', 'antimony',
+                                                                            'polonium', 'cadmium']), 'Percent': 1.0}],
+        Composition={'Ice': 0.0, 'Rock': 0.67, 'Metal': 0.33}, SemiMajorAxis=1.0e10, Eccentricity=0.01,
+        OrbitalInclination=0.1, Periapsis=10.0, OrbitalPeriod=ruleset.get('max_orbital_period', 2.0e7) * 0.5,
+        AscendingNode=10.0, MeanAnomaly=10.0, RotationPeriod=2.0e6, AxialTilt=0.1, WasDiscovered=False,
+        WasMapped=False
+    )
+
+
+def _body_signals(timeline: Timeline, index: int, count: int) -> None:
+    timeline.add('FSSBodySignals', BodyName=_planet_name(index), BodyID=index, SystemAddress=SYSTEM_ADDRESS,
+                 Signals=[{'Type': '$SAA_SignalType_Biological;', 'Type_Localised': 'Biological', 'Count': count}])
+
+
+def _target_ruleset() -> dict[str, Any]:
+    return bio_types[TARGET_GENUS[0]][TARGET_SPECIES[0]]['rulesets'][0] | {'atmosphere': ['CarbonDioxide']}
+
+
+def _random_ruleset(rng: random.Random) -> dict[str, Any]:
+    genus = rng.choice(list(bio_types))
+    species = rng.choice(list(bio_types[genus]))
+    return rng.choice(bio_types[genus][species]['rulesets'] or [{}])
+
+
+def fss_sweep(rng: random.Random, bodies: int = 80) -> list[dict[str, Any]]:
+    """
+    Arrive in a system and resolve every body with the FSS. Two thirds of the planets fall within a random species
+    ruleset and report biological signals.
+
+    :param rng: Random source
+    :param bodies: Number of planets
+    :return: The journal and status entries
+    """
+
+    timeline = Timeline()
+    _arrival(timeline)
+    timeline.add('FSSDiscoveryScan', Progress=0.1, BodyCount=bodies + 1, NonBodyCount=3, SystemName=SYSTEM_NAME,
+                 SystemAddress=SYSTEM_ADDRESS)
+    timeline.status(SUPERCRUISE, GuiFocus=9)
+    for index in range(1, bodies + 1):
+        biological = rng.random() < 2 / 3
+        _planet_scan(timeline, rng, index, _random_ruleset(rng) if biological else None)
+        if biological:
+            _body_signals(timeline, index, rng.randint(1, 4))
+        if index % 10 == 0:
+            timeline.status(SUPERCRUISE, GuiFocus=9)
+    timeline.add('FSSAllBodiesFound', SystemName=SYSTEM_NAME, SystemAddress=SYSTEM_ADDRESS, Count=bodies + 1)
+    timeline.status(SUPERCRUISE, GuiFocus=0)
+    return timeline.entries
+
+
+def _walk(timeline: Timeline, start: tuple[float, float], heading: float, metres: float,
+          radius: float) -> Iterator[tuple[float, float]]:
+    """
+    Walk in a straight line, reporting the position every 10 m.
+    """
+
+    latitude, longitude = start
+    step = math.degrees(10.0 / radius)
+    for _ in range(int(metres / 10)):
+        latitude += step * math.cos(math.radians(heading))
+        longitude += step * math.sin(math.radians(heading)) / max(math.cos(math.radians(latitude)), 0.01)
+        timeline.status(ON_FOOT, ON_FOOT_2, 0.5, GuiFocus=0, Latitude=latitude, Longitude=longitude, Heading=heading,
+                        PlanetRadius=radius, BodyName=_planet_name(TARGET_BODY), Oxygen=1.0, Health=1.0,
+                        Temperature=180.0, SelectedWeapon='$humanoid_fists_name;', Gravity=0.2)
+        yield latitude, longitude
+
+
+def _scan_organic(timeline: Timeline, scan_type: str) -> None:
+    timeline.add('ScanOrganic', 3, ScanType=scan_type, Genus=TARGET_GENUS[0], Genus_Localised=TARGET_GENUS[1],
+                 Species=TARGET_SPECIES[0], Species_Localised=TARGET_SPECIES[1], Variant=TARGET_VARIANT[0],
+                 Variant_Localised=TARGET_VARIANT[1], SystemAddress=SYSTEM_ADDRESS, Body=TARGET_BODY)
+
+
+def on_foot(rng: random.Random) -> list[dict[str, Any]]:
+    """
+    Map a planet with biological signals, land, and take all three samples of a species on foot.
+
+    :param rng: Random source
+    :return: The journal and status entries
+    """
+
+    timeline = Timeline()
+    _arrival(timeline)
+    for index in range(1, 6):
+        _planet_scan(timeline, rng, index, _target_ruleset() if index == TARGET_BODY else None)
+    _body_signals(timeline, TARGET_BODY, 1)
+    timeline.add('SAAScanComplete', 60, BodyName=_planet_name(TARGET_BODY), SystemAddress=SYSTEM_ADDRESS,
+                 BodyID=TARGET_BODY, ProbesUsed=5, EfficiencyTarget=6)
+    timeline.add('SAASignalsFound', BodyName=_planet_name(TARGET_BODY), SystemAddress=SYSTEM_ADDRESS,
+                 BodyID=TARGET_BODY,
+                 Signals=[{'Type': '$SAA_SignalType_Biological;', 'Type_Localised': 'Biological', 'Count': 1}],
+                 Genuses=[{'Genus': TARGET_GENUS[0], 'Genus_Localised': TARGET_GENUS[1]}])
+    timeline.add('ApproachBody', 30, StarSystem=SYSTEM_NAME, SystemAddress=SYSTEM_ADDRESS,
+                 Body=_planet_name(TARGET_BODY), BodyID=TARGET_BODY)
+    radius = 2000000.0
+    position = (10.0, 20.0)
+    for altitude in range(20000, 0, -2000):
+        timeline.status(APPROACH, GuiFocus=0, Latitude=position[0], Longitude=position[1], Heading=90,
+                        Altitude=altitude, PlanetRadius=radius, BodyName=_planet_name(TARGET_BODY))
+    timeline.add('Touchdown', PlayerControlled=True, Taxi=False, Multicrew=False, StarSystem=SYSTEM_NAME,
+                 SystemAddress=SYSTEM_ADDRESS, Body=_planet_name(TARGET_BODY), BodyID=TARGET_BODY, OnStation=False,
+                 OnPlanet=True, Latitude=position[0], Longitude=position[1])
+    timeline.status(LANDED, GuiFocus=0, Latitude=position[0], Longitude=position[1], Heading=90, Altitude=0,
+                    PlanetRadius=radius, BodyName=_planet_name(TARGET_BODY))
+    timeline.add('Disembark', 5, SRV=False, Taxi=False, Multicrew=False, ID=7, StarSystem=SYSTEM_NAME,
+                 SystemAddress=SYSTEM_ADDRESS, Body=_planet_name(TARGET_BODY), BodyID=TARGET_BODY, OnStation=False,
+                 OnPlanet=True)
+    for scan_type in ('Log', 'Sample', 'Analyse'):
+        for position in _walk(timeline, position, rng.uniform(0, 360), 520.0, radius):
+            pass
+        _scan_organic(timeline, scan_type)
+        timeline.status(ON_FOOT, ON_FOOT_2, GuiFocus=0, Latitude=position[0], Longitude=position[1], Heading=90,
+                        PlanetRadius=radius, BodyName=_planet_name(TARGET_BODY))
+    for position in _walk(timeline, position, rng.uniform(0, 360), 200.0, radius):
+        pass
+    timeline.add('Embark', 5, SRV=False, Taxi=False, Multicrew=False, ID=7, StarSystem=SYSTEM_NAME,
+                 SystemAddress=SYSTEM_ADDRESS, Body=_planet_name(TARGET_BODY), BodyID=TARGET_BODY, OnStation=False,
+                 OnPlanet=True)
+    timeline.status(LANDED, GuiFocus=0, Latitude=position[0], Longitude=position[1], Heading=90, Altitude=0,
+                    PlanetRadius=radius, BodyName=_planet_name(TARGET_BODY))
+    timeline.add('Liftoff', 10, PlayerControlled=True, Taxi=False, Multicrew=False, StarSystem=SYSTEM_NAME,
+                 SystemAddress=SYSTEM_ADDRESS, Body=_planet_name(TARGET_BODY), BodyID=TARGET_BODY, OnStation=False,
+                 OnPlanet=True, Latitude=position[0], Longitude=position[1])
+    timeline.add('LeaveBody', 30, StarSystem=SYSTEM_NAME, SystemAddress=SYSTEM_ADDRESS,
+                 Body=_planet_name(TARGET_BODY), BodyID=TARGET_BODY)
+    timeline.status(SUPERCRUISE, GuiFocus=0)
+    return timeline.entries
+
+
+def sale(rng: random.Random) -> list[dict[str, Any]]:
+    """
+    Complete the on-foot session, then dock and sell the exobiology data.
+
+    :param rng: Random source
+    :return: The journal and status entries
+    """
+
+    entries = on_foot(rng)
+    timeline = Timeline(datetime.strptime(entries[-1]['timestamp'], '%Y-%m-%dT%H:%M:%SZ'))
+    timeline.add('Docked', 300, StationName='Bench Outpost', StationType='Outpost', Taxi=False, Multicrew=False,
+                 StarSystem=SYSTEM_NAME, SystemAddress=SYSTEM_ADDRESS, MarketID=3700000001,
+                 StationServices=['dock', 'autodock', 'exploration', 'facilitator'], DistFromStarLS=500.0)
+    timeline.status(DOCKED, GuiFocus=0)
+    timeline.add('SellOrganicData', 30, MarketID=3700000001, BioData=[{
+        'Genus': TARGET_GENUS[0], 'Genus_Localised': TARGET_GENUS[1], 'Species': TARGET_SPECIES[0],
+        'Species_Localised': TARGET_SPECIES[1], 'Variant': TARGET_VARIANT[0], 'Variant_Localised': TARGET_VARIANT[1],
+        'Value': TARGET_VALUE, 'Bonus': TARGET_VALUE * 4
+    }])
+    timeline.add('Undocked', 60, StationName='Bench Outpost', StationType='Outpost', MarketID=3700000001,
+                 Taxi=False, Multicrew=False)
+    timeline.status(SUPERCRUISE, GuiFocus=0)
+    return entries + timeline.entries
+
+
+SCENARIOS: dict[str, Callable[[random.Random], list[dict[str, Any]]]] = {
+    'fss_sweep': fss_sweep,
+    'on_foot': on_foot,
+    'sale': sale,
+}
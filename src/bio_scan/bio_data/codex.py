@@ -10,69 +10,135 @@ from ExploData.explo_data import db
 from bio_scan.bio_data.species import rules as bio_types
 from bio_scan.util import translate_species
 
+# Known codex entries per commander, as (biological, region) pairs. Every entry is also stored with a None region so
+# galaxy-wide checks are a single lookup.
+codex_cache: dict[int, set[tuple[str, int | None]]] = {}
 
-def check_codex(commander: int, region: int | None, genus: str, species: str, variant: str = '') -> bool:
-    if genus not in bio_genus:
-        return False
-    biological = species
-    if variant:
-        if species in bio_genus:
-            code = ''
-            color_data = bio_genus[species]['colors']['star']
-            for key, color in color_data.items():  # type: str, str
-                if color == variant:
-                    code = key
-                    break
-            if code:
-                match = re.match('^(.*)_Name;$', species)
-                if match:
-                    biological = f'{match.group(1)}_{code}_Name;'
-
-        elif 'colors' in bio_genus[genus]:
-            variant_data = bio_genus[genus]['colors']
-            code = ''
-            element = False
-            color_data = []
-            if 'species' in variant_data:
-                if 'star' in variant_data['species'][species]:
-                    color_data = variant_data['species'][species]['star']
-                elif 'element' in variant_data['species'][species]:
-                    color_data = variant_data['species'][species]['element']
-                    element = True
-            else:
-                color_data = variant_data['star']
-            for key, color in color_data.items():  # type: str, str
-                if color == variant:
-                    if element:
-                        code = key.capitalize()
-                    else:
-                        code = key
-                    break
 
-            if code:
-                match = re.match('^(.*)_Name;$', species)
-                if match:
-                    biological = f'{match.group(1)}_{code}_Name;'
+def get_codex(commander: int) -> set[tuple[str, int | None]]:
+    """
+    Get the known codex entries for a commander, loading all of them in a single query on first use.
 
-    session = db.get_session()
+    :param commander: The commander ID
+    :return: Set of (biological, region) pairs
+    """
 
-    if region is not None:
-        entry: CodexScans = session.scalar(select(CodexScans).where(CodexScans.commander_id == commander)
-                                           .where(CodexScans.region == region).where(CodexScans.biological == biological))
-    else:
-        entry: CodexScans = session.scalar(select(CodexScans).where(CodexScans.commander_id == commander)
-                                           .where(CodexScans.biological == biological))
+    if commander not in codex_cache:
+        session = db.get_session()
+        rows = session.execute(select(CodexScans.biological, CodexScans.region)
+                               .where(CodexScans.commander_id == commander)).all()
+        session.close()
+        entries: set[tuple[str, int | None]] = set()
+        for biological, region in rows:
+            entries.add((biological, region))
+            entries.add((biological, None))
+        codex_cache[commander] = entries
+    return codex_cache[commander]
 
-    session.close()
 
-    if entry:
-        return True
-    return False
+def add_codex(commander: int, biological: str, region: int | None) -> None:
+    """
+    Record a new codex entry for a commander. Commanders which haven't been loaded yet will pick up the entry from the
+    database instead.
 
+    :param commander: The commander ID
+    :param biological: The codex name of the entry
+    :param region: The region ID of the entry
+    """
+
+    if commander in codex_cache:
+        codex_cache[commander].add((biological, None))
+        if region is not None:
+            codex_cache[commander].add((biological, region))
+
+
+def reset_codex() -> None:
+    """
+    Clear the codex cache, forcing a reload from the database. Required after bulk journal imports.
+    """
+
+    codex_cache.clear()
+
+
+def _variant_codes(genus: str, species: str) -> tuple[dict[str, str], bool]:
+    """
+    Find the variant code to color mapping for a species.
+
+    :param genus: The genus code
+    :param species: The species code
+    :return: Mapping of variant codes to color names, and whether the codes are element codes
+    """
+
+    if species in bio_genus:
+        return bio_genus[species].get('colors', {}).get('star', {}), False
+    variant_data = bio_genus[genus].get('colors', {})
+    if 'species' in variant_data:
+        species_colors = variant_data['species'].get(species, {})
+        if 'star' in species_colors:
+            return species_colors['star'], False
+        if 'element' in species_colors:
+            return species_colors['element'], True
+        return {}, False
+    return variant_data.get('star', {}), False
+
+
+def _build_variant_index() -> dict[tuple[str, str, str], str]:
+    """
+    Build the lookup of (genus, species, color) to the codex name of that variant.
+
+    :return: The variant index
+    """
+
+    index: dict[tuple[str, str, str], str] = {}
+    for genus, species_data in bio_types.items():
+        if genus not in bio_genus:
+            continue
+        for species in species_data:
+            match = re.match('^(.*)_Name;$', species)
+            if not match:
+                continue
+            color_data, element = _variant_codes(genus, species)
+            for key, color in color_data.items():  # type: str, str
+                code = key.capitalize() if element else key
+                index.setdefault((genus, species, color), f'{match.group(1)}_{code}_Name;')
+    return index
+
+
+variant_index = _build_variant_index()
+
+# Translated species names to (genus, species) codes, built on first use in the current language
+species_names: dict[str, tuple[str, str]] = {}
+
+
+def _build_species_names() -> None:
+    """
+    Build the lookup of translated species names to their genus and species codes.
+    """
 
-def check_codex_from_name(commander: int, region: int | None, name: str, variant: str = '') -> bool:
     for genus, species_data in bio_types.items():
         for species_code, data in species_data.items():
-            if translate_species(data['name']) == name:
-                return check_codex(commander, region, genus, species_code, variant)
-    return False
+            species_names.setdefault(translate_species(data['name']), (genus, species_code))
+
+
+def reset_species_names() -> None:
+    """
+    Clear the translated species name lookup. Required when the display language changes.
+    """
+
+    species_names.clear()
+
+
+def check_codex(commander: int, region: int | None, genus: str, species: str, variant: str = '') -> bool:
+    if genus not in bio_genus:
+        return False
+    biological = variant_index.get((genus, species, variant), species) if variant else species
+    return (biological, region) in get_codex(commander)
+
+
+def check_codex_from_name(commander: int, region: int | None, name: str, variant: str = '') -> bool:
+    if not species_names:
+        _build_species_names()
+    if name not in species_names:
+        return False
+    genus, species_code = species_names[name]
+    return check_codex(commander, region, genus, species_code, variant)
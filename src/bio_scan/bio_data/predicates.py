@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Mapping, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ExploData.explo_data.body_data.struct import PlanetData
+
+from bio_scan.bio_data.regions import region_masks, tuber_zones
+from bio_scan.bio_data.species import rules as bio_types
+from bio_scan.bio_data.system_context import SystemContext
+from bio_scan.body_data.star_class import queries_mask, query_mask
+
+GRAVITY_UNIT = 9.797759
+PRESSURE_UNIT = 101231.656250
+LUMINOSITY_FLAGS = ('', 'a', 'b', 'ab', 'z')
+
+# Body rules are cheap getter comparisons, system rules may walk stars, zones and nebulae. Evaluate cheap rules first.
+RULE_COST: dict[str, int] = {
+    'atmosphere': 0,
+    'body_type': 0,
+    'min_gravity': 1,
+    'max_gravity': 1,
+    'min_temperature': 1,
+    'max_temperature': 1,
+    'min_pressure': 1,
+    'max_pressure': 1,
+    'max_orbital_period': 1,
+    'distance': 1,
+    'atmosphere_component': 2,
+    'volcanism': 2,
+    'system': 3,
+    'regions': 3,
+    'main_star': 4,
+    'parent_star': 4,
+    'star': 5,
+    'bodies': 5,
+    'guardian': 6,
+    'tuber': 6,
+    'nebula': 7,
+}
+
+# Rule types whose results depend on more than the body being tested, mapped to the data they depend on
+RULE_DEPENDENCIES: dict[str, str] = {
+    'bodies': 'bodies',
+    'main_star': 'stars',
+    'star': 'stars',
+    'parent_star': 'parent_stars',
+}
+
+Predicate = Callable[['PlanetData', SystemContext], bool]
+
+
+class Rule:
+    """
+    A single compiled rule. The test returns True if the body passes the rule.
+    """
+
+    __slots__ = ('kind', 'value', 'test', 'reason')
+
+    def __init__(self, kind: str, value: Any, test: Predicate, reason: str):
+        """
+        Constructor.
+
+        :param kind: The ruleset key this rule was compiled from
+        :param value: The original ruleset value, retained for debugging
+        :param test: Predicate taking the body and context, returning True if the body passes the rule
+        :param reason: Elimination reason for debug logging
+        """
+
+        self.kind = kind
+        self.value = value
+        self.test = test
+        self.reason = reason
+
+
+def _compile_star_specs(specs: tuple) -> tuple[int, tuple[tuple[int, frozenset[str]], ...]]:
+    """
+    Compile ruleset star specs into star class bitmasks. Tuple specs also require a luminosity match.
+    Any other spec type never matches, as in the original rule interpreter.
+
+    :param specs: Star type strings and (star type, luminosity class) tuples
+    :return: Combined bitmask of the plain star type specs, and (bitmask, luminosity classes) for each tuple spec
+    :raises ValueError: If a spec is not a base star class
+    """
+
+    plain_mask = 0
+    luminosity_specs: list[tuple[int, frozenset[str]]] = []
+    for spec in specs:
+        if isinstance(spec, tuple):
+            luminosity_specs.append((query_mask(spec[0]), frozenset(spec[1] + flag for flag in LUMINOSITY_FLAGS)))
+        elif isinstance(spec, str):
+            plain_mask |= query_mask(spec)
+    return plain_mask, tuple(luminosity_specs)
+
+
+def _star_specs_match(plain_mask: int, luminosity_specs: tuple[tuple[int, frozenset[str]], ...], star_mask: int,
+                      luminosity: str) -> bool:
+    """
+    Check compiled star specs against a star.
+
+    :param plain_mask: Combined bitmask of the plain star type specs
+    :param luminosity_specs: Bitmask and luminosity classes of each tuple spec
+    :param star_mask: Star class bitmask of the star
+    :param luminosity: ED journal luminosity class of the star
+    :return: True if the star satisfies any of the specs
+    """
+
+    if star_mask & plain_mask:
+        return True
+    return any(star_mask & mask and luminosity in luminosities for mask, luminosities in luminosity_specs)
+
+
+def _compile_atmosphere(value: Any) -> Predicate:
+    if value == 'Any':
+        return lambda body, ctx: body.get_atmosphere() not in ('', 'None')
+    atmospheres = frozenset(value)
+    return lambda body, ctx: body.get_atmosphere() in atmospheres
+
+
+def _compile_atmosphere_component(value: Mapping[str, float]) -> Predicate:
+    components = tuple(value.items())
+    return lambda body, ctx: all(body.get_gas(gas) >= percent for gas, percent in components)
+
+
+def _compile_gravity(value: float, maximum: bool) -> Predicate:
+    if maximum:
+        return lambda body, ctx: not body.get_gravity() / GRAVITY_UNIT > value
+    return lambda body, ctx: not body.get_gravity() / GRAVITY_UNIT < value
+
+
+def _compile_temperature(value: float, maximum: bool) -> Predicate:
+    if maximum:
+        return lambda body, ctx: not body.get_temp() or not body.get_temp() > value
+    return lambda body, ctx: not body.get_temp() or not body.get_temp() < value
+
+
+def _compile_pressure(value: float, maximum: bool) -> Predicate:
+    if maximum:
+        return lambda body, ctx: not body.get_pressure() or not body.get_pressure() / PRESSURE_UNIT >= value
+    return lambda body, ctx: not body.get_pressure() or not body.get_pressure() / PRESSURE_UNIT < value
+
+
+def _compile_volcanism(value: Any) -> Predicate:
+    if isinstance(value, list):
+        exact = frozenset(volc_type[1:] for volc_type in value if volc_type.startswith('='))
+        partial = tuple(volc_type for volc_type in value if not volc_type.startswith('='))
+
+        def test(body: PlanetData, ctx: SystemContext) -> bool:
+            volcanism = body.get_volcanism()
+            return volcanism in exact or any(volc_type in volcanism for volc_type in partial)
+
+        return test
+    if value == 'Any':
+        return lambda body, ctx: body.get_volcanism() != ''
+    if value == 'None':
+        return lambda body, ctx: body.get_volcanism() == ''
+    if value.startswith('!'):  # 'not' values assume there must be some volcanism
+        excluded = value[1:]
+        return lambda body, ctx: body.get_volcanism() != '' and excluded not in body.get_volcanism()
+    return lambda body, ctx: True
+
+
+def _compile_body_type(value: list[str]) -> Predicate:
+    body_types = frozenset(value)
+    return lambda body, ctx: body.get_type() in body_types
+
+
+def _compile_regions(value: list[str]) -> Predicate:
+    exclude_mask = 0
+    include_mask = 0
+    for region in value:
+        if region.startswith('!'):
+            exclude_mask |= region_masks[region[1:]]
+        else:
+            include_mask |= region_masks[region]
+    if not any(not region.startswith('!') for region in value):
+        include_mask = -1  # No positive regions, so any region not excluded passes
+
+    def test(body: PlanetData, ctx: SystemContext) -> bool:
+        region_bit = ctx.region_bit
+        return region_bit == 0 or (region_bit & exclude_mask == 0 and region_bit & include_mask != 0)
+
+    return test
+
+
+def _compile_guardian(value: bool) -> Predicate:
+    if not value:
+        return lambda body, ctx: True
+    return lambda body, ctx: ctx.in_guardian_zone
+
+
+def _compile_tuber(value: Any) -> Predicate:
+    zones = frozenset(zone for zone in tuber_zones if value == 'Any' or zone in value)
+    return lambda body, ctx: not zones.isdisjoint(ctx.tuber_zones)
+
+
+def _compile_bodies(value: list[str]) -> Predicate:
+    body_types = frozenset(value)
+    key = ('bodies', repr(value))
+    return lambda body, ctx: ctx.body_fact(
+        key, lambda context: any(planet.get_type() in body_types for planet in context.planets.values()))
+
+
+def _compile_main_star(value: Any) -> Predicate:
+    plain_mask, luminosity_specs = _compile_star_specs(tuple(value) if isinstance(value, list) else (value,))
+    key = ('main_star', repr(value))
+
+    def compute(ctx: SystemContext) -> bool:
+        return _star_specs_match(plain_mask, luminosity_specs, ctx.main_star_mask, ctx.main_star_luminosity)
+
+    return lambda body, ctx: ctx.fact(key, compute)
+
+
+def _compile_parent_star(value: list[str]) -> Predicate:
+    mask = queries_mask(value)
+
+    def test(body: PlanetData, ctx: SystemContext) -> bool:
+        if ctx.main_star_mask & mask:
+            return True
+        star_masks = ctx.star_masks
+        return any(star_masks[star] & mask for star in body.get_parent_stars() if star in star_masks)
+
+    return test
+
+
+def _compile_star(value: Any) -> Predicate:
+    plain_mask, luminosity_specs = _compile_star_specs(tuple(value) if isinstance(value, list) else (value,))
+    key = ('star', repr(value))
+
+    def compute(ctx: SystemContext) -> bool:
+        if ctx.system_star_mask & plain_mask:
+            return True
+        if not luminosity_specs:
+            return False
+        return any(_star_specs_match(0, luminosity_specs, ctx.star_masks[name], star.get_luminosity())
+                   for name, star in ctx.stars.items())
+
+    return lambda body, ctx: ctx.fact(key, compute)
+
+
+def _compile_nebula(value: str) -> Predicate:
+    all_nebulae = value == 'all'
+
+    def test(body: PlanetData, ctx: SystemContext) -> bool:
+        if not ctx.system.x or ctx.in_nebula_sector or ctx.near_nebula:
+            return True
+        return all_nebulae and ctx.near_planetary_nebula
+
+    return test
+
+
+def _compile_distance(value: float) -> Predicate:
+    return lambda body, ctx: not body.get_distance() < value
+
+
+def _compile_system(value: str) -> Predicate:
+    return lambda body, ctx: ctx.system.name == value
+
+
+def compile_rule(kind: str, value: Any) -> Rule | None:
+    """
+    Compile a single ruleset entry into a rule object.
+
+    :param kind: The ruleset key
+    :param value: The ruleset value
+    :return: The compiled rule, or None if the key isn't a recognized rule type
+    """
+
+    match kind:
+        case 'atmosphere':
+            return Rule(kind, value, _compile_atmosphere(value), f'Eliminated for atmos (not in {value})')
+        case 'atmosphere_component':
+            return Rule(kind, value, _compile_atmosphere_component(value), 'Eliminated for lack of gas in atmosphere')
+        case 'max_gravity':
+            return Rule(kind, value, _compile_gravity(value, True), 'Eliminated for high grav')
+        case 'min_gravity':
+            return Rule(kind, value, _compile_gravity(value, False), 'Eliminated for low grav')
+        case 'max_temperature':
+            return Rule(kind, value, _compile_temperature(value, True), 'Eliminated for high heat')
+        case 'min_temperature':
+            return Rule(kind, value, _compile_temperature(value, False), 'Eliminated for low heat')
+        case 'max_pressure':
+            return Rule(kind, value, _compile_pressure(value, True), 'Eliminated for high pressure')
+        case 'min_pressure':
+            return Rule(kind, value, _compile_pressure(value, False), 'Eliminated for low pressure')
+        case 'max_orbital_period':
+            return Rule(kind, value, lambda body, ctx: not body.get_orbital_period() >= value,
+                        'Eliminated for high orbital period')
+        case 'volcanism':
+            return Rule(kind, value, _compile_volcanism(value), f'Eliminated for volcanism (requires {value})')
+        case 'body_type':
+            return Rule(kind, value, _compile_body_type(value), 'Eliminated for body type')
+        case 'regions':
+            return Rule(kind, value, _compile_regions(value), 'Eliminated by region')
+        case 'guardian':
+            return Rule(kind, value, _compile_guardian(value), 'Eliminated for not being in a guardian zone')
+        case 'tuber':
+            return Rule(kind, value, _compile_tuber(value), 'Eliminated for not being in a tuber zone')
+        case 'bodies':
+            return Rule(kind, value, _compile_bodies(value), 'Eliminated for missing body type(s)')
+        case 'main_star':
+            return Rule(kind, value, _compile_main_star(value), 'Eliminated for star type')
+        case 'parent_star':
+            return Rule(kind, value, _compile_parent_star(value), 'Eliminated for star type')
+        case 'star':
+            return Rule(kind, value, _compile_star(value), 'Eliminated for star type')
+        case 'nebula':
+            return Rule(kind, value, _compile_nebula(value), 'Eliminated for lack of nebula')
+        case 'distance':
+            return Rule(kind, value, _compile_distance(value), 'Eliminated for distance from arrival')
+        case 'system':
+            return Rule(kind, value, _compile_system(value), 'Eliminated for system name')
+    return None
+
+
+def compile_ruleset(ruleset: Mapping[str, Any]) -> tuple[Rule, ...]:
+    """
+    Compile a ruleset dict into a flat tuple of rules, ordered from cheapest to most expensive.
+    Unrecognized keys are dropped, matching the behavior of the original rule interpreter.
+
+    :param ruleset: A single ruleset from the species rules
+    :return: Tuple of compiled rules
+    """
+
+    compiled = [rule for rule in (compile_rule(kind, value) for kind, value in ruleset.items()) if rule is not None]
+    return tuple(sorted(compiled, key=lambda rule: RULE_COST[rule.kind]))
+
+
+def compile_rules(rules: Mapping[str, Mapping[str, Mapping]]) -> dict[str, dict[str, tuple[tuple[Rule, ...], ...]]]:
+    """
+    Compile the full species rule catalog.
+
+    :param rules: The genus -> species -> species data mapping
+    :return: Mapping of genus -> species -> tuple of compiled rulesets
+    """
+
+    return {
+        genus: {
+            species: tuple(compile_ruleset(ruleset) for ruleset in data['rulesets'])
+            for species, data in species_data.items()
+        }
+        for genus, species_data in rules.items()
+    }
+
+
+def first_failure(ruleset: tuple[Rule, ...], body: PlanetData, ctx: SystemContext) -> Rule | None:
+    """
+    Run a compiled ruleset against a body.
+
+    :param ruleset: The compiled ruleset
+    :param body: The planet data to test
+    :param ctx: System context for the body
+    :return: The first rule the body failed, or None if the body passed every rule
+    """
+
+    for rule in ruleset:
+        if not rule.test(body, ctx):
+            return rule
+    return None
+
+
+def rule_dependencies(species_data: Mapping[str, tuple[tuple[Rule, ...], ...]]) -> frozenset[str]:
+    """
+    Collect the external data a genus' compiled rulesets depend on.
+
+    :param species_data: Mapping of species -> compiled rulesets for a single genus
+    :return: Set of dependency names from RULE_DEPENDENCIES
+    """
+
+    return frozenset(
+        RULE_DEPENDENCIES[rule.kind]
+        for rulesets in species_data.values() for ruleset in rulesets for rule in ruleset
+        if rule.kind in RULE_DEPENDENCIES
+    )
+
+
+compiled_rules = compile_rules(bio_types)
+genus_dependencies: dict[str, frozenset[str]] = {
+    genus: rule_dependencies(species_data) for genus, species_data in compiled_rules.items()
+}
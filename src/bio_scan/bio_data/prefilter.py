@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Iterable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ExploData.explo_data.body_data.struct import PlanetData
+
+from bio_scan.bio_data.predicates import Rule, compiled_rules, GRAVITY_UNIT, PRESSURE_UNIT
+
+# Rule types resolved by the index
+INDEX_KINDS = frozenset({
+    'atmosphere', 'body_type', 'min_gravity', 'max_gravity', 'min_temperature', 'max_temperature', 'min_pressure',
+    'max_pressure', 'max_orbital_period', 'distance'
+})
+
+RulesetKey = tuple[str, str, int]
+# Candidate species for a genus, in catalog order, with the indexes of their candidate rulesets
+GenusCandidates = tuple[tuple[str, tuple[int, ...]], ...]
+
+OTHER = None  # Index key for atmospheres and body types not named by any ruleset
+
+_catalog: dict[RulesetKey, tuple[Rule, ...]] = {
+    (genus, species, index): ruleset
+    for genus, species_data in compiled_rules.items()
+    for species, rulesets in species_data.items()
+    for index, ruleset in enumerate(rulesets)
+}
+_catalog_order: dict[RulesetKey, int] = {key: position for position, key in enumerate(_catalog)}
+
+
+def _build_indexes() -> tuple[dict[str | None, set[RulesetKey]], dict[str | None, set[RulesetKey]]]:
+    """
+    Build the inverted indexes of atmosphere and body type to the rulesets which allow them.
+
+    :return: The atmosphere index and the body type index. Each index has an OTHER entry for values not named by any
+     ruleset.
+    """
+
+    atmospheres: set[str] = {'', 'None'}
+    body_types: set[str] = set()
+    for ruleset in _catalog.values():
+        for rule in ruleset:
+            if rule.kind == 'atmosphere' and rule.value != 'Any':
+                atmospheres.update(rule.value)
+            elif rule.kind == 'body_type':
+                body_types.update(rule.value)
+
+    by_atmosphere: dict[str | None, set[RulesetKey]] = {atmosphere: set() for atmosphere in [*atmospheres, OTHER]}
+    by_body_type: dict[str | None, set[RulesetKey]] = {body_type: set() for body_type in [*body_types, OTHER]}
+    for key, ruleset in _catalog.items():
+        rules = {rule.kind: rule.value for rule in ruleset if rule.kind in ('atmosphere', 'body_type')}
+        if 'atmosphere' not in rules:
+            allowed_atmospheres = by_atmosphere.keys()
+        elif rules['atmosphere'] == 'Any':  # Any atmosphere at all, including ones no ruleset names
+            allowed_atmospheres = by_atmosphere.keys() - {'', 'None'}
+        else:
+            allowed_atmospheres = rules['atmosphere']
+        for atmosphere in allowed_atmospheres:
+            by_atmosphere[atmosphere].add(key)
+        for body_type in rules.get('body_type', by_body_type.keys()):
+            by_body_type[body_type].add(key)
+    return by_atmosphere, by_body_type
+
+
+class RangeIndex:
+    """
+    Stabbing query index over one numeric bound of a bucket of rulesets. The lower and upper bounds are kept as sorted
+    endpoint arrays, each with cumulative bitsets of the rulesets they admit, so a query is two binary searches and a
+    bitwise AND.
+    """
+
+    def __init__(self, bounds: list[tuple[float, float]], upper_inclusive: bool = True):
+        """
+        Constructor.
+
+        :param bounds: (lower, upper) bounds of each ruleset in the bucket. Missing bounds should be infinite.
+        :param upper_inclusive: Whether a value equal to the upper bound passes
+        """
+
+        self.upper_inclusive = upper_inclusive
+        by_lower = sorted(range(len(bounds)), key=lambda item: bounds[item][0])
+        self.lowers = [bounds[item][0] for item in by_lower]
+        # lower_masks[n] holds the rulesets with the n smallest lower bounds
+        self.lower_masks = [0]
+        for item in by_lower:
+            self.lower_masks.append(self.lower_masks[-1] | 1 << item)
+        by_upper = sorted(range(len(bounds)), key=lambda item: bounds[item][1])
+        self.uppers = [bounds[item][1] for item in by_upper]
+        # upper_masks[n] holds the rulesets from the nth smallest upper bound on
+        self.upper_masks = [0]
+        for item in reversed(by_upper):
+            self.upper_masks.append(self.upper_masks[-1] | 1 << item)
+        self.upper_masks.reverse()
+
+    def stab(self, value: float) -> int:
+        """
+        Find the rulesets whose bounds admit a value.
+
+        :param value: The body's value
+        :return: Bitset over the bucket of the rulesets which pass
+        """
+
+        below = bisect_right(self.lowers, value)
+        above = bisect_left(self.uppers, value) if self.upper_inclusive else bisect_right(self.uppers, value)
+        return self.lower_masks[below] & self.upper_masks[above]
+
+
+class Bucket:
+    """
+    Rulesets allowing a given atmosphere and body type, with range indexes over their numeric bounds.
+    """
+
+    def __init__(self, keys: list[RulesetKey]):
+        """
+        Constructor.
+
+        :param keys: The rulesets in the bucket, in catalog order
+        """
+
+        self.keys = keys
+        self.all = (1 << len(keys)) - 1
+        bounds = [self._bounds(_catalog[key]) for key in keys]
+        inf = float('inf')
+        self.gravity = RangeIndex([item['gravity'] for item in bounds])
+        self.temperature = RangeIndex([item['temperature'] for item in bounds])
+        self.pressure = RangeIndex([item['pressure'] for item in bounds], upper_inclusive=False)
+        self.orbital_period = RangeIndex([(-inf, item['max_orbital_period']) for item in bounds],
+                                         upper_inclusive=False)
+        self.distance = RangeIndex([(item['distance'], inf) for item in bounds])
+
+    @staticmethod
+    def _bounds(ruleset: tuple[Rule, ...]) -> dict:
+        values = {rule.kind: float(rule.value) for rule in ruleset if rule.kind in INDEX_KINDS
+                  and rule.kind not in ('atmosphere', 'body_type')}
+        inf = float('inf')
+        return {
+            'gravity': (values.get('min_gravity', -inf), values.get('max_gravity', inf)),
+            'temperature': (values.get('min_temperature', -inf), values.get('max_temperature', inf)),
+            'pressure': (values.get('min_pressure', -inf), values.get('max_pressure', inf)),
+            'max_orbital_period': values.get('max_orbital_period', inf),
+            'distance': values.get('distance', -inf),
+        }
+
+    def query(self, body: PlanetData) -> list[RulesetKey]:
+        """
+        Find the rulesets in the bucket whose numeric bounds admit the body. Missing values pass, as with the
+        scalar rules.
+
+        :param body: The planet data
+        :return: Surviving rulesets, in catalog order
+        """
+
+        mask = self.all
+        for index, value in (
+            (self.gravity, body.get_gravity() / GRAVITY_UNIT if body.get_gravity() is not None else None),
+            (self.temperature, body.get_temp() or None),
+            (self.pressure, body.get_pressure() / PRESSURE_UNIT if body.get_pressure() else None),
+            (self.orbital_period, body.get_orbital_period()),
+            (self.distance, body.get_distance()),
+        ):
+            if value is not None and value == value:  # Skip missing and NaN values
+                mask &= index.stab(value)
+        keys: list[RulesetKey] = []
+        while mask:
+            low_bit = mask & -mask
+            keys.append(self.keys[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return keys
+
+
+_by_atmosphere, _by_body_type = _build_indexes()
+_buckets: dict[tuple[str | None, str | None], Bucket] = {}
+
+residual_rules: dict[str, dict[str, tuple[tuple[Rule, ...], ...]]] = {
+    genus: {
+        species: tuple(tuple(rule for rule in ruleset if rule.kind not in INDEX_KINDS) for ruleset in rulesets)
+        for species, rulesets in species_data.items()
+    }
+    for genus, species_data in compiled_rules.items()
+}
+
+
+def group(keys: Iterable[RulesetKey]) -> dict[str, GenusCandidates]:
+    """
+    Group a set of rulesets by genus and species, in catalog order.
+
+    :param keys: (genus, species, ruleset index) triples
+    :return: Mapping of genus to its candidate species and ruleset indexes. Genera with no candidates are omitted.
+    """
+
+    grouped: dict[str, dict[str, list[int]]] = {}
+    for genus, species, index in sorted(keys, key=_catalog_order.__getitem__):
+        grouped.setdefault(genus, {}).setdefault(species, []).append(index)
+    return {
+        genus: tuple((species, tuple(indexes)) for species, indexes in species_data.items())
+        for genus, species_data in grouped.items()
+    }
+
+
+def candidates(body: PlanetData) -> dict[str, GenusCandidates]:
+    """
+    Find the rulesets which allow a body's atmosphere, body type, and numeric properties. The atmosphere and body type
+    select a bucket of rulesets, cached per pair, whose range indexes are then queried with the body's gravity,
+    temperature, pressure, orbital period and distance. The remaining rules for each candidate ruleset are found in
+    residual_rules.
+
+    :param body: The planet data
+    :return: Mapping of genus to its candidate species and ruleset indexes. Genera with no candidates are omitted.
+    """
+
+    atmosphere = body.get_atmosphere()
+    atmosphere = atmosphere if atmosphere in _by_atmosphere else OTHER
+    body_type = body.get_type()
+    body_type = body_type if body_type in _by_body_type else OTHER
+    if (atmosphere, body_type) not in _buckets:
+        keys = _by_atmosphere[atmosphere] & _by_body_type[body_type]
+        _buckets[(atmosphere, body_type)] = Bucket(sorted(keys, key=_catalog_order.__getitem__))
+    return group(_buckets[(atmosphere, body_type)].query(body))
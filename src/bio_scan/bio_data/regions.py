@@ -1,3 +1,5 @@
+from typing import Iterable
+
 region_map: dict[str, list[int]] = {
     'orion-cygnus': [1, 4, 7, 8, 16, 17, 18, 35],
     'orion-cygnus-1': [4, 7, 8, 16, 17, 18, 35],
@@ -19,6 +21,23 @@ region_map: dict[str, list[int]] = {
     'center': [1, 2, 3]
 }
 
+
+def region_bits(regions: Iterable[int]) -> int:
+    """
+    Fold a list of galactic region IDs into a bitset.
+
+    :param regions: Galactic region IDs
+    :return: Bitset with bit N set for region N
+    """
+
+    mask = 0
+    for region in regions:
+        mask |= 1 << region
+    return mask
+
+
+region_masks: dict[str, int] = {name: region_bits(regions) for name, regions in region_map.items()}
+
 guardian_nebulae: dict[str, tuple[int, tuple[float, float, float]]] = {
     'Hen 2-333': (750, (-840.65625, -561.15625, 13361.8125)),
     'Gamma Velorum': (750, (1099.21875, -146.6875, -133.59375)),
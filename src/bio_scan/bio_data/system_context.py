@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import math
+from functools import cached_property
+from typing import Callable, Hashable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ExploData.explo_data.db import System
+    from ExploData.explo_data.body_data.struct import PlanetData, StarData
+
+from bio_scan.bio_data.regions import guardian_nebulae, tuber_zones
+from bio_scan.body_data.star_class import type_mask
+from bio_scan.nebula_data.reference_stars import nebula_within
+from bio_scan.nebula_data.sectors import data as nebula_sectors
+
+
+class SystemContext:
+    """
+    System-level state used by the species rule predicates.
+
+    Facts which only depend on the system and its stars (zone memberships, nebula proximity, star rule results) are
+    computed on first use and kept for the life of the context. The context must be rebuilt whenever the system or its
+    star data changes. Facts derived from the system's planets are cleared separately with invalidate_bodies(), and
+    facts about a single planet with invalidate_body().
+    """
+
+    def __init__(self, system: System | None, stars: dict[str, StarData], planets: dict[str, PlanetData],
+                 main_star_type: str = '', main_star_luminosity: str = '', main_star_name: str = ''):
+        """
+        Constructor.
+
+        :param system: The current system
+        :param stars: Star data for the system, keyed by short body name
+        :param planets: Planet data for the system, keyed by short body name
+        :param main_star_type: ED journal type of the arrival star
+        :param main_star_luminosity: Luminosity class of the arrival star
+        :param main_star_name: Short name of the arrival star
+        """
+
+        self.system = system
+        self.stars = stars
+        self.planets = planets
+        self.main_star_type = main_star_type
+        self.main_star_luminosity = main_star_luminosity
+        self.main_star_name = main_star_name
+        self._facts: dict[Hashable, bool] = {}
+        self._body_facts: dict[Hashable, bool] = {}
+        self._color_stars: dict[str, tuple[tuple[StarData, ...], tuple[StarData, ...]]] = {}
+
+    def fact(self, key: Hashable, compute: Callable[['SystemContext'], bool]) -> bool:
+        """
+        Get a memoized system-level fact.
+
+        :param key: Unique key for the fact, typically the rule type and value
+        :param compute: Function to compute the fact from this context on first use
+        :return: The fact value
+        """
+
+        if key not in self._facts:
+            self._facts[key] = compute(self)
+        return self._facts[key]
+
+    def body_fact(self, key: Hashable, compute: Callable[['SystemContext'], bool]) -> bool:
+        """
+        Get a memoized fact derived from the set of planets in the system. Cleared by invalidate_bodies().
+
+        :param key: Unique key for the fact, typically the rule type and value
+        :param compute: Function to compute the fact from this context on first use
+        :return: The fact value
+        """
+
+        if key not in self._body_facts:
+            self._body_facts[key] = compute(self)
+        return self._body_facts[key]
+
+    def invalidate_bodies(self) -> None:
+        """ Clear facts derived from the system's planets. Required when a planet is added or updated. """
+
+        self._body_facts.clear()
+
+    def invalidate_body(self, name: str) -> None:
+        """ Clear facts about a single planet. Required when that planet is added or updated. """
+
+        self._color_stars.pop(name, None)
+
+    @property
+    def location(self) -> tuple[float, float, float]:
+        return self.system.x, self.system.y, self.system.z
+
+    @cached_property
+    def region_bit(self) -> int:
+        """ Bit for the system's galactic region in the region bitsets, or 0 if the region is unknown """
+
+        return 1 << self.system.region if self.system.region is not None else 0
+
+    @cached_property
+    def in_guardian_zone(self) -> bool:
+        return any(math.dist(self.location, coordinates) < max_distance
+                   for max_distance, coordinates in guardian_nebulae.values())
+
+    @cached_property
+    def tuber_zones(self) -> frozenset[str]:
+        """ Names of all tuber zones the system lies within """
+
+        zones: set[str] = set()
+        for zone, ((min_distance, max_distance), coordinates) in tuber_zones.items():
+            if min_distance <= math.dist(self.location, coordinates) <= max_distance:
+                zones.add(zone)
+        return frozenset(zones)
+
+    @cached_property
+    def in_nebula_sector(self) -> bool:
+        return self.system.name.startswith(tuple(nebula_sectors))
+
+    @cached_property
+    def near_nebula(self) -> bool:
+        return nebula_within(self.location, 150.0)
+
+    @cached_property
+    def near_planetary_nebula(self) -> bool:
+        return nebula_within(self.location, 100.0, 'planetary')
+
+    @cached_property
+    def main_star_mask(self) -> int:
+        """ Star class bitmask of the arrival star """
+
+        return type_mask(self.main_star_type)
+
+    @cached_property
+    def star_masks(self) -> dict[str, int]:
+        """ Star class bitmasks of all stars in the system, keyed by short body name """
+
+        return {name: type_mask(star.get_type()) for name, star in self.stars.items()}
+
+    @cached_property
+    def system_star_mask(self) -> int:
+        """ Combined star class bitmask of all stars in the system """
+
+        mask = 0
+        for star_mask in self.star_masks.values():
+            mask |= star_mask
+        return mask
+
+    @cached_property
+    def black_holes(self) -> frozenset[str]:
+        """ Names of all black holes in the system """
+
+        return frozenset(name for name, star in self.stars.items() if star.get_type() == 'H')
+
+    def orbits_black_hole(self, star_name: str, body_name: str) -> bool:
+        """
+        Checks if a body orbits a star which in turn has a black hole parent. Bios nearly always base their color on
+        the parent star, but when the parent star is a black hole, the orbiting stars can provide color instead.
+
+        :param star_name: The star to check for a parent black hole
+        :param body_name: The body to ensure the star is a valid parent star
+        :return: True if the star has a parent black hole and the body is orbiting it
+        """
+
+        if star_name == self.system.name or not body_name.startswith(star_name + ' '):
+            return False
+        if self.main_star_name == self.system.name:
+            return self.main_star_type == 'H'
+        star_parts = star_name.split(' ')
+        if len(star_parts[0]) > 1:  # Barycentre, check each member star
+            return not self.black_holes.isdisjoint(star_parts[0])
+        return star_parts[0] in self.black_holes
+
+    def color_stars(self, body: PlanetData) -> tuple[tuple[StarData, ...], tuple[StarData, ...]]:
+        """
+        Get the stars which may provide color for a body. Cached per body until invalidate_body() is run.
+
+        :param body: The planet data
+        :return: The body's known parent stars in order, and the other stars which may provide color: the arrival star
+         and stars orbiting a black hole which the body orbits
+        """
+
+        name = body.get_name()
+        if name not in self._color_stars:
+            parents = body.get_parent_stars()
+            parent_stars = tuple(self.stars[star] for star in parents if star in self.stars)
+            other_stars = tuple(
+                star for star_name, star in self.stars.items()
+                if star_name not in parents and (star.get_distance() == 0 or self.orbits_black_hole(star_name, name))
+            )
+            self._color_stars[name] = (parent_stars, other_stars)
+        return self._color_stars[name]
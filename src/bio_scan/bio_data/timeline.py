@@ -0,0 +1,125 @@
+from bisect import bisect_right, insort
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ExploData.explo_data.db import Death, Resurrection, ExoBioSale
+
+# Resurrection types which forfeit unsold exobiology data
+DATA_LOSS_RESURRECTIONS = ('escape', 'recover', 'rejoin')
+
+
+class DataLossTimeline:
+    """
+    Sorted timestamps of a commander's deaths, data-losing resurrections, and exobiology sales.
+    Used to determine if a completed scan was sold or lost without querying the database per scan.
+    """
+
+    def __init__(self):
+        self.commander_id: int | None = None
+        self.deaths: list[datetime] = []
+        self.resurrections: list[datetime] = []
+        self.sales: list[datetime] = []
+
+    def load(self, session: Session, commander_id: int) -> None:
+        """
+        Load the full timeline for a commander.
+
+        :param session: The database session
+        :param commander_id: The commander ID
+        """
+
+        self.commander_id = commander_id
+        self.deaths = []
+        self.resurrections = []
+        self.sales = []
+        self.refresh(session)
+
+    def refresh(self, session: Session) -> None:
+        """
+        Add any events newer than the most recent known event of each type.
+
+        :param session: The database session
+        """
+
+        if self.commander_id is None:
+            return
+
+        stmt = select(Death.died_at).where(Death.commander_id == self.commander_id)
+        if self.deaths:
+            stmt = stmt.where(Death.died_at > self.deaths[-1])
+        self._merge(self.deaths, session.scalars(stmt).all())
+
+        stmt = select(Resurrection.resurrected_at).where(Resurrection.commander_id == self.commander_id) \
+            .where(Resurrection.type.in_(DATA_LOSS_RESURRECTIONS))
+        if self.resurrections:
+            stmt = stmt.where(Resurrection.resurrected_at > self.resurrections[-1])
+        self._merge(self.resurrections, session.scalars(stmt).all())
+
+        stmt = select(ExoBioSale.sold_at).where(ExoBioSale.commander_id == self.commander_id)
+        if self.sales:
+            stmt = stmt.where(ExoBioSale.sold_at > self.sales[-1])
+        self._merge(self.sales, session.scalars(stmt).all())
+
+    @staticmethod
+    def _merge(timeline: list[datetime], timestamps: list[datetime | None]) -> None:
+        for timestamp in timestamps:
+            if timestamp is not None:
+                insort(timeline, timestamp)
+
+    @staticmethod
+    def _next(timeline: list[datetime], after: datetime) -> datetime | None:
+        index = bisect_right(timeline, after)
+        return timeline[index] if index < len(timeline) else None
+
+    def last_cutoff(self) -> datetime:
+        """
+        Get the time after which completed scans are still unsold. The last data loss is the most recent death, or the
+        most recent data-losing resurrection if there were no deaths, as a death takes precedence. The cutoff is the
+        later of the last data loss and the most recent sale. A sale and a death with the same timestamp give that
+        timestamp either way.
+
+        :return: The cutoff time, or datetime.min if there are no events
+        """
+
+        last_loss = self.deaths[-1] if self.deaths else self.resurrections[-1] if self.resurrections else datetime.min
+        last_sale = self.sales[-1] if self.sales else datetime.min
+        return last_loss if last_loss > last_sale else last_sale
+
+    def next_loss(self, after: datetime) -> datetime | None:
+        """
+        Find the first data loss event after a given time.
+
+        :param after: The start time (exclusive)
+        :return: The time of the next death or data-losing resurrection, or None if there wasn't one
+        """
+
+        losses = [timestamp for timestamp in (self._next(self.deaths, after), self._next(self.resurrections, after))
+                  if timestamp is not None]
+        return min(losses) if losses else None
+
+    def sold_between(self, start: datetime, end: datetime | None = None) -> bool:
+        """
+        Check for an exobiology sale within a time range.
+
+        :param start: The start time (exclusive)
+        :param end: The end time (exclusive), or None for no end
+        :return: True if there was a sale in the range
+        """
+
+        sale = self._next(self.sales, start)
+        return sale is not None and (end is None or sale < end)
+
+    def scan_status(self, scanned_at: datetime) -> tuple[bool, bool]:
+        """
+        Determine what happened to the data from a completed scan.
+
+        :param scanned_at: The time the scan was completed
+        :return: Tuple of whether the data was sold and whether the data was lost
+        """
+
+        lost_date = self.next_loss(scanned_at)
+        if self.sold_between(scanned_at, lost_date):
+            return True, False
+        return False, lost_date is not None
@@ -0,0 +1,45 @@
+class RuleTrace:
+    """
+    Records the species rule evaluation for each body and genus, so the reasons behind a prediction can be reviewed
+    without enabling debug logging.
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.bodies: dict[str, dict[str, list[str]]] = {}
+
+    def begin(self, body_name: str, genus: str) -> list[str] | None:
+        """
+        Start a new trace for a body and genus, replacing any previous trace.
+
+        :param body_name: The short name of the body
+        :param genus: The genus code
+        :return: The list to append trace lines to, or None if tracing is disabled
+        """
+
+        if not self.enabled:
+            return None
+        lines: list[str] = []
+        self.bodies.setdefault(body_name, {})[genus] = lines
+        return lines
+
+    def clear(self) -> None:
+        self.bodies.clear()
+
+    def format(self, body_name: str = '') -> str:
+        """
+        Format the recorded traces for display.
+
+        :param body_name: Optional body name to format the trace of a single body
+        :return: The trace text
+        """
+
+        text = ''
+        for name, genera in self.bodies.items():
+            if body_name and name != body_name:
+                continue
+            text += f'{name}:\n'
+            for lines in genera.values():
+                text += ''.join(f'  {line}\n' for line in lines)
+            text += '\n'
+        return text
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Mapping, TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from ExploData.explo_data.body_data.struct import PlanetData
+
+from bio_scan.bio_data.predicates import Rule, compiled_rules, GRAVITY_UNIT, PRESSURE_UNIT
+
+# Rule types fully covered by the vectorized filter
+VECTOR_KINDS = frozenset({
+    'atmosphere', 'body_type', 'min_gravity', 'max_gravity', 'min_temperature', 'max_temperature', 'min_pressure',
+    'max_pressure', 'max_orbital_period', 'distance', 'volcanism'
+})
+
+RulesetKey = tuple[str, str, int]
+
+
+def _vocabulary(values: Iterable[str], reserved: Iterable[str] = ()) -> dict[str, int]:
+    """
+    Build a bit index for a set of strings. Bit 0 is reserved for unknown values.
+
+    :param values: Strings to index
+    :param reserved: Additional strings which should always receive a bit
+    :return: Mapping of string to bit position
+    """
+
+    vocabulary: dict[str, int] = {}
+    for value in [*reserved, *sorted(set(values))]:
+        if value not in vocabulary:
+            vocabulary[value] = len(vocabulary) + 1
+    return vocabulary
+
+
+def _collect(kind: str) -> set[str]:
+    """
+    Collect every string referenced by the list-valued rules of a given type.
+
+    :param kind: Rule type
+    :return: Set of referenced strings. String-valued rules contribute their value without the '!' prefix.
+    """
+
+    collected: set[str] = set()
+    for species_data in compiled_rules.values():
+        for rulesets in species_data.values():
+            for ruleset in rulesets:
+                for rule in ruleset:
+                    if rule.kind != kind:
+                        continue
+                    if isinstance(rule.value, list):
+                        collected.update(rule.value)
+                    elif isinstance(rule.value, str) and rule.value.startswith('!'):
+                        collected.add(rule.value[1:])
+    return collected
+
+
+ATMOSPHERES = _vocabulary(_collect('atmosphere'), ('', 'None'))
+BODY_TYPES = _vocabulary(_collect('body_type'))
+# Volcanism terms are substring matches, except for '=' prefixed exact matches
+VOLCANISM_TERMS = _vocabulary(_collect('volcanism'))
+HAS_VOLCANISM = 0  # Bit 0 of the volcanism mask flags any volcanism at all
+
+MASK_BITS = 64
+ALL_BITS = (1 << MASK_BITS) - 1
+# Vocabulary bits are packed into uint64 masks. If a vocabulary outgrows them, only the scalar filter is used.
+FITS_MASKS = all(len(vocabulary) < MASK_BITS for vocabulary in (ATMOSPHERES, BODY_TYPES, VOLCANISM_TERMS))
+
+
+def _volcanism_mask(volcanism: str) -> int:
+    """
+    Encode a body's volcanism string as a bitmask over the ruleset volcanism terms.
+
+    :param volcanism: The body's volcanism string
+    :return: Volcanism term bitmask
+    """
+
+    if volcanism == '':
+        return 0
+    mask = 1 << HAS_VOLCANISM
+    for term, bit in VOLCANISM_TERMS.items():
+        if (volcanism == term[1:]) if term.startswith('=') else (term in volcanism):
+            mask |= 1 << bit
+    return mask
+
+
+def _ruleset_bounds(ruleset: tuple[Rule, ...]) -> dict[str, Any]:
+    """
+    Reduce the vectorizable rules of a compiled ruleset to numeric bounds and bitmasks.
+
+    :param ruleset: Compiled ruleset
+    :return: Bounds dictionary keyed by matrix column
+    """
+
+    bounds: dict[str, Any] = {
+        'min_gravity': -float('inf'), 'max_gravity': float('inf'),
+        'min_temperature': -float('inf'), 'max_temperature': float('inf'),
+        'min_pressure': -float('inf'), 'max_pressure': float('inf'),
+        'max_orbital_period': float('inf'), 'distance': -float('inf'),
+        'atmosphere': ALL_BITS, 'body_type': ALL_BITS,
+        'volcanism_any': 0, 'volcanism_all': 0, 'volcanism_none': 0
+    }
+    for rule in ruleset:
+        match rule.kind:
+            case 'atmosphere':
+                if rule.value == 'Any':
+                    bounds['atmosphere'] = ALL_BITS & ~(1 << ATMOSPHERES['']) & ~(1 << ATMOSPHERES['None'])
+                else:
+                    bounds['atmosphere'] = sum(1 << ATMOSPHERES[atmosphere] for atmosphere in set(rule.value))
+            case 'body_type':
+                bounds['body_type'] = sum(1 << BODY_TYPES[body_type] for body_type in set(rule.value))
+            case 'volcanism':
+                if isinstance(rule.value, list):
+                    bounds['volcanism_any'] = sum(1 << VOLCANISM_TERMS[term] for term in set(rule.value))
+                elif rule.value == 'Any':
+                    bounds['volcanism_all'] = 1 << HAS_VOLCANISM
+                elif rule.value == 'None':
+                    bounds['volcanism_none'] = 1 << HAS_VOLCANISM
+                elif rule.value.startswith('!'):
+                    bounds['volcanism_all'] = 1 << HAS_VOLCANISM
+                    bounds['volcanism_none'] = 1 << VOLCANISM_TERMS[rule.value[1:]]
+            case 'min_gravity' | 'max_gravity' | 'min_temperature' | 'max_temperature' | 'min_pressure' | \
+                 'max_pressure' | 'max_orbital_period' | 'distance':
+                bounds[rule.kind] = float(rule.value)
+    return bounds
+
+
+def _build_matrix() -> tuple[list[RulesetKey], dict[str, Any]]:
+    keys: list[RulesetKey] = []
+    columns: dict[str, list] = {}
+    for genus, species_data in compiled_rules.items():
+        for species, rulesets in species_data.items():
+            for index, ruleset in enumerate(rulesets):
+                keys.append((genus, species, index))
+                for column, value in _ruleset_bounds(ruleset).items():
+                    columns.setdefault(column, []).append(value)
+    matrix = {
+        column: np.array(values, dtype=np.uint64 if isinstance(values[0], int) else np.float64)
+        for column, values in columns.items()
+    }
+    return keys, matrix
+
+
+residual_rules: dict[str, dict[str, tuple[tuple[Rule, ...], ...]]] = {
+    genus: {
+        species: tuple(tuple(rule for rule in ruleset if rule.kind not in VECTOR_KINDS) for ruleset in rulesets)
+        for species, rulesets in species_data.items()
+    }
+    for genus, species_data in compiled_rules.items()
+}
+
+
+def available() -> bool:
+    """
+    Check for the optional NumPy dependency, and that the rule vocabularies fit the uint64 masks.
+
+    :return: True if NumPy is installed and the vectorized filter can be used
+    """
+
+    return np is not None and FITS_MASKS
+
+
+if available():
+    _ruleset_keys, _matrix = _build_matrix()
+else:
+    _ruleset_keys, _matrix = [], {}
+
+
+def _pack_bodies(bodies: list[PlanetData]) -> dict[str, Any]:
+    """
+    Pack planet data into a struct-of-arrays. Missing values are stored so they compare the same way the scalar
+    predicates treat them.
+
+    :param bodies: List of planets
+    :return: Dictionary of NumPy arrays, one entry per body
+    """
+
+    def number(value: float | None) -> float:
+        return float('nan') if value is None else float(value)
+
+    return {
+        'gravity': np.array([number(body.get_gravity()) for body in bodies], dtype=np.float64) / GRAVITY_UNIT,
+        'temperature': np.array([body.get_temp() or 0.0 for body in bodies], dtype=np.float64),
+        'pressure': np.array([body.get_pressure() or 0.0 for body in bodies], dtype=np.float64) / PRESSURE_UNIT,
+        'orbital_period': np.array([number(body.get_orbital_period()) for body in bodies], dtype=np.float64),
+        'distance': np.array([number(body.get_distance()) for body in bodies], dtype=np.float64),
+        'atmosphere': np.array([ATMOSPHERES.get(body.get_atmosphere(), 0) for body in bodies], dtype=np.uint64),
+        'body_type': np.array([BODY_TYPES.get(body.get_type(), 0) for body in bodies], dtype=np.uint64),
+        'volcanism': np.array([_volcanism_mask(body.get_volcanism()) for body in bodies], dtype=np.uint64),
+    }
+
+
+def filter_bodies(planets: Mapping[str, PlanetData]) -> dict[str, frozenset[RulesetKey]]:
+    """
+    Run the body-level rules of every ruleset against every planet at once. The planets are packed into a
+    struct-of-arrays and compared against the bounds of every ruleset in a handful of broadcast operations.
+
+    :param planets: Planet data, keyed by body name
+    :return: Mapping of body name to the set of (genus, species, ruleset index) triples that survived the body-level
+     rules. The remaining rules for those rulesets are found in residual_rules.
+    """
+
+    if not available() or not planets:
+        return {}
+
+    names = list(planets)
+    bodies = _pack_bodies([planets[name] for name in names])
+    m = _matrix
+    one = np.uint64(1)
+
+    gravity = bodies['gravity'][:, None]
+    passed = ~(gravity > m['max_gravity']) & ~(gravity < m['min_gravity'])
+    temperature = bodies['temperature'][:, None]
+    passed &= (temperature == 0) | (~(temperature > m['max_temperature']) & ~(temperature < m['min_temperature']))
+    pressure = bodies['pressure'][:, None]
+    passed &= (pressure == 0) | (~(pressure >= m['max_pressure']) & ~(pressure < m['min_pressure']))
+    passed &= ~(bodies['orbital_period'][:, None] >= m['max_orbital_period'])
+    passed &= ~(bodies['distance'][:, None] < m['distance'])
+    passed &= (np.left_shift(one, bodies['atmosphere'])[:, None] & m['atmosphere']) != 0
+    passed &= (np.left_shift(one, bodies['body_type'])[:, None] & m['body_type']) != 0
+    volcanism = bodies['volcanism'][:, None]
+    passed &= ((volcanism & m['volcanism_any']) != 0) | (m['volcanism_any'] == 0)
+    passed &= (volcanism & m['volcanism_all']) == m['volcanism_all']
+    passed &= (volcanism & m['volcanism_none']) == 0
+
+    survivors: dict[str, frozenset[RulesetKey]] = {}
+    for row, name in enumerate(names):
+        survivors[name] = frozenset(_ruleset_keys[column] for column in np.flatnonzero(passed[row]))
+    return survivors
@@ -0,0 +1,85 @@
+import math
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LatLong = tuple[float, float]
+
+# Below this many point pairs the NumPy call overhead outweighs the per-point math
+BATCH_THRESHOLD = 16
+
+
+def _distances_math(origin: LatLong, points: Sequence[LatLong], radius: float) -> list[float]:
+    phi_1 = math.radians(origin[0])
+    cos_phi_1 = math.cos(phi_1)
+    distances: list[float] = []
+    for latitude, longitude in points:
+        phi_2 = math.radians(latitude)
+        a = math.sin(math.radians(latitude - origin[0]) / 2.0) ** 2 + \
+            cos_phi_1 * math.cos(phi_2) * math.sin(math.radians(longitude - origin[1]) / 2.0) ** 2
+        distances.append(radius * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+    return distances
+
+
+def _bearings_math(origin: LatLong, points: Sequence[LatLong]) -> list[float]:
+    phi_1 = math.radians(origin[0])
+    sin_phi_1 = math.sin(phi_1)
+    cos_phi_1 = math.cos(phi_1)
+    bearings: list[float] = []
+    for latitude, longitude in points:
+        phi_2 = math.radians(latitude)
+        delta_lambda = math.radians(longitude - origin[1])
+        y = math.sin(delta_lambda) * math.cos(phi_2)
+        x = cos_phi_1 * math.sin(phi_2) - sin_phi_1 * math.cos(phi_2) * math.cos(delta_lambda)
+        bearings.append((math.degrees(math.atan2(y, x)) + 360) % 360)
+    return bearings
+
+
+def _haversine_np(lat_1: 'np.ndarray', long_1: 'np.ndarray', lat_2: 'np.ndarray', long_2: 'np.ndarray',
+                  radius: float) -> 'np.ndarray':
+    a = np.sin((lat_2 - lat_1) / 2.0) ** 2 + np.cos(lat_1) * np.cos(lat_2) * np.sin((long_2 - long_1) / 2.0) ** 2
+    return radius * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def distances(origin: LatLong, points: Sequence[LatLong], radius: float) -> list[float]:
+    """
+    Get the haversine distances from one position to many.
+
+    :param origin: The lat/long coordinates to measure from
+    :param points: The lat/long coordinates of the targets
+    :param radius: Planet radius (in meters)
+    :return: The distance to each target (in meters)
+    """
+
+    if np is None or len(points) < BATCH_THRESHOLD:
+        return _distances_math(origin, points, radius)
+    targets = np.radians(np.asarray(points, dtype=float))
+    lat_1, long_1 = math.radians(origin[0]), math.radians(origin[1])
+    return _haversine_np(lat_1, long_1, targets[:, 0], targets[:, 1], radius).tolist()
+
+
+def distances_and_bearings(origin: LatLong, points: Sequence[LatLong],
+                           radius: float) -> tuple[list[float], list[float]]:
+    """
+    Get the haversine distances and initial bearings from one position to many.
+
+    :param origin: The lat/long coordinates to measure from, typically the player's position
+    :param points: The lat/long coordinates of the targets
+    :param radius: Planet radius (in meters)
+    :return: The distance (in meters) and bearing (from 0-359) to each target
+    """
+
+    if np is None or len(points) < BATCH_THRESHOLD:
+        return _distances_math(origin, points, radius), _bearings_math(origin, points)
+    targets = np.radians(np.asarray(points, dtype=float))
+    lat_1, long_1 = math.radians(origin[0]), math.radians(origin[1])
+    lat_2, long_2 = targets[:, 0], targets[:, 1]
+    delta_lambda = long_2 - long_1
+    y = np.sin(delta_lambda) * np.cos(lat_2)
+    x = math.cos(lat_1) * np.sin(lat_2) - math.sin(lat_1) * np.cos(lat_2) * np.cos(delta_lambda)
+    bearings = (np.degrees(np.arctan2(y, x)) + 360) % 360
+    return _haversine_np(lat_1, long_1, lat_2, long_2, radius).tolist(), bearings.tolist()
+
@@ -0,0 +1,104 @@
+from typing import Iterable
+
+# Base star classes, in bit order. The bit table is fixed, so a star type mask never goes stale. Other star type
+# queries have no bit and are matched with star_check.
+STAR_CLASSES = ('O', 'B', 'A', 'F', 'G', 'K', 'M', 'L', 'T', 'Y', 'TTS', 'AeBe', 'W', 'C', 'S', 'MS', 'D', 'N', 'H',
+                'X', 'SupermassiveBlackHole')
+
+_query_bits: dict[str, int] = {star_class: bit for bit, star_class in enumerate(STAR_CLASSES)}
+_type_masks: dict[str, int] = {}
+
+
+def star_check(star_query: str, star_type: str) -> bool:
+    """
+    Check if the given star type string (by ED journal value) matches a base type identifier.
+
+    This is necessary because super giants have different type IDs from standard stars and certain star types have
+    variations with qualifiers where a basic equality comparison is insufficient.
+
+    :param star_query: Simple star type string (A, F, K, O, D, H, etc.)
+    :param star_type: ED journal type string for comparison star
+    :return: Whether the basic query type matches the ED journal type string
+    """
+
+    match star_query:
+        case 'A':
+            return star_type in ['A', 'A_BlueWhiteSuperGiant']
+        case 'B':
+            return star_type in ['B', 'B_BlueWhiteSuperGiant']
+        case 'F':
+            return star_type in ['F', 'F_WhiteSuperGiant']
+        case 'G':
+            return star_type in ['G', 'G_WhiteSuperGiant']
+        case 'K':
+            return star_type in ['K', 'K_OrangeGiant']
+        case 'M':
+            return star_type in ['M', 'M_RedGiant', 'M_RedSuperGiant']
+        case 'D' | 'C' | 'W':
+            return star_type.startswith(star_query)
+        case _:
+            return star_type == star_query
+
+
+def query_mask(star_query: str) -> int:
+    """
+    Get the class bitmask for a star type query.
+
+    :param star_query: Base star class, from STAR_CLASSES
+    :return: Bitmask with the single bit for the query
+    :raises ValueError: If the query is not a base star class
+    """
+
+    if star_query not in _query_bits:
+        raise ValueError(f'No star class bit for star type query {star_query!r}')
+    return 1 << _query_bits[star_query]
+
+
+def queries_mask(star_queries: Iterable[str]) -> int:
+    """
+    Get the combined class bitmask for several star type queries.
+
+    :param star_queries: Base star classes, from STAR_CLASSES
+    :return: Bitmask matching a star type satisfying any of the queries
+    """
+
+    mask = 0
+    for star_query in star_queries:
+        mask |= query_mask(star_query)
+    return mask
+
+
+def type_mask(star_type: str) -> int:
+    """
+    Normalize an ED journal star type into a class bitmask. A star type matches a query when
+    type_mask(star_type) & query_mask(star_query) is non-zero.
+
+    :param star_type: ED journal type string
+    :return: Bitmask of every base star class the star type satisfies
+    """
+
+    if not star_type:
+        return 0
+    if star_type not in _type_masks:
+        mask = 0
+        for star_query, bit in _query_bits.items():
+            if star_check(star_query, star_type):
+                mask |= 1 << bit
+        _type_masks[star_type] = mask
+    return _type_masks[star_type]
+
+
+def star_matches(star_query: str, star_type: str, star_mask: int) -> bool:
+    """
+    Check if a star matches a star type query, using the class bitmask for base star classes and star_check for any
+    other query.
+
+    :param star_query: Simple star type string (A, F, K, O, D, H, etc.)
+    :param star_type: ED journal type string of the star
+    :param star_mask: Class bitmask of the star, from type_mask(star_type)
+    :return: Whether the star satisfies the query
+    """
+
+    if star_query in _query_bits:
+        return bool(star_mask & 1 << _query_bits[star_query])
+    return star_check(star_query, star_type)
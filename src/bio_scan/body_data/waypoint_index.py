@@ -0,0 +1,133 @@
+import math
+from typing import Iterator, Mapping
+
+from bio_scan.body_data import geodesy
+from bio_scan.body_data.geodesy import LatLong
+
+Cell = tuple[int, int, int]
+
+DEFAULT_CLONAL_DISTANCE = 100.0
+
+
+class _Tag:
+    __slots__ = ('lat_long', 'excluded')
+
+    def __init__(self, lat_long: LatLong, excluded: bool):
+        self.lat_long = lat_long
+        self.excluded = excluded
+
+
+class WaypointIndex:
+    """
+    Spatial index of a commander's waypoints on one body. Points are bucketed by their position on the unit sphere,
+    in cells at least as wide as the largest clonal distance, so sample sites are only ever compared against the
+    waypoints in neighbouring cells. Tags within the clonal distance of a sample site of the same genus are excluded
+    as they are added, so queries never compare tags against sample sites.
+    """
+
+    def __init__(self, body: str, radius: float, clonal_distances: Mapping[str, float]):
+        """
+        :param body: Body name
+        :param radius: Planet radius (in meters)
+        :param clonal_distances: Minimum distance between samples for each genus (in meters)
+        """
+
+        self.body = body
+        self.radius = radius
+        self._clonal_distances = clonal_distances
+        # Points within a clonal distance are at most this far apart on the unit sphere
+        self._cell_size = max(DEFAULT_CLONAL_DISTANCE, *clonal_distances.values()) / radius if radius else 2.0
+        self._scans: dict[str, dict[Cell, list[LatLong]]] = {}
+        self._scan_sites: dict[str, list[LatLong]] = {}
+        self._tags: dict[str, list[_Tag]] = {}
+        self._tag_cells: dict[str, dict[Cell, list[_Tag]]] = {}
+
+    def _cell(self, lat_long: LatLong) -> Cell:
+        phi = math.radians(lat_long[0])
+        lam = math.radians(lat_long[1])
+        return (
+            math.floor(math.cos(phi) * math.cos(lam) / self._cell_size),
+            math.floor(math.cos(phi) * math.sin(lam) / self._cell_size),
+            math.floor(math.sin(phi) / self._cell_size),
+        )
+
+    @staticmethod
+    def _neighbours(cell: Cell) -> Iterator[Cell]:
+        for x in (-1, 0, 1):
+            for y in (-1, 0, 1):
+                for z in (-1, 0, 1):
+                    yield cell[0] + x, cell[1] + y, cell[2] + z
+
+    def clonal_distance(self, genus: str) -> float:
+        return self._clonal_distances.get(genus, DEFAULT_CLONAL_DISTANCE)
+
+    def add_scan(self, genus: str, lat_long: LatLong) -> None:
+        """
+        Add a sample site, excluding any nearby tags of the same genus.
+
+        :param genus: The genus code
+        :param lat_long: The lat/long coordinates of the sample
+        """
+
+        cell = self._cell(lat_long)
+        self._scans.setdefault(genus, {}).setdefault(cell, []).append(lat_long)
+        self._scan_sites.setdefault(genus, []).append(lat_long)
+        tag_cells = self._tag_cells.get(genus, {})
+        nearby = [tag for neighbour in self._neighbours(cell) for tag in tag_cells.get(neighbour, ())
+                  if not tag.excluded]
+        distance = self.clonal_distance(genus)
+        for tag, tag_distance in zip(nearby, geodesy.distances(lat_long, [tag.lat_long for tag in nearby],
+                                                               self.radius)):
+            if tag_distance < distance:
+                tag.excluded = True
+
+    def add_tag(self, genus: str, lat_long: LatLong) -> None:
+        """
+        Add a tagged waypoint, excluded if it is within the clonal distance of a sample site of the same genus.
+
+        :param genus: The genus code
+        :param lat_long: The lat/long coordinates of the tag
+        """
+
+        cell = self._cell(lat_long)
+        scan_cells = self._scans.get(genus, {})
+        nearby = [site for neighbour in self._neighbours(cell) for site in scan_cells.get(neighbour, ())]
+        excluded = min(geodesy.distances(lat_long, nearby, self.radius), default=math.inf) \
+            < self.clonal_distance(genus)
+        tag = _Tag(lat_long, excluded)
+        self._tags.setdefault(genus, []).append(tag)
+        self._tag_cells.setdefault(genus, {}).setdefault(cell, []).append(tag)
+
+    def has_waypoints(self) -> bool:
+        return bool(self._tags) or bool(self._scan_sites)
+
+    def scan_sites(self, genus: str) -> list[LatLong]:
+        """
+        :param genus: The genus code
+        :return: The sample sites of the genus
+        """
+
+        return self._scan_sites.get(genus, [])
+
+    def open_tags(self, genus: str) -> list[LatLong]:
+        """
+        :param genus: The genus code
+        :return: The tags of the genus not within the clonal distance of a sample site
+        """
+
+        return [tag.lat_long for tag in self._tags.get(genus, ()) if not tag.excluded]
+
+    def nearest_tag(self, genus: str, origin: LatLong) -> tuple[float, float] | None:
+        """
+        Find the nearest tag of a genus which is not within the clonal distance of a sample site.
+
+        :param genus: The genus code
+        :param origin: The lat/long coordinates to search from, typically the player's position
+        :return: The distance (in meters) and bearing to the nearest qualifying tag, or None if there is none
+        """
+
+        distances, bearings = geodesy.distances_and_bearings(origin, self.open_tags(genus), self.radius)
+        if not distances:
+            return None
+        nearest = min(range(len(distances)), key=distances.__getitem__)
+        return distances[nearest], bearings[nearest]
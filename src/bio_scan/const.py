@@ -1,3 +1,4 @@
 name = 'BioScan'
 version = '2.12.2'
 db_version = 12
+display_interval = 100  # ms
@@ -13,6 +13,10 @@ from ExploData.explo_data.body_data.struct import PlanetData, StarData
 # Local imports
 import bio_scan.const
 import bio_scan.overlay as overlay
+from bio_scan.bio_data.system_context import SystemContext
+from bio_scan.bio_data.timeline import DataLossTimeline
+from bio_scan.bio_data.trace import RuleTrace
+from bio_scan.body_data.waypoint_index import WaypointIndex
 
 # EDMC imports
 from ttkHyperlinkLabel import HyperlinkLabel
@@ -41,6 +45,7 @@ class Globals:
         self.exclude_signals: tk.BooleanVar | None = None
         self.minimum_signals: tk.IntVar | None = None
         self.debug_logging_enabled: tk.BooleanVar | None = None
+        self.rule_trace_enabled: tk.BooleanVar | None = None
         self.focus_distance: tk.IntVar | None = None
         self.box_height: tk.IntVar | None = None
         # Overlay
@@ -80,7 +85,14 @@ class Globals:
         self.update_button: HyperlinkLabel | None = None
         self.journal_label: tk.Label | None = None
         self.overlay: overlay.Overlay = overlay.Overlay()
+        self.display_pending: str | None = None
         self.display_hidden: bool = False
+        # Last full render, reused by position updates
+        self.display_prefix: str = ''
+        self.location_header: str = ''
+        self.location_text: str = ''
+        self.summary_on_overlay: bool = False
+        self.details_waypoints: bool = False
 
         # Plugin state data
         # DB elements
@@ -89,16 +101,24 @@ class Globals:
         self.stars: dict[str, StarData] = {}
         self.planet_cache: dict[
             str, dict[str, tuple[bool, tuple[str, int, int, list[tuple[str, list[str], int]]]]]] = {}
+        self.body_filter: dict[str, dict[str, tuple[tuple[str, tuple[int, ...]], ...]]] = {}
+        self.system_context: SystemContext = SystemContext(None, {}, {})
+        self.data_timeline: DataLossTimeline = DataLossTimeline()
+        self.unsold_value: int | None = None
+        self.debug_logging: bool = False
+        self.rule_trace: RuleTrace = RuleTrace()
         self.migration_failed: bool = False
         self.db_mismatch: bool = False
         self.sql_session: Session | None = None
         # System info
         self.system: System | None = None
         self.main_star_type: str = ''
+        self.main_star_name: str = ''
         self.main_star_luminosity: str = ''
         self.location_name: str = ''
         self.location_id: str = ''
         self.location_state: str = ''
+        self.waypoint_index: WaypointIndex | None = None
         # Body info
         self.ship_location: tuple[float, float] | None = None
         self.planet_radius: float = 0.0
@@ -1,3 +1,5 @@
+import math
+
 coordinates = {
     'Agnairt TA-U d4-360': (-10010.375, -33.71875, 22444.25),
     'Agnaix QD-A d1-46': (-14929.65625, -451.40625, 22111.9375),
@@ -5819,6 +5821,96 @@ named_coordinates = {
 }
 
 
+class NebulaIndex:
+    """
+    Static 3D k-d tree over nebula reference coordinates. Built once at import for nearest neighbor and radius
+    queries, replacing a full sort of every reference star per lookup.
+    """
+
+    def __init__(self, points: dict[str, tuple[float, float, float]]):
+        """
+        Constructor.
+
+        :param points: Mapping of nebula display names to x, y, z coordinates
+        """
+
+        # Nodes are stored as (name, coordinates, axis, left, right) tuples
+        self._root = self._build(list(points.items()), 0)
+
+    def _build(self, items: list[tuple[str, tuple[float, float, float]]], depth: int) -> tuple | None:
+        if not items:
+            return None
+        axis = depth % 3
+        items.sort(key=lambda item: item[1][axis])
+        median = len(items) // 2
+        return (items[median][0], items[median][1], axis,
+                self._build(items[:median], depth + 1), self._build(items[median + 1:], depth + 1))
+
+    def nearest(self, target: tuple[float, float, float]) -> tuple[str, tuple[float, float, float]]:
+        """
+        Find the nearest point to the target coordinates.
+
+        :param target: The x, y, z coordinates to search from
+        :return: Tuple of the nearest nebula name and its coordinates
+        """
+
+        best_distance = float('inf')
+        best: tuple[str, tuple[float, float, float]] | None = None
+        # Stack entries carry the squared distance to the splitting plane, used to skip subtrees out of range
+        stack: list[tuple[tuple | None, float]] = [(self._root, 0.0)]
+        while stack:
+            node, plane_distance = stack.pop()
+            if node is None or plane_distance >= best_distance:
+                continue
+            name, point, axis, left, right = node
+            distance = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+            if distance < best_distance:
+                best_distance = distance
+                best = (name, point)
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            stack.append((far, delta ** 2))
+            stack.append((near, 0.0))
+        return best
+
+    def any_within(self, target: tuple[float, float, float], radius: float) -> bool:
+        """
+        Check for any point strictly closer than the given radius.
+
+        :param target: The x, y, z coordinates to search from
+        :param radius: Search radius
+        :return: True if a point was found within the radius
+        """
+
+        radius_squared = radius ** 2
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            _, point, axis, left, right = node
+            distance = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+            if math.sqrt(distance) < radius:
+                return True
+            delta = target[axis] - point[axis]
+            if delta < 0:
+                stack.append(left)
+                if delta ** 2 <= radius_squared:
+                    stack.append(right)
+            else:
+                stack.append(right)
+                if delta ** 2 <= radius_squared:
+                    stack.append(left)
+        return False
+
+
+nebula_indexes: dict[str, NebulaIndex] = {
+    'large': NebulaIndex(coordinates | named_coordinates),
+    'planetary': NebulaIndex(planetary_coordinates),
+    'all': NebulaIndex(coordinates | named_coordinates | planetary_coordinates)
+}
+
+
 def nebulae_sort(current_coordinates: tuple[float, float, float],
                  nebula_type: str = 'large') -> list[tuple[str, tuple[float, float, float]]]:
     """
@@ -5855,6 +5947,18 @@ def get_nearest_nebula(current_coordinates: tuple[float, float, float],
         and its x, y, z coordinates.
     """
 
-    result: list[tuple[str, tuple[float, float, float]]] = nebulae_sort(current_coordinates, nebula_type)
-    return {result[0][0]: result[0][1]}
-    
\ No newline at end of file
+    name, nebula_coordinates = nebula_indexes[nebula_type].nearest(current_coordinates)
+    return {name: nebula_coordinates}
+
+
+def nebula_within(current_coordinates: tuple[float, float, float], radius: float, nebula_type: str = 'large') -> bool:
+    """
+    Check for any nebula of the given type closer than the given radius.
+
+    :param current_coordinates: The coordinate (x, y, z) tuple to search around.
+    :param radius: The search radius (in ly). Nebulae must be strictly closer than this distance.
+    :param nebula_type: The nebula type to search against ('large', 'planetary', or 'all'). Default: large
+    :return: True if a nebula was found within the radius
+    """
+
+    return nebula_indexes[nebula_type].any_within(current_coordinates, radius)
@@ -1,8 +1,11 @@
+import heapq
+import itertools
 import math
 import sys
 import threading
+import time
 from os import environ
-from typing import Callable, Self
+from typing import Any, Callable, Self
 
 from EDMCLogging import get_plugin_logger
 from bio_scan import const
@@ -21,30 +24,71 @@ VIRTUAL_WIDTH = 1280.0
 VIRTUAL_HEIGHT = 1024.0
 VIRTUAL_ORIGIN_X = 20.0
 VIRTUAL_ORIGIN_Y = 40.0
+# Unchanged elements are resent once they are older than the keepalive, well before their TTL expires
+MESSAGE_TTL = 30
+KEEPALIVE = MESSAGE_TTL / 2
+KEEPALIVE_INTERVAL = 5.0
+SCROLL_INTERVAL = .75
 
-def setInterval(interval: float) -> Callable:
-    """
-    Decorator which automatically repeats the function at a given interval.
 
-    :param interval: Interval in seconds
+class Scheduler:
+    """
+    Runs callbacks at given times on a single daemon thread, in deadline order. The thread is started with the first
+    scheduled callback.
     """
 
-    def decorator(function: Callable) -> Callable:
-        def wrapper(*args, **kwargs) -> threading.Event:
-            stopped = threading.Event()
+    def __init__(self, name: str):
+        """
+        :param name: Name of the scheduler thread
+        """
 
-            def loop() -> None:  # executed in another thread
-                while not stopped.wait(interval):  # until stopped
-                    function(*args, **kwargs)
+        self._name = name
+        self._queue: list[tuple[float, int, Callable[[], None]]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
 
-            t = threading.Thread(target=loop)
-            t.daemon = True  # stop if the program exits
-            t.start()
-            return stopped
+    def call_at(self, deadline: float, callback: Callable[[], None]) -> None:
+        """
+        Schedule a callback.
 
-        return wrapper
+        :param deadline: Time to run the callback, on the time.monotonic() clock
+        :param callback: The callback
+        """
 
-    return decorator
+        with self._condition:
+            if self._stopped:
+                return
+            heapq.heappush(self._queue, (deadline, next(self._sequence), callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        self.call_at(time.monotonic() + delay, callback)
+
+    def stop(self) -> None:
+        """ Stop the scheduler thread, dropping any pending callbacks """
+
+        with self._condition:
+            self._stopped = True
+            self._queue.clear()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped and (not self._queue or self._queue[0][0] > time.monotonic()):
+                    self._condition.wait(self._queue[0][0] - time.monotonic() if self._queue else None)
+                if self._stopped:
+                    return
+                _, _, callback = heapq.heappop(self._queue)
+            try:
+                callback()
+            except Exception as ex:
+                logger.debug('Exception in overlay scheduler', exc_info=ex)
 
 
 def round_away(val):
@@ -54,7 +98,7 @@ def round_away(val):
 
 class TextBlock:
     """
-    Cache class for a multi-line text block on the overlay.
+    Snapshot of a multi-line text block on the overlay. Replaced, not modified, when the text changes.
 
     These can be configured to auto-scroll beyond a certain length, with a given delay before scrolling
     the opposite direction.
@@ -83,16 +127,28 @@ class TextBlock:
         self.scrolled = scrolled
         self.limit = limit
         self.delay = delay
+        self.created = time.monotonic()
+
+
+class ScrollState:
+    """
+    Scroll position of a scrolled text block. Only used by the scheduler thread.
+    """
+
+    def __init__(self, block: TextBlock):
+        """
+        :param block: The text block being scrolled. Scrolling starts after the block's delay.
+        """
+
+        self.block = block
         self.direction = 'down'
         self.offset = 0
-        self.timer = threading.Timer(self.delay, lambda *args: None)
-        if scrolled:
-            self.timer.start()
+        self.resume_at = block.created + block.delay
 
 
 class RadarSet:
     """
-    Cache class for a radar display.
+    Snapshot of a radar display. Replaced, not modified, when the radar changes.
 
     Contains circles and marker positions with a given position and radius. Can be set to display
     linearly or logarithmically.
@@ -120,11 +176,35 @@ class RadarSet:
         self.log = log
 
 
+class Element:
+    """
+    A single overlay message or shape, as last sent or as it should be displayed.
+    """
+
+    __slots__ = ('group', 'payload', 'clear', 'sent')
+
+    def __init__(self, group: str, payload: tuple | dict[str, Any], clear: dict[str, Any]):
+        """
+        :param group: ID of the text block or radar the element belongs to
+        :param payload: Message arguments as a tuple, or a raw shape message, excluding the TTL
+        :param clear: Raw message which removes the element
+        """
+
+        self.group = group
+        self.payload = payload
+        self.clear = clear
+        self.sent = 0.0
+
+
 class Overlay:
     """
     An interface for displaying multiple text blocks with EDMCOverlay. Breaks multi-line text into
-    multiple individual lines to work around EDMCOverlay limitations. Redraws the text every 5 minutes in order to
-    display text indefinitely.
+    multiple individual lines to work around EDMCOverlay limitations.
+
+    Text blocks and radars are kept as snapshots, which the caller swaps out and a single scheduler thread draws. The
+    scheduler keeps the last payload sent for each overlay element, and only sends elements which have changed.
+    Unchanged elements are resent as a keepalive at half their TTL, in order to display them indefinitely. Removed
+    elements are cleared explicitly.
     """
 
     def __init__(self):
@@ -146,11 +226,18 @@ class Overlay:
             self._overlay: edmcoverlay.Overlay | None = None
         self._normal_spacer: int = 16
         self._large_spacer: int = 26
+        # Snapshots, replaced as a whole by the caller and only read by the scheduler
         self._text_blocks: dict[str, TextBlock] = {}
         self._markers: dict[str, RadarSet] = {}
-        self._redraw_timer = self.redraw()
-        self._redraw_radar_timer = self.redraw_radar()
-        self._scroll_timer = self.scroll()
+        self._scheduler = Scheduler('BioScan overlay')
+        self._jobs_lock = threading.Lock()
+        self._sync_pending = False
+        self._keepalive_running = False
+        self._scroll_running = False
+        self._resend = False
+        # Scheduler thread state
+        self._scroll: dict[str, ScrollState] = {}
+        self._sent: dict[str, Element] = {}
         self._screen_width = 1920
         self._screen_height = 1080
         self._over_aspect_x = self._calc_aspect_x()
@@ -167,6 +254,7 @@ class Overlay:
         self._screen_width = w
         self._screen_height = h
         self._over_aspect_x = self._calc_aspect_x()
+        self._request_sync()
         return self
 
     def set_line_spacing(self, normal: int, large: int) -> Self:
@@ -180,16 +268,15 @@ class Overlay:
 
         self._normal_spacer = normal
         self._large_spacer = large
+        self._request_sync()
         return self
 
     def disconnect(self) -> None:
         """
-        Shut down overlay draw timers
+        Shut down the overlay scheduler
         """
 
-        self._redraw_timer.set()
-        self._redraw_radar_timer.set()
-        self._scroll_timer.set()
+        self._scheduler.stop()
 
     def _calc_aspect_x(self) -> float:
         if self._overlay_type == 'EDMCOverlay':
@@ -212,8 +299,7 @@ class Overlay:
     def display(self, message_id: str, text: str, x: int = 0, y: int = 0, color: str = "#ffffff", size: str = "normal",
                 scrolled: bool = False, limit: int = 0, delay: float = 10) -> None:
         """
-        Displays text with given attributes. Saves text in cache to allow for redraw and clearing.
-        Expires after 60 seconds.
+        Displays text with given attributes. Kept until cleared, and redrawn by the overlay scheduler.
 
         :param message_id: Unique identifier for a given text block.
         :param text: Message to display.
@@ -228,47 +314,37 @@ class Overlay:
 
         if sys.platform == 'linux' and self._overlay_type in ['edmcoverlay2', 'edmcoverlay_for_linux']:
             formatted_text = (text.replace('\N{HEAVY CHECK MARK}\N{VARIATION SELECTOR-16}', '*').replace('\N{memo}', '»')
-                              .replace(' ', ' ').split('\n'))
+                              .replace(' ', ' ').split('\n'))
         elif self._overlay_type == 'EDMCOverlay':
             formatted_text = text.replace('\N{HEAVY CHECK MARK}\N{VARIATION SELECTOR-16}', '√').replace('\N{memo}', '♦').split('\n')
         else:
             formatted_text = text.split('\n')
-        if message_id in self._text_blocks and len(formatted_text) < len(self._text_blocks[message_id].text):
-            self.clear(message_id, len(formatted_text)-1, False)
-        self._text_blocks[message_id] = TextBlock(
+        block = TextBlock(
             text=formatted_text, x=x, y=y, size=size, color=color, scrolled=scrolled, limit=limit, delay=delay
         )
-        self.draw(message_id)
+        self._text_blocks = self._text_blocks | {message_id: block}
+        if scrolled:
+            with self._jobs_lock:
+                if not self._scroll_running:
+                    self._scroll_running = True
+                    self._scheduler.call_later(SCROLL_INTERVAL, self._scroll_tick)
+        self._request_sync()
 
-    def clear(self, message_id: str, new_length: int = 0, remove: bool = True) -> None:
+    def clear(self, message_id: str) -> None:
         """
         Clears a given text block identified by a unique message ID.
 
         :param message_id: Unique ID of text to clear.
-        :param new_length: Start point of clear
-        :param remove: Remove the message from the cache.
         """
 
-        try:
-            if message_id in self._text_blocks:
-                last_len = self._text_blocks[message_id].limit if self._text_blocks[message_id].limit else len(self._text_blocks[message_id].text)
-                last_len = min(len(self._text_blocks[message_id].text), last_len)
-                if new_length:
-                    if new_length < last_len:
-                        for item in range(new_length, last_len):
-                            self._overlay.send_raw({'id': f'{message_id}_{item}', 'text': '', 'ttl': 0})
-                else:
-                    for item in range(last_len):
-                        self._overlay.send_raw({'id': f'{message_id}_{item}', 'text': '', 'ttl': 0})
-                if remove:
-                    self._text_blocks.pop(message_id, None)
-        except Exception as ex:
-            logger.debug("Exception during overlay clear", exc_info=ex)
+        if message_id in self._text_blocks:
+            self._text_blocks = {key: block for key, block in self._text_blocks.items() if key != message_id}
+            self._request_sync()
 
     def render_radar(self, message_id: str, x: int, y: int, r: int, d: int, north: float,
                      markers: list | None = None, circles: list | None = None, logarithmic: bool = False) -> None:
         """
-        Render radar display, cached to refresh on a timer.
+        Render radar display, kept until cleared and redrawn by the overlay scheduler.
 
         :param message_id: ID of radar group, used to update or clear existing radar display
         :param x: Center x coordinate of radar
@@ -281,230 +357,253 @@ class Overlay:
         :param logarithmic: Make radar scale logarithmic (default: False)
         """
 
-        if self._overlay_type == 'EDMCOverlay':
-            self.clear_radar(message_id)
-        else:
-            self.trim_radar(message_id, circles, markers)
-        self._markers[message_id] = RadarSet(markers, circles, x, y, r, d, north, logarithmic)
-        self.draw_circles(message_id)
-        self.draw_markers(message_id)
+        self._markers = self._markers | {message_id: RadarSet(markers, circles, x, y, r, d, north, logarithmic)}
+        self._request_sync()
 
-    def clear_radar(self, message_id: str, remove: bool = True) -> None:
+    def clear_radar(self, message_id: str) -> None:
         """
         Clears radar display
         """
 
         if message_id in self._markers:
-            for item in range(len(self._markers[message_id].circles)):
-                self._overlay.send_raw({'id': f'{message_id}_circle_{item}', 'ttl': 0})
-                if 'text' in self._markers[message_id].circles[item]:
-                    self._overlay.send_raw({'id': f'{message_id}_circle_{item}_text', 'ttl': 0})
-            for item in range(len(self._markers[message_id].markers) + 1):
-                self._overlay.send_raw({'id': f'{message_id}_{item}'})
-            self._overlay.send_raw({'id': f'{message_id}_north'})
-        if message_id in self._markers and remove:
-            self._markers.pop(message_id)
+            self._markers = {key: radar for key, radar in self._markers.items() if key != message_id}
+            self._request_sync()
 
-    def trim_radar(self, message_id: str, circles: list | None = None, markers: list | None = None) -> None:
+    def _request_sync(self) -> None:
         """
-        Removes expired radar components
+        Schedule a sync with the current snapshots, coalescing repeated requests, and start the keepalive job.
         """
-        if message_id in self._markers:
-            if len(self._markers[message_id].circles) > len(circles):
-                for item in range(len(circles) - 1, len(self._markers[message_id].circles)):
-                    self._overlay.send_raw({'id': f'{message_id}_circle_{item}'})
-                    if 'text' in self._markers[message_id].circles[item]:
-                        self._overlay.send_raw({'id': f'{message_id}_circle_{item}_text'})
-            if len(self._markers[message_id].markers) > len(markers):
-                for item in range(len(markers), len(self._markers[message_id].markers) + 1):
-                    self._overlay.send_raw({'id':  f'{message_id}_{item}'})
 
-    @setInterval(10)
-    def redraw(self):
+        with self._jobs_lock:
+            if not self._sync_pending:
+                self._sync_pending = True
+                self._scheduler.call_later(0, self._sync)
+            if not self._keepalive_running:
+                self._keepalive_running = True
+                self._scheduler.call_later(KEEPALIVE_INTERVAL, self._keepalive)
+
+    def _keepalive(self) -> None:
         """
-        Redraws all cached text blocks on a 30-second interval.
-        :rtype: threading.Event
+        Resend elements due a keepalive, on a 5-second interval while anything is displayed.
         """
 
-        if self.available():
-            for message_id, message_info in self._text_blocks.copy().items():
-                if message_info.scrolled:
-                    continue
-                self.draw(message_id)
+        self._sync()
+        with self._jobs_lock:
+            if self._text_blocks or self._markers or self._sent:
+                self._scheduler.call_later(KEEPALIVE_INTERVAL, self._keepalive)
+            else:
+                self._keepalive_running = False
 
-    @setInterval(10)
-    def redraw_radar(self):
+    def _scroll_tick(self) -> None:
         """
-        Redraws all cached radars on a 5-second interval.
-        :rtype: threading.Event
+        Advance scrolled text blocks which are not waiting at either end, on a 0.75-second interval while any
+        scrolled block is displayed.
         """
 
-        if self.available():
-            for message_id, markers in self._markers.copy().items():
-                if self._overlay_type == 'EDMCOverlay':
-                    self.clear_radar(message_id, False)
-                self.draw_circles(message_id)
-                self.draw_markers(message_id)
+        now = time.monotonic()
+        text_blocks = self._text_blocks
+        self._scroll = {message_id: state for message_id, state in self._scroll.items()
+                        if state.block is text_blocks.get(message_id)}
+        moved = False
+        for message_id, block in text_blocks.items():
+            if not block.scrolled:
+                continue
+            state = self._scroll.setdefault(message_id, ScrollState(block))
+            if now < state.resume_at or block.limit == 0 or block.limit >= len(block.text):
+                continue
+            offset = state.offset + 1 if state.direction == "down" else len(block.text) - state.offset
+            display = offset + block.limit if state.direction == "down" else offset
+            if display >= len(block.text):
+                state.direction = "up" if state.direction == "down" else "down"
+                state.resume_at = now + block.delay
+            if state.direction == "down":
+                state.offset += 1
+            else:
+                state.offset -= 1
+            moved = True
+        if moved:
+            self._sync()
+        with self._jobs_lock:
+            if any(block.scrolled for block in self._text_blocks.values()):
+                self._scheduler.call_later(SCROLL_INTERVAL, self._scroll_tick)
+            else:
+                self._scroll_running = False
 
-    @setInterval(.75)
-    def scroll(self):
+    def _sync(self) -> None:
         """
-        Redraw scrolled displays based on given lines.
-        :rtype: threading.Event
+        Bring the overlay in line with the current snapshots. Sends changed elements and due keepalives, and clears
+        elements which are no longer displayed. Only run on the scheduler thread.
         """
 
-        if self.available():
-            try:
-                for message_id, message_info in self._text_blocks.copy().items():
-                    if not message_info.scrolled:
-                        continue
-
-                    if not message_info.timer.is_alive():
-                        self.draw(message_id)
-                        if message_info.limit != 0 and message_info.limit < len(message_info.text):
-                            offset = message_info.offset + 1 if message_info.direction == "down" else \
-                                len(message_info.text) - message_info.offset
-                            display = offset + message_info.limit if message_info.direction == "down" else offset
-                            if display >= len(message_info.text):
-                                self._text_blocks[message_id].direction = "up" if message_info.direction == "down" \
-                                    else "down"
-                                self._text_blocks[message_id].timer = threading.Timer(message_info.delay,
-                                                                                      lambda *args: None)
-                                self._text_blocks[message_id].timer.start()
-                            if self._text_blocks[message_id].direction == "down":
-                                self._text_blocks[message_id].offset += 1
-                            else:
-                                self._text_blocks[message_id].offset -= 1
-                    elif message_info.limit != 0 and message_info.limit >= len(message_info.text):
-                        self.draw(message_id)
-            except Exception as ex:
-                logger.debug("Exception during scroll repaint", exc_info=ex)
+        with self._jobs_lock:
+            self._sync_pending = False
+        if not self.available():
+            return
+        if self._resend:
+            self._resend = False
+            self._sent.clear()
+
+        desired: dict[str, Element] = {}
+        for message_id, block in self._text_blocks.items():
+            state = self._scroll.get(message_id)
+            self._text_elements(desired, message_id, block, state.offset if state and state.block is block else 0)
+        radars = self._markers
+        for message_id, radar in radars.items():
+            self._radar_elements(desired, message_id, radar)
+
+        try:
+            for element_id in [element_id for element_id in self._sent if element_id not in desired]:
+                self._send_clear(element_id)
+            if self._overlay_type == 'EDMCOverlay':
+                # EDMCOverlay shapes are cleared before being redrawn, so a radar is redrawn as a whole
+                for message_id in radars:
+                    elements = [element_id for element_id, element in desired.items() if element.group == message_id]
+                    if not all(self._is_current(element_id, desired[element_id]) for element_id in elements):
+                        for element_id in elements:
+                            if element_id in self._sent:
+                                self._send_clear(element_id)
+            for element_id, element in desired.items():
+                if not self._is_current(element_id, element):
+                    self._send(element_id, element)
+        except AttributeError:
+            self._sent.clear()
+            self._overlay.connect()
+        except Exception as ex:
+            logger.debug('Exception during overlay draw', exc_info=ex)
 
-    def draw(self, message_id: str):
+    def _is_current(self, element_id: str, element: Element) -> bool:
         """
-        Render one overlay display
+        Check whether an element was last sent with the same payload, recently enough that it doesn't need a keepalive.
+
+        :param element_id: Overlay element ID
+        :param element: The element to display
+        :return: True if sending the element can be skipped
         """
 
-        if message_id in self._text_blocks:
-            block = self._text_blocks[message_id]
-            count = block.offset
-            line_count = 0
-            spacer = self._normal_spacer if block.size == "normal" else self._large_spacer
-            while (block.limit == 0 or count - block.offset <= block.limit) and count < len(block.text):
-                try:
-                    self._overlay.send_message("{}_{}".format(message_id, line_count), block.text[count], block.color,
-                                               block.x, self._aspect_y(block.y) + (spacer * (count - block.offset)),
-                                               ttl=20, size=block.size)
-                except AttributeError:
-                    count -= 1
-                    self._overlay.connect()
-                except Exception as ex:
-                    logger.debug("Exception during draw", exc_info=ex)
-                count += 1
-                line_count += 1
-
-    def draw_circles(self, message_id: str):
-        if message_id in self._markers:
-            for index in range(len(self._markers[message_id].circles)):
-                try:
-                    points = []
-                    x = self._markers[message_id].x
-                    y = self._markers[message_id].y
-                    r = self._markers[message_id].circles[index]['radius']
-                    for pie_slice in range(49):
-                        x_point = x + (r * math.cos(math.radians(7.5 * pie_slice)))
-                        y_point = y + (r * math.sin(math.radians(7.5 * pie_slice)))
-                        point = {
-                            'x': self._aspect_x(x_point),
-                            'y': self._aspect_y(y_point)
-                        }
-                        points.append(point)
-
-                    message = {'id': f'{message_id}_circle_{index}',
-                               'shape': 'vect',
-                               'vector': points,
-                               'color': self._markers[message_id].circles[index]['color'],
-                               'ttl': 20}
-                    self._overlay.send_raw(message)
-                    if 'text' in self._markers[message_id].circles[index]:
-                        point = {
-                            'x': self._aspect_x(x + (r * math.cos(math.radians(0)))),
-                            'y': self._aspect_y(y + (r * math.sin(math.radians(0)))),
-                            'color': self._markers[message_id].circles[index]['color'],
-                            'text': self._markers[message_id].circles[index]['text'],
-                            'marker': 'circle'
-                        }
-                        message = {'id': f'{message_id}_circle_{index}_text', 'shape': 'vect', 'vector': [point], 'ttl': 20}
-                        self._overlay.send_raw(message)
-                except AttributeError:
-                    self._overlay.connect()
-                except Exception as ex:
-                    logger.debug('Exception during radar circle draw', exc_info=ex)
-
-    def draw_markers(self, message_id: str) -> None:
-        if message_id in self._markers:
-            try:
-                if self._markers[message_id].markers is None:
-                    return
-                x = self._markers[message_id].x
-                y = self._markers[message_id].y
-                r = self._markers[message_id].r
-                message = {
-                    'id': f'{message_id}_north',
-                    'shape': 'vect',
-                    'vector': [
-                        {
-                            'x': self._aspect_x(x + ((r-5) * math.cos(math.radians(self._markers[message_id].north)))),
-                            'y': self._aspect_y(y + ((r-5) * math.sin(math.radians(self._markers[message_id].north)))),
-                        },
-                        {
-                            'x': self._aspect_x(x + ((r+5) * math.cos(math.radians(self._markers[message_id].north)))),
-                            'y': self._aspect_y(y + ((r+5) * math.sin(math.radians(self._markers[message_id].north)))),
-                        }
-                    ],
-                    'color': self._markers[message_id].circles[0]['color'],
-                    'ttl': 20
+        sent = self._sent.get(element_id)
+        return sent is not None and sent.payload == element.payload and time.monotonic() - sent.sent < KEEPALIVE
+
+    def _send(self, element_id: str, element: Element) -> None:
+        if isinstance(element.payload, tuple):
+            text, color, x, y, size = element.payload
+            self._overlay.send_message(element_id, text, color, x, y, ttl=MESSAGE_TTL, size=size)
+        else:
+            self._overlay.send_raw(element.payload | {'ttl': MESSAGE_TTL})
+        element.sent = time.monotonic()
+        self._sent[element_id] = element
+
+    def _send_clear(self, element_id: str) -> None:
+        self._overlay.send_raw(self._sent.pop(element_id).clear)
+
+    def _text_elements(self, elements: dict[str, Element], message_id: str, block: TextBlock, offset: int) -> None:
+        """
+        Get the overlay elements of a text block, one per displayed line.
+
+        :param elements: Dictionary to add the elements to
+        :param message_id: ID of the text block
+        :param block: The text block
+        :param offset: First line to display
+        """
+
+        count = offset
+        line_count = 0
+        spacer = self._normal_spacer if block.size == "normal" else self._large_spacer
+        while (block.limit == 0 or count - offset <= block.limit) and count < len(block.text):
+            element_id = f'{message_id}_{line_count}'
+            elements[element_id] = Element(
+                message_id,
+                (block.text[count], block.color, block.x, self._aspect_y(block.y) + (spacer * (count - offset)),
+                 block.size),
+                {'id': element_id, 'text': '', 'ttl': 0}
+            )
+            count += 1
+            line_count += 1
+
+    def _radar_elements(self, elements: dict[str, Element], message_id: str, radar: RadarSet) -> None:
+        """
+        Get the overlay elements of a radar: each circle and its label, the north marker, the center and each marker.
+
+        :param elements: Dictionary to add the elements to
+        :param message_id: ID of the radar
+        :param radar: The radar
+        """
+
+        x = radar.x
+        y = radar.y
+        for index, circle in enumerate(radar.circles):
+            r = circle['radius']
+            points = []
+            for pie_slice in range(49):
+                points.append({
+                    'x': self._aspect_x(x + (r * math.cos(math.radians(7.5 * pie_slice)))),
+                    'y': self._aspect_y(y + (r * math.sin(math.radians(7.5 * pie_slice))))
+                })
+            element_id = f'{message_id}_circle_{index}'
+            elements[element_id] = Element(
+                message_id, {'id': element_id, 'shape': 'vect', 'vector': points, 'color': circle['color']},
+                {'id': element_id, 'ttl': 0}
+            )
+            if 'text' in circle:
+                point = {
+                    'x': self._aspect_x(x + r),
+                    'y': self._aspect_y(y),
+                    'color': circle['color'],
+                    'text': circle['text'],
+                    'marker': 'circle'
                 }
-                self._overlay.send_raw(message)
-                d = self._markers[message_id].d
-                markers = self._markers[message_id].markers
-                message = {
-                    'id': f'{message_id}_0',
-                    'shape': 'vect',
-                    'vector': [{
-                        'x': self._aspect_x(x), 'y': self._aspect_y(y),
-                        'color': self._markers[message_id].circles[0]['color'],
-                        'marker': 'circle'
-                    }],
-                    'ttl': 20
+                element_id = f'{message_id}_circle_{index}_text'
+                elements[element_id] = Element(message_id, {'id': element_id, 'shape': 'vect', 'vector': [point]},
+                                               {'id': element_id, 'ttl': 0})
+
+        if radar.markers is None:
+            return
+        r = radar.r
+        element_id = f'{message_id}_north'
+        elements[element_id] = Element(message_id, {
+            'id': element_id,
+            'shape': 'vect',
+            'vector': [
+                {
+                    'x': self._aspect_x(x + ((r-5) * math.cos(math.radians(radar.north)))),
+                    'y': self._aspect_y(y + ((r-5) * math.sin(math.radians(radar.north)))),
+                },
+                {
+                    'x': self._aspect_x(x + ((r+5) * math.cos(math.radians(radar.north)))),
+                    'y': self._aspect_y(y + ((r+5) * math.sin(math.radians(radar.north)))),
                 }
-                self._overlay.send_raw(message)
-                for item in range(len(markers)):
-                    if self._markers[message_id].log:
-                        log_d = math.log(markers[item]['distance']+1, d)
-                        log_d = log_d if markers[item]['distance'] > 0 else 0
-                        marker_radius = r if log_d > 1.0 else log_d * r
-                    else:
-                        marker_radius = r if markers[item]['distance'] > self._markers[message_id].d \
-                            else r * markers[item]['distance'] / self._markers[message_id].d
-                    marker_bearing = markers[item]['bearing']
-                    x_point = x + (marker_radius * math.cos(math.radians(marker_bearing)))
-                    y_point = y + (marker_radius * math.sin(math.radians(marker_bearing)))
-                    message = {
-                        'id': f'{message_id}_{item+1}',
-                        'shape': 'vect',
-                        'vector': [{
-                            'x': self._aspect_x(x_point), 'y': self._aspect_y(y_point),
-                            'color': markers[item]['color'], 'marker': 'cross',
-                            'text': markers[item]['text']
-                        }],
-                        'ttl': 20
-                    }
-                    self._overlay.send_raw(message)
-            except AttributeError:
-                self._overlay.connect()
-            except Exception as ex:
-                logger.debug('Exception during radar marker draw', exc_info=ex)
+            ],
+            'color': radar.circles[0]['color']
+        }, {'id': element_id})
+        element_id = f'{message_id}_0'
+        elements[element_id] = Element(message_id, {
+            'id': element_id,
+            'shape': 'vect',
+            'vector': [{
+                'x': self._aspect_x(x), 'y': self._aspect_y(y),
+                'color': radar.circles[0]['color'],
+                'marker': 'circle'
+            }]
+        }, {'id': element_id})
+        d = radar.d
+        for item, marker in enumerate(radar.markers):
+            if radar.log:
+                log_d = math.log(marker['distance']+1, d)
+                log_d = log_d if marker['distance'] > 0 else 0
+                marker_radius = r if log_d > 1.0 else log_d * r
+            else:
+                marker_radius = r if marker['distance'] > d else r * marker['distance'] / d
+            x_point = x + (marker_radius * math.cos(math.radians(marker['bearing'])))
+            y_point = y + (marker_radius * math.sin(math.radians(marker['bearing'])))
+            element_id = f'{message_id}_{item+1}'
+            elements[element_id] = Element(message_id, {
+                'id': element_id,
+                'shape': 'vect',
+                'vector': [{
+                    'x': self._aspect_x(x_point), 'y': self._aspect_y(y_point),
+                    'color': marker['color'], 'marker': 'cross',
+                    'text': marker['text']
+                }]
+            }, {'id': element_id})
 
     def available(self) -> bool:
         """
@@ -517,9 +616,11 @@ class Overlay:
             if hasattr(self._overlay, 'connection'):
                 if self._overlay.connection is None:
                     self._overlay = edmcoverlay.Overlay()
+                    self._resend = True
             return True
         else:
             if edmcoverlay:
                 self._overlay = edmcoverlay.Overlay()
+                self._resend = True
                 return True
         return False
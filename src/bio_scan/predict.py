@@ -0,0 +1,550 @@
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Mapping, TextIO
+
+try:
+    from ExploData.explo_data.bio_data.genus import data as bio_genus
+except ImportError:
+    bio_genus = {}  # Color data is unavailable, species are predicted without colors
+
+try:
+    from ExploData.explo_data.RegionMap import findRegion
+except ImportError:
+    findRegion = None  # Regions are only known from the input records
+
+import bio_scan.bio_data.prefilter as prefilter
+import bio_scan.bio_data.vectorized as vectorized
+from bio_scan.bio_data.predicates import Rule, compiled_rules, first_failure
+from bio_scan.bio_data.species import rules as bio_types
+from bio_scan.bio_data.system_context import SystemContext
+from bio_scan.body_data.star_class import star_matches, type_mask
+
+ResidualRules = Mapping[str, Mapping[str, tuple[tuple[Rule, ...], ...]]]
+# Encoded prediction lines, error messages, body count and count of systems without a region for a chunk of input lines
+ChunkResult = tuple[list[str], str, int, int]
+
+DEFAULT_CHUNK_SIZE = 256  # Systems per batch task
+# Body fields checked by the numeric bounds rules. A missing value would pass every bound, so records must supply them.
+REQUIRED_BODY_NUMBERS = ('gravity', 'temperature', 'pressure', 'orbital_period', 'distance')
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class BodyRecord:
+    """
+    Plain planet record with the PlanetData getters used by the species rules. Values use journal units: gravity in
+    m/s², temperature in K, pressure in Pa, orbital period in seconds, distance in light seconds, gases in percent.
+    Atmospheres use the ExploData names found in the rulesets, such as 'CarbonDioxide' or 'SulphurDioxide'.
+    """
+
+    __slots__ = ('name', 'type', 'atmosphere', 'gases', 'gravity', 'temperature', 'pressure', 'orbital_period',
+                 'volcanism', 'parent_stars', 'distance', 'materials')
+
+    def __init__(self, name: str, body_type: str = '', atmosphere: str = '', gases: Mapping[str, float] | None = None,
+                 gravity: float | None = None, temperature: float | None = None, pressure: float | None = None,
+                 orbital_period: float | None = None, volcanism: str = '', parent_stars: Iterable[str] = (),
+                 distance: float | None = None, materials: Iterable[str] = ()):
+        self.name = name
+        self.type = body_type
+        self.atmosphere = atmosphere
+        self.gases = dict(gases or {})
+        self.gravity = gravity
+        self.temperature = temperature
+        self.pressure = pressure
+        self.orbital_period = orbital_period
+        self.volcanism = volcanism
+        self.parent_stars = list(parent_stars)
+        self.distance = distance
+        self.materials = set(materials)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'BodyRecord':
+        """
+        Build a record from a JSON object using the field names of the constructor. 'type' is accepted for
+        'body_type'. The numeric fields in REQUIRED_BODY_NUMBERS must be present.
+
+        :param data: The decoded JSON object
+        :return: The body record
+        :raises ValueError: If a required numeric field is missing or not a number
+        """
+
+        for field in REQUIRED_BODY_NUMBERS:
+            if not _is_number(data.get(field)):
+                raise ValueError(f'body {data.get("name")!r}: {field} must be a number, got {data.get(field)!r}')
+        return cls(
+            data['name'], data.get('body_type', data.get('type', '')), data.get('atmosphere', ''), data.get('gases'),
+            data.get('gravity'), data.get('temperature'), data.get('pressure'), data.get('orbital_period'),
+            data.get('volcanism', ''), data.get('parent_stars', ()), data.get('distance'), data.get('materials', ())
+        )
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_type(self) -> str:
+        return self.type
+
+    def get_atmosphere(self) -> str:
+        return self.atmosphere
+
+    def get_gas(self, gas: str) -> float:
+        return self.gases.get(gas, 0.0)
+
+    def get_gravity(self) -> float | None:
+        return self.gravity
+
+    def get_temp(self) -> float | None:
+        return self.temperature
+
+    def get_pressure(self) -> float | None:
+        return self.pressure
+
+    def get_orbital_period(self) -> float | None:
+        return self.orbital_period
+
+    def get_volcanism(self) -> str:
+        return self.volcanism
+
+    def get_parent_stars(self) -> list[str]:
+        return self.parent_stars
+
+    def get_distance(self) -> float | None:
+        return self.distance
+
+    def get_materials(self) -> set[str]:
+        return self.materials
+
+
+class StarRecord:
+    """
+    Plain star record with the StarData getters used by the species rules.
+    """
+
+    __slots__ = ('name', 'type', 'luminosity', 'distance')
+
+    def __init__(self, name: str, star_type: str = '', luminosity: str = '', distance: float | None = None):
+        self.name = name
+        self.type = star_type
+        self.luminosity = luminosity
+        self.distance = distance
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'StarRecord':
+        """
+        Build a record from a JSON object using the field names of the constructor. 'type' is accepted for
+        'star_type'.
+
+        :param data: The decoded JSON object
+        :return: The star record
+        """
+
+        return cls(data['name'], data.get('star_type', data.get('type', '')), data.get('luminosity', ''),
+                   data.get('distance'))
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_type(self) -> str:
+        return self.type
+
+    def get_luminosity(self) -> str:
+        return self.luminosity
+
+    def get_distance(self) -> float | None:
+        return self.distance
+
+
+class SystemRecord:
+    """
+    Plain system record with the System attributes used by the species rules.
+    """
+
+    __slots__ = ('name', 'x', 'y', 'z', 'region')
+
+    def __init__(self, name: str, x: float = 0.0, y: float = 0.0, z: float = 0.0, region: int | None = None):
+        self.name = name
+        self.x = x
+        self.y = y
+        self.z = z
+        self.region = region
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'SystemRecord':
+        """
+        Build a record from a JSON object with a name, 'coords' as an [x, y, z] list or {x, y, z} object, and an
+        optional region ID. The region is looked up from the coordinates when ExploData is available.
+
+        :param data: The decoded JSON object
+        :return: The system record
+        :raises ValueError: If the coordinates are not three numbers
+        """
+
+        coords = data.get('coords', (0.0, 0.0, 0.0))
+        if isinstance(coords, Mapping):
+            coords = tuple(coords.get(axis) for axis in ('x', 'y', 'z'))
+        if not isinstance(coords, (list, tuple)) or len(coords) != 3 or not all(_is_number(value) for value in coords):
+            raise ValueError(f'coords must be three numbers, got {coords!r}')
+        x, y, z = coords
+        region = data.get('region')
+        if region is None and findRegion is not None and (x or y or z):
+            sector = findRegion(x, y, z)
+            region = sector[0] if sector is not None else None
+        return cls(data['name'], x, y, z, region)
+
+
+def star_color(colors: Mapping[str, str], star: Any, note: Callable[..., None] | None = None) -> str:
+    """
+    Get the color a star provides.
+
+    :param colors: Mapping of star types to colors for the genus or species
+    :param star: The star data
+    :param note: Optional rule logger
+    :return: The color of the first matching star type, or an empty string if no star type matched
+    """
+
+    star_mask = type_mask(star.get_type())
+    for star_type, color in colors.items():
+        if note:
+            note('Checking star type %s against %s', star_type, star.get_type())
+        if star_matches(star_type, star.get_type(), star_mask):
+            return color
+    return ''
+
+
+def star_colors(colors: Mapping[str, str], body: Any, ctx: SystemContext,
+                note: Callable[..., None] | None = None) -> set[str]:
+    """
+    Find the colors provided by the stars which can light a body. The nearest matching parent star provides a color,
+    as does every matching star among the arrival star and stars orbiting a black hole parent.
+
+    :param colors: Mapping of star types to colors for the genus or species
+    :param body: The planet data to find colors for
+    :param ctx: The system context
+    :param note: Optional rule logger
+    :return: Set of possible colors
+    """
+
+    parent_stars, other_stars = ctx.color_stars(body)
+    found_colors: set[str] = set()
+    for star in parent_stars:
+        color = star_color(colors, star, note)
+        if color:
+            found_colors.add(color)
+            break
+    for star in other_stars:
+        color = star_color(colors, star, note)
+        if color:
+            found_colors.add(color)
+    return found_colors
+
+
+def possible_species(body: Any, genus: str, ctx: SystemContext, species_candidates: prefilter.GenusCandidates,
+                     residual_rules: ResidualRules,
+                     note: Callable[..., None] | None = None) -> list[tuple[str, list[str]]]:
+    """
+    Run the species rulesets and color checks of a genus against a body.
+
+    :param body: The planet data
+    :param genus: The genus code
+    :param ctx: The system context
+    :param species_candidates: The genus candidates from the body filter
+    :param residual_rules: The residual rules matching the body filter used
+    :param note: Optional rule logger
+    :return: List of possible species and their sorted colors, in order of species value
+    """
+
+    found_species: dict[str, set[str]] = {}
+    if note and len(species_candidates) < len(compiled_rules[genus]):
+        note('%d species eliminated by body filter', len(compiled_rules[genus]) - len(species_candidates))
+    for species, indexes in species_candidates:
+        if note:
+            note('Species: %s', bio_types[genus][species]['name'])
+        for index in indexes:
+            count = index + 1
+            failed_rule = first_failure(residual_rules[genus][species][index], body, ctx)
+            if failed_rule is None:
+                if note:
+                    note('Ruleset %d passed', count)
+                found_species[species] = set()
+                break
+            if note:
+                note('Ruleset %d: %s', count, failed_rule.reason)
+
+    # For remaining species, run color checks if that genus has color variants
+    eliminated_species: set[str] = set()
+    if 'colors' in bio_genus.get(genus, {}):
+        if 'species' in bio_genus[genus]['colors']:
+            for species in found_species:
+                if 'star' in bio_genus[genus]['colors']['species'][species]:
+                    found_species[species].update(
+                        star_colors(bio_genus[genus]['colors']['species'][species]['star'], body, ctx, note))
+                elif 'element' in bio_genus[genus]['colors']['species'][species]:
+                    for element in bio_genus[genus]['colors']['species'][species]['element']:
+                        if element in body.get_materials():
+                            found_species[species].add(
+                                bio_genus[genus]['colors']['species'][species]['element'][element])
+
+                if not found_species[species]:
+                    eliminated_species.add(species)
+                    if note:
+                        note('Eliminated for lack of color')
+        else:
+            found_colors = star_colors(bio_genus[genus]['colors']['star'], body, ctx, note)
+            if not found_colors:
+                found_species.clear()
+                if note:
+                    note('Eliminated genus for lack of color')
+            else:
+                for species in found_species:
+                    found_species[species].update(found_colors)
+
+    return sorted(
+        ((species, sorted(colors)) for species, colors in found_species.items() if species not in eliminated_species),
+        key=lambda target_species: bio_types[genus][target_species[0]]['value']
+    )
+
+
+def body_filters(planets: Mapping[str, Any]) -> tuple[dict[str, dict[str, prefilter.GenusCandidates]],
+                                                      ResidualRules]:
+    """
+    Run the body filter for a set of planets, using the vectorized filter if NumPy is available.
+
+    :param planets: Planet data, keyed by short body name
+    :return: Mapping of body name to its genus candidates, and the residual rules matching the filter used
+    """
+
+    if vectorized.available():
+        return ({name: prefilter.group(keys) for name, keys in vectorized.filter_bodies(planets).items()},
+                vectorized.residual_rules)
+    return {name: prefilter.candidates(planet) for name, planet in planets.items()}, prefilter.residual_rules
+
+
+def system_context(system: Any, stars: Mapping[str, Any], planets: Mapping[str, Any],
+                   main_star_name: str = '') -> SystemContext:
+    """
+    Build a system context from plain records. The arrival star defaults to the star with a distance of 0.
+
+    :param system: The system record
+    :param stars: Star records, keyed by short body name
+    :param planets: Planet records, keyed by short body name
+    :param main_star_name: Optional short name of the arrival star
+    :return: The system context
+    """
+
+    if not main_star_name:
+        main_star_name = next((name for name, star in stars.items() if not star.get_distance()), '')
+    main_star = stars.get(main_star_name)
+    return SystemContext(
+        system, dict(stars), dict(planets),
+        main_star.get_type() if main_star else '', main_star.get_luminosity() if main_star else '', main_star_name
+    )
+
+
+def predict_system(system: Any, stars: Mapping[str, Any], planets: Mapping[str, Any], main_star_name: str = '',
+                   genera: Mapping[str, Iterable[str]] | None = None
+                   ) -> dict[str, dict[str, list[tuple[str, list[str]]]]]:
+    """
+    Predict the possible species of every planet in a system. This is the headless equivalent of the plugin's
+    value_estimate, without the codex, display and caching logic.
+
+    :param system: The system record, or an ExploData System
+    :param stars: Star records or StarData, keyed by short body name
+    :param planets: Planet records or PlanetData, keyed by short body name
+    :param main_star_name: Optional short name of the arrival star
+    :param genera: Optional mapping of body name to the genera to evaluate, such as those found by a DSS scan.
+     Bodies not in the mapping are evaluated for every genus.
+    :return: Mapping of body name to genus code to the possible species and their colors, in order of value.
+     Genera with no possible species are omitted.
+    """
+
+    ctx = system_context(system, stars, planets, main_star_name)
+    filters, residual_rules = body_filters(planets)
+    predictions: dict[str, dict[str, list[tuple[str, list[str]]]]] = {}
+    for name, body in planets.items():
+        body_genera = genera.get(name, bio_types) if genera else bio_types
+        results: dict[str, list[tuple[str, list[str]]]] = {}
+        for genus in body_genera:
+            if genus not in bio_types:
+                continue
+            species = possible_species(body, genus, ctx, filters.get(name, {}).get(genus, ()), residual_rules)
+            if species:
+                results[genus] = species
+        predictions[name] = results
+    return predictions
+
+
+def predict_record(data: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Predict the species of a decoded JSON system record.
+
+    :param data: JSON object with the system fields of SystemRecord, a 'main_star' name, and 'stars' and 'bodies'
+     lists using the fields of StarRecord and BodyRecord. A body may also list the 'genera' to evaluate.
+    :return: JSON-ready object with the system name, its region ID (or None if unknown) and, per body, the possible
+     species of each genus
+    """
+
+    system = SystemRecord.from_dict(data)
+    stars = {star.name: star for star in map(StarRecord.from_dict, data.get('stars', []))}
+    planets = {body.name: body for body in map(BodyRecord.from_dict, data.get('bodies', []))}
+    genera = {body['name']: body['genera'] for body in data.get('bodies', []) if 'genera' in body}
+    predictions = predict_system(system, stars, planets, data.get('main_star', ''), genera)
+    return {
+        'system': system.name,
+        'region': system.region,
+        'bodies': {
+            name: {
+                genus: [
+                    {
+                        'species': species,
+                        'name': bio_types[genus][species]['name'],
+                        'value': bio_types[genus][species]['value'],
+                        'colors': colors,
+                    } for species, colors in species_list
+                ] for genus, species_list in results.items()
+            } for name, results in predictions.items()
+        },
+    }
+
+
+def predict_lines(lines: Iterable[str], errors: TextIO = sys.stderr,
+                  first_line: int = 1) -> Iterator[dict[str, Any]]:
+    """
+    Predict the species of a stream of JSON-lines system records. Blank lines are skipped. Invalid records are
+    reported and skipped.
+
+    :param lines: The input lines
+    :param errors: Stream to report invalid records to
+    :param first_line: Line number of the first line, for error reports
+    :return: Iterator of prediction objects, in input order
+    """
+
+    for number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        try:
+            yield predict_record(json.loads(line))
+        except (ValueError, KeyError, TypeError) as ex:
+            print(f'Line {number}: {ex!r}', file=errors)
+
+
+def predict_chunk(first_line: int, lines: list[str]) -> ChunkResult:
+    """
+    Predict and encode a chunk of JSON-lines system records. This is the unit of work of the batch predictor.
+
+    :param first_line: Line number of the first line in the chunk
+    :param lines: The input lines
+    :return: The encoded prediction lines, any error messages, the number of bodies predicted and the number of
+     systems without a region
+    """
+
+    errors = io.StringIO()
+    encoded: list[str] = []
+    bodies = 0
+    no_region = 0
+    for result in predict_lines(lines, errors, first_line):
+        encoded.append(json.dumps(result, separators=(',', ':')) + '\n')
+        bodies += len(result['bodies'])
+        if result['region'] is None:
+            no_region += 1
+    return encoded, errors.getvalue(), bodies, no_region
+
+
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[tuple[int, list[str]]]:
+    iterator = iter(lines)
+    first_line = 1
+    while chunk := list(islice(iterator, chunk_size)):
+        yield first_line, chunk
+        first_line += len(chunk)
+
+
+def predict_batch(lines: Iterable[str], workers: int | None = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[ChunkResult]:
+    """
+    Predict a stream of JSON-lines system records across a pool of worker processes. The input is split into chunks
+    which are predicted in parallel and yielded in input order. Each worker compiles the rulesets once on import, and
+    only a bounded number of chunks are in flight, so arbitrarily large dumps can be streamed.
+
+    :param lines: The input lines
+    :param workers: Number of worker processes. Defaults to the CPU count. With 1 worker, chunks are predicted in
+     this process.
+    :param chunk_size: Number of input lines per chunk
+    :return: Iterator of chunk results, in input order
+    """
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for first_line, chunk in _chunks(lines, chunk_size):
+            yield predict_chunk(first_line, chunk)
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        pending: deque[Future[ChunkResult]] = deque()
+        for first_line, chunk in _chunks(lines, chunk_size):
+            pending.append(executor.submit(predict_chunk, first_line, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Command line entry point. Reads JSON-lines system records and writes JSON-lines predictions.
+
+    :param argv: Command line arguments, defaults to sys.argv
+    :return: Exit status
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='python -m bio_scan.predict',
+        description='Predict exobiology species for systems read as JSON-lines, one system per line.'
+    )
+    parser.add_argument('input', nargs='?', default='-', help='input file, or - for stdin (default)')
+    parser.add_argument('-o', '--output', default='-', help='output file, or - for stdout (default)')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='number of worker processes, 0 for one per CPU (default 1)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'systems per worker task (default {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--stats', action='store_true', help='report the body count and throughput to stderr')
+    args = parser.parse_args(argv)
+    if args.workers < 0 or args.chunk_size < 1:
+        parser.error('workers must be at least 0 and chunk size at least 1')
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    start = time.perf_counter()
+    systems = bodies = 0
+    region_warned = False
+    try:
+        for encoded, errors, body_count, no_region in predict_batch(source, args.workers or None, args.chunk_size):
+            target.writelines(encoded)
+            if errors:
+                sys.stderr.write(errors)
+            if no_region and findRegion is None and not region_warned:
+                print('Warning: ExploData is unavailable, so region rules are skipped for systems without a region '
+                      'field', file=sys.stderr)
+                region_warned = True
+            systems += len(encoded)
+            bodies += body_count
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    if args.stats:
+        elapsed = time.perf_counter() - start
+        print(f'{systems} systems, {bodies} bodies in {elapsed:.3f}s'
+              f' ({bodies / elapsed if elapsed else 0:.0f} bodies/s)', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -80,9 +80,42 @@ def get_settings(parent: ttk.Notebook) -> tk.Frame:
         variable=bioscan_globals.debug_logging_enabled
     ).grid(row=12, column=1, padx=x_button_padding, sticky=tk.SE)
 
+    # LANG: Species rule trace window button text
+    nb.Button(frame, text=tr.tl('View Species Rule Trace', bioscan_globals.translation_context), command=show_rule_trace) \
+        .grid(row=13, column=0, padx=x_padding, sticky=tk.SW)
+
+    nb.Checkbutton(
+        frame,
+        text=tr.tl('Record Species Rule Trace', bioscan_globals.translation_context),  # LANG: Rule trace checkbox label
+        variable=bioscan_globals.rule_trace_enabled
+    ).grid(row=13, column=1, padx=x_button_padding, sticky=tk.SE)
+
     return frame
 
 
+def show_rule_trace() -> None:
+    """
+    Open a window displaying the recorded species rule trace for the current system.
+    """
+
+    window = tk.Toplevel()
+    # LANG: Species rule trace window title
+    window.title(tr.tl('BioScan Species Rule Trace', bioscan_globals.translation_context))
+    window.columnconfigure(0, weight=1)
+    window.rowconfigure(0, weight=1)
+    text = tk.Text(window, wrap=tk.NONE, width=100, height=40)
+    scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=text.yview)
+    text.configure(yscrollcommand=scrollbar.set)
+    text.grid(row=0, column=0, sticky=tk.NSEW)
+    scrollbar.grid(row=0, column=1, sticky=tk.NS)
+    trace = bioscan_globals.rule_trace.format()
+    if not trace:
+        # LANG: Species rule trace window placeholder text
+        trace = tr.tl('No rule trace recorded. Enable rule tracing and save settings.', bioscan_globals.translation_context)
+    text.insert(tk.END, trace)
+    text.configure(state=tk.DISABLED)
+
+
 def get_general_tab(parent: ttk.Notebook) -> tk.Frame:
     """
     General tab builder.
@@ -67,4 +67,22 @@ class StatusFlags2(Flag):
     SUPERCHARGING_FSD = auto()
     SCO_ACTIVE = auto()
     SUPERCRUISE_ASSIST = auto()
-    NPC_CREW = auto()
\ No newline at end of file
+    NPC_CREW = auto()
+
+
+# Raw integer masks for the flags read on every Status.json update, to test bits without building enum values
+DOCKED = StatusFlags.DOCKED.value
+LANDED = StatusFlags.LANDED.value
+SUPERCRUISE = StatusFlags.SUPERCRUISE.value
+HAVE_LATLONG = StatusFlags.HAVE_LATLONG.value
+IN_SHIP = StatusFlags.IN_SHIP.value
+IN_FIGHTER = StatusFlags.IN_FIGHTER.value
+IN_SRV = StatusFlags.IN_SRV.value
+IS_ANALYSIS_MODE = StatusFlags.IS_ANALYSIS_MODE.value
+FSD_JUMP_IN_PROGRESS = StatusFlags.FSD_JUMP_IN_PROGRESS.value
+
+ON_FOOT = StatusFlags2.ON_FOOT.value
+STATION_ON_FOOT = StatusFlags2.STATION_ON_FOOT.value
+PLANET_ON_FOOT = StatusFlags2.PLANET_ON_FOOT.value
+HANGAR_ON_FOOT = StatusFlags2.HANGAR_ON_FOOT.value
+SOCIAL_ON_FOOT = StatusFlags2.SOCIAL_ON_FOOT.value
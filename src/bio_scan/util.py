@@ -1,23 +1,7 @@
-import math
-
 from l10n import translations as tr
 
 from bio_scan.globals import bioscan_globals
 
-def system_distance(coordinate_a: tuple[float, float, float], coordinate_b: tuple[float, float, float]) -> float:
-    """
-    Calculate distance between 3D coordinates
-
-    :param coordinate_a: x, y, z tuple
-    :param coordinate_b: x, y, z tuple
-    :return: Calculated distance between a and b
-    """
-
-    return math.sqrt((coordinate_a[0] - coordinate_b[0]) ** 2
-                     + (coordinate_a[1] - coordinate_b[1]) ** 2
-                     + (coordinate_a[2] - coordinate_b[2]) ** 2)
-
-
 def translate_colors(color: str) -> str:
     """
     Translates color strings
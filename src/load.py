@@ -6,13 +6,14 @@ import locale
 # Core imports
 from copy import deepcopy
 from datetime import datetime
-from typing import Any, Mapping, MutableMapping
+from typing import Any, Callable, Iterable, Mapping, MutableMapping
 import os
 import sys
 import re
 import requests
 import semantic_version
 import math
+import logging
 
 # TKinter imports
 import tkinter as tk
@@ -23,23 +24,27 @@ from tkinter import ttk
 import bio_scan.const
 from bio_scan.format_util import Formatter
 from bio_scan.globals import bioscan_globals as this
-from bio_scan.nebula_data.reference_stars import get_nearest_nebula
-from bio_scan.nebula_data.sectors import data as nebula_sectors
 from bio_scan.settings import get_settings, ship_in_whitelist, ship_sold, change_ship_name, add_ship_id, sync_ship_name
-from bio_scan.status_flags import StatusFlags2, StatusFlags
-from bio_scan.util import system_distance, translate_colors, translate_body, translate_genus, translate_species
-from bio_scan.body_data.util import get_body_shorthand, body_check, get_gravity_warning, star_check, calc_bearing
-from bio_scan.bio_data.codex import check_codex, check_codex_from_name
-from bio_scan.bio_data.regions import region_map, guardian_nebulae, tuber_zones
+import bio_scan.status_flags as status_flags
+from bio_scan.util import translate_colors, translate_body, translate_genus, translate_species
+from bio_scan.body_data.util import get_body_shorthand, get_gravity_warning
+import bio_scan.body_data.geodesy as geodesy
+from bio_scan.body_data.waypoint_index import WaypointIndex
+from bio_scan.bio_data.codex import check_codex, check_codex_from_name, add_codex, reset_codex, reset_species_names
+from bio_scan.bio_data.predicates import genus_dependencies
+from bio_scan.bio_data.system_context import SystemContext
+import bio_scan.bio_data.vectorized as vectorized
+import bio_scan.bio_data.prefilter as prefilter
 from bio_scan.bio_data.species import rules as bio_types
+from bio_scan.predict import possible_species
 
 # Database objects
-from sqlalchemy import select, delete, update, desc, asc
+from sqlalchemy import select, delete, update
 from sqlalchemy.orm import Session
 
 import ExploData
 from ExploData.explo_data import db
-from ExploData.explo_data.db import Commander, Planet, PlanetStatus, PlanetFlora, FloraScans, Waypoint, System, Metadata, Death, Resurrection, ExoBioSale
+from ExploData.explo_data.db import Commander, Planet, PlanetStatus, PlanetFlora, FloraScans, Waypoint, System, Metadata
 from ExploData.explo_data.body_data.struct import PlanetData, StarData, load_planets, load_stars, get_main_star
 from ExploData.explo_data.bio_data.codex import parse_variant
 from ExploData.explo_data.bio_data.genus import data as bio_genus
@@ -59,7 +64,6 @@ from l10n import translations as tr
 
 # 3rd Party
 from ExploData.explo_data.RegionMap import findRegion
-from ExploData.explo_data.RegionMapData import regions as galaxy_regions
 
 
 __version__ = bio_scan.const.version
@@ -88,7 +92,7 @@ def plugin_start3(plugin_dir: str) -> str:
 
         if not this.db_mismatch:
             register_event_callbacks({'Scan', 'FSSBodySignals', 'SAASignalsFound', 'ScanOrganic', 'CodexEntry',
-                                      'SellOrganicData'},
+                                      'SellOrganicData', 'Died', 'Resurrect'},
                                      process_data_event)
     return this.NAME
 
@@ -192,6 +196,7 @@ def prefs_changed(cmdr: str, is_beta: bool) -> None:
     config.set('bioscan_shorten_credits', this.credits_setting.get())
     this.formatter.set_shorten(this.credits_setting.get())
     this.formatter.set_locale(config.get_str('language'))
+    reset_species_names()
     config.set('bioscan_focus', this.focus_setting.get())
     config.set('bioscan_focus_distance', this.focus_distance.get())
     config.set('bioscan_focus_breakdown', this.focus_breakdown.get())
@@ -205,6 +210,12 @@ def prefs_changed(cmdr: str, is_beta: bool) -> None:
     config.set('bioscan_box_height', this.box_height.get())
     this.scroll_canvas.config(height=this.box_height.get())
     config.set('bioscan_debugging', this.debug_logging_enabled.get())
+    this.debug_logging = this.debug_logging_enabled.get()
+    config.set('bioscan_rule_trace', this.rule_trace_enabled.get())
+    if this.rule_trace_enabled.get() != this.rule_trace.enabled:
+        this.rule_trace.enabled = this.rule_trace_enabled.get()
+        this.rule_trace.clear()
+        reset_cache()  # Re-run species rules to record their trace
     config.set('bioscan_overlay', this.use_overlay.get())
     config.set('bioscan_overlay_color', this.overlay_color.get())
     config.set('bioscan_overlay_anchor_x', this.overlay_anchor_x.get())
@@ -247,6 +258,9 @@ def parse_config(cmdr: str = '') -> None:
     this.hide_waypoint_bearings = tk.BooleanVar(value=config.get_bool(key='bioscan_hide_waypoint_bearings', default=True))
     this.box_height = tk.IntVar(value=config.get_int(key='bioscan_box_height', default=80))
     this.debug_logging_enabled = tk.BooleanVar(value=config.get_bool(key='bioscan_debugging', default=False))
+    this.debug_logging = this.debug_logging_enabled.get()
+    this.rule_trace_enabled = tk.BooleanVar(value=config.get_bool(key='bioscan_rule_trace', default=False))
+    this.rule_trace.enabled = this.rule_trace_enabled.get()
     this.use_overlay = tk.BooleanVar(value=config.get_bool(key='bioscan_overlay', default=False))
     this.overlay_color = tk.StringVar(value=config.get_str(key='bioscan_overlay_color', default='#ffffff'))
     this.overlay_anchor_x = tk.IntVar(value=config.get_int(key='bioscan_overlay_anchor_x', default=0))
@@ -299,6 +313,9 @@ def plugin_stop() -> None:
     EDMC plugin stop function. Closes open threads and database sessions for clean shutdown.
     """
 
+    if this.display_pending is not None:
+        this.frame.after_cancel(this.display_pending)
+        this.display_pending = None
     if this.overlay.available():
         this.overlay.disconnect()
 
@@ -343,18 +360,47 @@ def journal_end(event: tk.Event) -> None:
                                       tr.tl('Please Submit a Report', this.translation_context))
     else:
         this.journal_label.grid_remove()
+        reset_codex()
+        if this.commander:
+            this.data_timeline.load(this.sql_session, this.commander.id)
+        this.unsold_value = None
         reload_system_data()
         update_display()
 
 
-def log(*args) -> None:
+def log(message: str, *args: Any) -> None:
     """
-    Debug logger helper function. Only writes to log if debug logging is enabled for BioScan.
-    :param args: Arguments to be passed to the EDMC logger
+    Debug logger helper function. Only formats and writes to log if debug logging is enabled for BioScan.
+    :param message: Message to be passed to the EDMC logger, with optional %-style placeholders
+    :param args: Values for the message placeholders
     """
 
-    if this.debug_logging_enabled.get():
-        logger.debug(args)
+    if this.debug_logging and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(message, *args)
+
+
+def rule_logger(body_name: str, genus: str) -> Callable[..., None] | None:
+    """
+    Get a logger for species rule evaluation. Messages are written to the debug log and the rule trace, as enabled.
+
+    :param body_name: The short name of the body being evaluated
+    :param genus: The genus being evaluated
+    :return: Logging function taking a message with %-style placeholders and their values, or None if neither debug
+     logging nor rule tracing are enabled
+    """
+
+    debug = this.debug_logging and logger.isEnabledFor(logging.DEBUG)
+    lines = this.rule_trace.begin(body_name, genus)
+    if not debug and lines is None:
+        return None
+
+    def note(message: str, *args: Any) -> None:
+        if debug:
+            logger.debug(message, *args)
+        if lines is not None:
+            lines.append(message % args if args else message)
+
+    return note
 
 
 def edsm_fetch() -> None:
@@ -416,342 +462,14 @@ def value_estimate(body: PlanetData, genus: str) -> tuple[str, int, int, list[tu
         return this.planet_cache[body.get_name()][genus][1]
 
     # Main processor for the species rulesets
-    possible_species: dict[str, set[str]] = {}
     genus_name = bio_genus[genus]['name'] if genus in bio_genus else 'Unknown'
-    log(f'System: {this.system.name} - Body: {body.get_name()}')
-    log(f'Running checks for {genus_name}:')
-    for species, data in bio_types[genus].items():
-        log(f'Species: {data["name"]}')
-        count = 0
-        for ruleset in data['rulesets']:
-            count += 1
-            log(f'Ruleset {count}')
-            eliminated = False
-            for rule_type, value in ruleset.items():
-                log(f'Processing {rule_type}')
-                match rule_type:
-                    case 'atmosphere':
-                        if value == 'Any' and body.get_atmosphere() in ['', 'None']:
-                            log('Eliminated for no atmos')
-                            eliminated = True
-                        elif value != 'Any' and body.get_atmosphere() not in value:
-                            log(f'Eliminated for atmos ({body.get_atmosphere()} in {value})')
-                            eliminated = True
-                    case 'atmosphere_component':
-                        for gas, percent in value.items():
-                            if body.get_gas(gas) < percent:
-                                log('Eliminated for lack of gas in atmosphere')
-                                eliminated = True
-                    case 'max_gravity':
-                        if body.get_gravity() / 9.797759 > value:
-                            log('Eliminated for high grav')
-                            eliminated = True
-                    case 'min_gravity':
-                        if body.get_gravity() / 9.797759 < value:
-                            log('Eliminated for low grav')
-                            eliminated = True
-                    case 'max_temperature':
-                        if not body.get_temp():
-                            continue
-                        if body.get_temp() > value:
-                            log('Eliminated for high heat')
-                            eliminated = True
-                    case 'min_temperature':
-                        if not body.get_temp():
-                            continue
-                        if body.get_temp() < value:
-                            log('Eliminated for low heat')
-                            eliminated = True
-                    case 'min_pressure':
-                        if not body.get_pressure():
-                            continue
-                        if body.get_pressure() / 101231.656250 < value:
-                            log('Eliminated for low pressure')
-                            eliminated = True
-                    case 'max_pressure':
-                        if not body.get_pressure():
-                            continue
-                        if body.get_pressure() / 101231.656250 >= value:
-                            log('Eliminated for high pressure')
-                            eliminated = True
-                    case 'max_orbital_period':
-                        if body.get_orbital_period() >= value:
-                            log('Eliminated for high orbital period')
-                            eliminated = True
-                    case 'volcanism':
-                        log(f'Compare {value} to {body.get_volcanism()}')
-                        if isinstance(value, list):
-                            found = False
-                            for volc_type in value:  # type: str
-                                if volc_type.startswith('='):
-                                    if body.get_volcanism() == volc_type[1:]:
-                                        found = True
-                                        break
-                                elif body.get_volcanism().find(volc_type) != -1:
-                                    found = True
-                                    break
-                            if not found:
-                                log('Eliminated for missing volcanism')
-                                eliminated = True
-                        elif value == 'Any' and body.get_volcanism() == '':
-                            log('Eliminated for no volcanism')
-                            eliminated = True
-                        elif value == 'None' and body.get_volcanism() != '':
-                            log('Eliminated for having volcanism')
-                            eliminated = True
-                        elif value.startswith('!'):  # 'not' values assume there must be some volcanism
-                            if body.get_volcanism().find(value[1:]) != -1 or body.get_volcanism() == '':
-                                log(f'Eliminated for having {value[1:]} volcanism')
-                                eliminated = True
-                    case 'body_type':
-                        if body.get_type() not in value:
-                            log('Eliminated for body type')
-                            eliminated = True
-                    case 'regions':
-                        if this.system.region is not None:
-                            log(f'Current region: {this.system.region} - {galaxy_regions[this.system.region]}')
-                            if this.system.region is not None:
-                                for region in value:
-                                    if region.startswith('!'):
-                                        log(f'Not in region ({region[1:]}) map: {region_map[region[1:]]}')
-                                        if this.system.region in region_map[region[1:]]:
-                                            log('Eliminated by region')
-                                            eliminated = True
-                                            break
-
-                                if not eliminated:
-                                    found = False
-                                    count = 0
-                                    for region in value:
-                                        if not region.startswith('!'):
-                                            count += 1
-                                            log(f'In region ({region}): {region_map[region]}')
-                                            if this.system.region in region_map[region]:
-                                                found = True
-
-                                    if not found and count > 0:
-                                        log('Eliminated by region')
-                                        eliminated = True
-
-                    case 'guardian':
-                        found = not value
-                        for zone, info in guardian_nebulae.items():
-                            log(f'Checking guardian zone: {zone}')
-                            max_distance, coordinates = info
-                            distance = system_distance((this.system.x, this.system.y, this.system.z), coordinates)
-                            log(f'  Distance: {distance}, Max: {max_distance}')
-                            if distance < max_distance:
-                                found = True
-                                break
-                        if not found:
-                            log('Eliminated for not being in a guardian zone')
-                            eliminated = True
-                    case 'tuber':
-                        found = False
-                        for zone, info in tuber_zones.items():
-                            if value == 'Any' or zone in value:
-                                distances, coordinates = info
-                                min_distance, max_distance = distances
-                                log(f'Checking tuber zone: {zone}')
-                                distance = system_distance((this.system.x, this.system.y, this.system.z), coordinates)
-                                log(f'  Distance: {distance}, Max: {max_distance}')
-                                if min_distance <= distance <= max_distance:
-                                    found = True
-                                    break
-                        if not found:
-                            log('Eliminated for not being in a tuber zone')
-                            eliminated = True
-                    case 'bodies':
-                        if not body_check(value, this.planets):
-                            log('Eliminated for missing body type(s)')
-                            eliminated = True
-                    case 'main_star':
-                        if isinstance(value, list):
-                            match = False
-                            for star_info in value:
-                                if isinstance(star_info, tuple):
-                                    if star_check(star_info[0], this.main_star_type):
-                                        for flag in ['', 'a', 'b', 'ab', 'z']:
-                                            if star_info[1] + flag == this.main_star_luminosity:
-                                                match = True
-                                                break
-                                else:
-                                    if star_check(star_info, this.main_star_type):
-                                        match = True
-                                        break
-                            if not match:
-                                log('Eliminated for star type')
-                                eliminated = True
-                        else:
-                            if not star_check(value, this.main_star_type):
-                                log('Eliminated for star type')
-                                eliminated = True
-                    case 'parent_star':
-                        match = False
-                        for star_type in value:
-                            if star_check(star_type, this.main_star_type):
-                                match = True
-                                break
-                        for star in body.get_parent_stars():
-                            if match:
-                                break
-                            if star in this.stars:
-                                for star_type in value:
-                                    if star_check(star_type, this.stars[star].get_type()):
-                                        match = True
-                                        break
-                        if not match:
-                            log('Eliminated for star type')
-                            eliminated = True
-                    case 'star':
-                        if isinstance(value, list):
-                            match = False
-                            for _, star in this.stars.items():
-                                for star_info in value:
-                                    if isinstance(star_info, tuple):
-                                        if star_check(star_info[0], star.get_type()):
-                                            log(f'Checking {star_info[0]} {star_info[1]} against {star.get_type()}' +
-                                                f' {star.get_luminosity()}')
-                                            for flag in ['', 'a', 'b', 'ab', 'z']:
-                                                if star_info[1] + flag == star.get_luminosity():
-                                                    match = True
-                                                    break
-                                    else:
-                                        log(f'Checking {star_info} against {star.get_type()}')
-                                        if star_check(star_info, star.get_type()):
-                                            match = True
-                                            break
-                                if match:
-                                    break
-                            if not match:
-                                log('Eliminated for star type')
-                                eliminated = True
-                        else:
-                            match = False
-                            for _, star in this.stars.items():
-                                if star_check(value, star.get_type()):
-                                    match = True
-                                    break
-                            if not match:
-                                log('Eliminated for star type')
-                                eliminated = True
-                    case 'nebula':
-                        if not this.system.x:
-                            log('Missing system coordinates')
-                            continue
-                        if value not in ['all', 'large']:
-                            log('Invalid nebula check type')
-                        found = False
-                        for sector in nebula_sectors:
-                            if this.system.name.startswith(sector):
-                                found = True
-                        if not found:
-                            current_location: tuple[float, float, float] = (this.system.x, this.system.y, this.system.z)
-                            all_nebulae = True if value == 'all' else False
-                            for system, coordinates in get_nearest_nebula(current_location).items():
-                                distance = system_distance(current_location, coordinates)
-                                log(f'Distance to {system} from {this.system.name}: {distance:n} ly')
-                                if distance < 150.0:
-                                    found = True
-                                    break
-                            if not found and all_nebulae:
-                                for system, coordinates in get_nearest_nebula(current_location, 'planetary').items():
-                                    distance = system_distance(current_location, coordinates)
-                                    log(f'Distance to {system} from {this.system.name}: {distance:n} ly')
-                                    if distance < 100.0:
-                                        found = True
-                                        break
-                        if not found:
-                            log('Eliminated for lack of nebula')
-                            eliminated = True
-                    case 'distance':
-                        if body.get_distance() < value:
-                            eliminated = True
-                    case 'system':
-                        if this.system.name != value:
-                            eliminated = True
-
-                if eliminated:
-                    break
-            if not eliminated:
-                possible_species[species] = set()
-
-    # For remaining species, run color checks if that genus has color variants
-    eliminated_species: set[str] = set()
-    if 'colors' in bio_genus[genus]:
-        if 'species' in bio_genus[genus]['colors']:
-            for species in possible_species:
-                if 'star' in bio_genus[genus]['colors']['species'][species]:
-                    found = False
-                    for star in body.get_parent_stars():
-                        if found:
-                            break
-                        if star in this.stars:
-                            for star_type in bio_genus[genus]['colors']['species'][species]['star']:
-                                log('Checking star type %s against %s' % (star_type, this.stars[star].get_type()))
-                                if star_check(star_type, this.stars[star].get_type()):
-                                    possible_species[species].add(
-                                        bio_genus[genus]['colors']['species'][species]['star'][star_type])
-                                    found = True
-                                    break
-                    for star_name, star_data in this.stars.items():
-                        if star_name in body.get_parent_stars():
-                            continue
-                        if star_data.get_distance() == 0 or parent_is_H(star_data, body):
-                            for star_type in bio_genus[genus]['colors']['species'][species]['star']:
-                                log('Checking star type %s against %s' % (star_type, star_data.get_type()))
-                                if star_check(star_type, star_data.get_type()):
-                                    possible_species[species].add(
-                                        bio_genus[genus]['colors']['species'][species]['star'][star_type])
-                                    break
-                elif 'element' in bio_genus[genus]['colors']['species'][species]:
-                    for element in bio_genus[genus]['colors']['species'][species]['element']:
-                        if element in body.get_materials():
-                            possible_species[species].add(
-                                bio_genus[genus]['colors']['species'][species]['element'][element])
-
-                if not possible_species[species]:
-                    eliminated_species.add(species)
-                    log('Eliminated for lack of color')
-        else:
-            found_colors: set[str] = set()
-            found = False
-            for star in body.get_parent_stars():
-                if found:
-                    break
-                if star in this.stars:
-                    for star_type in bio_genus[genus]['colors']['star']:
-                        log('Checking star type %s against %s' % (star_type, this.stars[star].get_type()))
-                        if star_check(star_type, this.stars[star].get_type()):
-                            found_colors.add(bio_genus[genus]['colors']['star'][star_type])
-                            found = True
-                            break
-            for star_name, star_data in this.stars.items():
-                if star_name in body.get_parent_stars():
-                    continue
-                if star_data.get_distance() == 0 or parent_is_H(star_data, body):
-                    for star_type in bio_genus[genus]['colors']['star']:
-                        log('Checking star type %s against %s' % (star_type, star_data.get_type()))
-                        if star_check(star_type, star_data.get_type()):
-                            found_colors.add(bio_genus[genus]['colors']['star'][star_type])
-                            break
-            if not found_colors:
-                possible_species.clear()
-                log('Eliminated genus for lack of color')
-            else:
-                for species in possible_species:
-                    possible_species[species].update(found_colors)
-
-    # Species checks are complete. Sort the results.
-    final_species: dict[str, list[str]] = {}
-    for species in possible_species:
-        if species not in eliminated_species:
-            final_species[species] = sorted(possible_species[species])
-
-    sorted_species: list[tuple[str, list[str]]] = sorted(
-        final_species.items(),
-        key=lambda target_species: bio_types[genus][target_species[0]]['value']
-    )
+    note = rule_logger(body.get_name(), genus)
+    if note:
+        note('System: %s - Body: %s', this.system.name, body.get_name())
+        note('Running checks for %s:', genus_name)
+    residual_rules = vectorized.residual_rules if vectorized.available() else prefilter.residual_rules
+    sorted_species = possible_species(body, genus, this.system_context, get_body_filter(body).get(genus, ()),
+                                      residual_rules, note)
 
     # Save the results to the cache and return. Missing codex entries are evaluated here.
     if len(sorted_species) == 1:
@@ -846,69 +564,113 @@ def value_estimate(body: PlanetData, genus: str) -> tuple[str, int, int, list[tu
     return this.planet_cache[body.get_name()][genus][1]
 
 
-def parent_is_H(star: StarData, body: PlanetData) -> bool:
+def get_body_filter(body: PlanetData) -> dict[str, prefilter.GenusCandidates]:
     """
-    Checks for parent stars which are black holes. Bios nearly always base their color on the parent star, but
-    when the parent star is a black hole, the orbiting stars can provide color instead.
+    Get the rulesets which pass the body-level rules for a planet. With NumPy, any planets without current results are
+    filtered together by the vectorized filter. Otherwise, the planet is looked up in the prefilter indexes.
 
-    :param star: The star to check for a parent black hole
-    :param body: The planet data to ensure the star is a valid parent star
-    :return: True if the star has a parent black hole and the body is orbiting it
+    :param body: The planet data
+    :return: Mapping of genus to the candidate species and ruleset indexes which passed the body-level rules
     """
 
-    log(f'Checking for BH parent, star {star.get_name()}, body {body.get_name()}')
-    possible = False
-    if star.get_name() != this.system.name:
-        if body.get_name().startswith(star.get_name() + " "):
-            log('Star is parent star')
-            log(f'Main star is {get_main_star(this.system, this.sql_session).name}')
-            if get_main_star(this.system, this.sql_session).name == this.system.name:
-                log('Main star is system star')
-                if this.main_star_type == 'H':
-                    log('Primary system star IS a black hole!')
-                    possible = True
-            else:
-                log('Multi-star system')
-                star_parts = star.get_name().split(' ')
-                if len(star_parts[0]) > 1:
-                    log('This is a barycenter')
-                    for bary_star in star_parts[0]:
-                        log(f'Checking {bary_star}...')
-                        if bary_star in this.stars and this.stars[bary_star].get_type() == 'H':
-                            log(f'{bary_star} IS a black hole!')
-                            possible = True
-                else:
-                    if len(star_parts) == 1:
-                        log(f'{star.get_name()} is a parent star...')
-                        if star.get_type() == 'H':
-                            log('IS a black hole!')
-                            possible = True
-                    else:
-                        log(f'{star.get_name()} is a sub star...')
-                        if star_parts[0] in this.stars and this.stars[star_parts[0]].get_type() == 'H':
-                            log(f'{star_parts[0]} IS a black hole!')
-                            possible = True
-
-
-    if possible and body.get_name().startswith(star.get_name()):
-        return True
-    return False
+    body_name = body.get_name()
+    if body_name not in this.body_filter:
+        if vectorized.available():
+            missing = {name: planet for name, planet in this.planets.items() if name not in this.body_filter}
+            missing[body_name] = body
+            for name, keys in vectorized.filter_bodies(missing).items():
+                this.body_filter[name] = prefilter.group(keys)
+        else:
+            this.body_filter[body_name] = prefilter.candidates(body)
+    return this.body_filter[body_name]
 
 
-def reset_cache(planet: str = '') -> None:
+def reset_cache(planet: str = '', genera: Iterable[str] | None = None) -> None:
     """
     Resets the species calculation cache. If planet is passed, resets only that planet.
+    If genera is passed, resets only those genera.
 
     :param planet: Optional parameter to reset only a specific planet
+    :param genera: Optional parameter to reset only specific genera
     """
 
-    if planet and planet in this.planet_cache:
-        for genus in this.planet_cache[planet]:
-            this.planet_cache[planet][genus] = (True, this.planet_cache[planet][genus][1])
+    if planet:
+        targets = [this.planet_cache[planet]] if planet in this.planet_cache else []
     else:
-        for planet, data in this.planet_cache.items():
-            for genus in data:
-                data[genus] = (True, data[genus][1])
+        targets = list(this.planet_cache.values())
+    for data in targets:
+        for genus in (data.keys() if genera is None else data.keys() & set(genera)):
+            data[genus] = (True, data[genus][1])
+
+
+def colored_by_star(genus: str) -> bool:
+    """
+    Check if any species of a genus takes its color from the body's parent stars.
+
+    :param genus: The genus code
+    :return: True if the genus has star-based color variants
+    """
+
+    colors = bio_genus.get(genus, {}).get('colors', {})
+    if 'species' in colors:
+        return any('star' in species for species in colors['species'].values())
+    return 'star' in colors
+
+
+def dependent_genera(dependency: str) -> set[str]:
+    """
+    Get the genera whose species determinations depend on data beyond the body itself.
+
+    :param dependency: 'bodies' for the planet types in the system, 'stars' for system-wide star rules, or
+     'parent_stars' for the body's parent stars
+    :return: Set of genus codes
+    """
+
+    genera = {genus for genus, dependencies in genus_dependencies.items() if dependency in dependencies}
+    if dependency == 'parent_stars':
+        genera.update(genus for genus in bio_types if colored_by_star(genus))
+    return genera
+
+
+def invalidate_planet(name: str, previous_type: str | None) -> None:
+    """
+    Reset cached species determinations after a planet is added or updated. Only that planet is reset unless the
+    set of planet types in the system changed, in which case genera with body type rules are reset for every planet.
+
+    :param name: The short name of the planet
+    :param previous_type: The planet type before the update, or None if the planet is new
+    """
+
+    this.body_filter.pop(name, None)
+    this.system_context.invalidate_body(name)
+    reset_cache(name)
+    body_type = this.planets[name].get_type()
+    if body_type == previous_type:
+        return
+    other_types = {planet.get_type() for planet_name, planet in this.planets.items() if planet_name != name}
+    if body_type not in other_types or (previous_type and previous_type not in other_types):
+        this.system_context.invalidate_bodies()
+        reset_cache(genera=dependent_genera('bodies'))
+
+
+def invalidate_star(name: str) -> None:
+    """
+    Reset cached species determinations after a star is added or updated. Genera with system-wide star rules are reset
+    for every planet. Genera depending on parent stars are only reset for planets orbiting the star, unless the star
+    is the arrival star or a black hole, which can provide color to any planet.
+
+    :param name: The short name of the star
+    """
+
+    reset_cache(genera=dependent_genera('stars'))
+    parent_genera = dependent_genera('parent_stars')
+    star = this.stars.get(name)
+    if star is None or name == this.system.name or star.get_distance() == 0 or star.get_type() == 'H':
+        reset_cache(genera=parent_genera)
+        return
+    for planet_name, planet in this.planets.items():
+        if name in planet.get_parent_stars() or planet_name.startswith(name + ' '):
+            reset_cache(planet_name, parent_genera)
 
 
 def get_possible_values(body: PlanetData) -> list[tuple[str, tuple[int, int, list[tuple[str, list[str], int]]]]]:
@@ -952,13 +714,18 @@ def reset() -> None:
 
     this.main_star_type = ''
     this.main_star_luminosity = ''
+    this.main_star_name = ''
     this.location_name = ''
     this.location_id = -1
+    this.waypoint_index = None
     this.location_state = ''
     this.fetched_edsm = False
     this.planets = {}
     this.planet_cache = {}
+    this.body_filter = {}
+    this.rule_trace.clear()
     this.stars = {}
+    update_system_context()
     try:
         this.scroll_canvas.yview_moveto(0.0)
     except tk.TclError as ex:
@@ -968,11 +735,24 @@ def reset() -> None:
 
 def reload_system_data() -> None:
     this.planets = load_planets(this.system, this.sql_session)
+    this.body_filter = {}
     this.stars = load_stars(this.system, this.sql_session)
     main_star = get_main_star(this.system, this.sql_session)
     if main_star:
         this.main_star_type = main_star.type
         this.main_star_luminosity = main_star.luminosity
+        this.main_star_name = main_star.name
+    update_system_context()
+
+
+def update_system_context() -> None:
+    """
+    Rebuild the system context used by the species rules. System-level rule results are cached on the context, so this
+    must be run whenever the system or its star data changes.
+    """
+
+    this.system_context = SystemContext(this.system, this.stars, this.planets,
+                                        this.main_star_type, this.main_star_luminosity, this.main_star_name)
 
 
 def add_star(entry: Mapping[str, Any]) -> None:
@@ -994,6 +774,7 @@ def add_star(entry: Mapping[str, Any]) -> None:
     star_data.set_distance(entry['DistanceFromArrivalLS'])
 
     this.stars[body_short_name] = star_data
+    update_system_context()
 
 
 def journal_entry(
@@ -1023,6 +804,8 @@ def journal_entry(
             this.sql_session.add(this.commander)
             this.sql_session.commit()
         this.commander = commander
+        this.data_timeline.load(this.sql_session, commander.id)
+        this.unsold_value = None
         parse_config(cmdr)
         system_changed = True
         reload_system_data()
@@ -1048,7 +831,7 @@ def journal_entry(
         this.mode_changed = True
         update_display()
 
-    log(f'Event {entry["event"]}')
+    log('Event %s', entry['event'])
 
     ship_name = monitor.state['ShipName'] if monitor.state['ShipName'] else ship_name_map.get(
                 monitor.state['ShipType'], monitor.state['ShipType'])
@@ -1155,27 +938,33 @@ def process_data_event(entry: Mapping[str, Any]) -> None:
                 if entry['DistanceFromArrivalLS'] == 0.0:
                     this.main_star_type = entry['StarType']
                     this.main_star_luminosity = entry['Luminosity']
-                reset_cache()
+                    this.main_star_name = body_short_name
+                update_system_context()
+                invalidate_star(body_short_name)
                 update_display()
             if 'PlanetClass' in entry and entry['PlanetClass']:
+                previous_type = None
                 if body_short_name in this.planets:
+                    previous_type = this.planets[body_short_name].get_type()
                     this.planets[body_short_name].refresh()
                 else:
                     this.planets[body_short_name] = PlanetData.from_journal(this.system, body_short_name,
                                                                             entry['BodyID'], this.sql_session)
-                reset_cache()
+                invalidate_planet(body_short_name, previous_type)
                 update_display()
 
         case 'FSSBodySignals' | 'SAASignalsFound':
             body_short_name = get_body_name(entry['BodyName'])
             if body_short_name.endswith('Ring') or body_short_name.find('Belt Cluster') != -1:
                 return
+            previous_type = None
             if body_short_name in this.planets:
+                previous_type = this.planets[body_short_name].get_type()
                 this.planets[body_short_name].refresh()
             else:
                 this.planets[body_short_name] = PlanetData.from_journal(this.system, body_short_name,
                                                                         entry['BodyID'], this.sql_session)
-            reset_cache()
+            invalidate_planet(body_short_name, previous_type)
             update_display()
 
         case 'ScanOrganic':
@@ -1198,6 +987,8 @@ def process_data_event(entry: Mapping[str, Any]) -> None:
                     scan_level = 3
 
             if target_body is not None:
+                if scan_level == 3:
+                    add_unsold_scan(target_body, entry['Genus'], entry['Species'])
                 timestamp: datetime = datetime.fromisoformat(entry['timestamp'])
                 this.planets[target_body].set_flora_species_scan(
                     entry['Genus'], entry['Species'], entry.get('WasLogged', None), scan_level, timestamp, this.commander.id
@@ -1212,6 +1003,7 @@ def process_data_event(entry: Mapping[str, Any]) -> None:
                         .where(FloraScans.count < 3).where(FloraScans.flora_id != data.id)
                     this.sql_session.execute(stmt)
                     this.sql_session.commit()
+                    this.waypoint_index = None  # Rebuilt without the deleted sample sites
 
                 match scan_level:
                     case 1 | 2:
@@ -1223,12 +1015,20 @@ def process_data_event(entry: Mapping[str, Any]) -> None:
                                 this.commander.id,
                                 scan=True
                             )
+                            index_waypoint(target_body, entry['Genus'], (this.planet_latitude, this.planet_longitude),
+                                           'scan')
                     case _:
                         this.current_scan = ('', '')
 
-            update_display()
+            update_display(immediate=True)
 
         case 'CodexEntry':
+            if this.commander:
+                region = this.system.region if this.system else None
+                match = re.match(r'^\$Codex_RegionName_(\d+);$', entry.get('Region', ''))
+                if match:
+                    region = int(match.group(1))
+                add_codex(this.commander.id, entry['Name'], region)
             if this.edd_replay:
                 return
             if entry['Category'] == '$Codex_Category_Biology;' and 'BodyID' in entry:
@@ -1251,11 +1051,15 @@ def process_data_event(entry: Mapping[str, Any]) -> None:
                             this.planets[target_body].add_flora_waypoint(
                                 genus, species, (latitude, longitude), this.commander.id
                             )
-                    reset_cache()  # Required to clear found codex marks
+                            index_waypoint(target_body, genus, (latitude, longitude), 'tag')
+                        reset_cache(genera=[genus])  # Required to clear found codex marks
 
                 update_display()
 
-        case 'SellOrganicData':
+        case 'SellOrganicData' | 'Died' | 'Resurrect':
+            this.data_timeline.refresh(this.sql_session)
+            # Sales and deaths clear all unsold data, but only some resurrection types do
+            this.unsold_value = None if entry['event'] == 'Resurrect' else 0
             update_display()
 
 
@@ -1281,28 +1085,29 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
         if this.location_id == -1 and body_name in this.planets:
             this.location_id = this.planets[body_name].get_id()
 
-    status = StatusFlags(entry['Flags'])
-    status2 = StatusFlags2(0)
-    if 'Flags2' in entry:
-        status2 = StatusFlags2(entry['Flags2'])
+    # Status.json updates constantly on planets, so flags are tested as plain ints
+    flags = entry['Flags']
+    flags2 = entry.get('Flags2', 0)
+    has_lat_long = bool(flags & status_flags.HAVE_LATLONG)
     refresh = False
+    moved = False
     scroll = False
 
     current_state = this.location_state
     this.location_state = ''
-    if StatusFlags.HAVE_LATLONG in status:
-        if StatusFlags.IN_SHIP in status or StatusFlags.IN_FIGHTER in status:
-            if StatusFlags.LANDED in status:
+    if has_lat_long:
+        if flags & (status_flags.IN_SHIP | status_flags.IN_FIGHTER):
+            if flags & status_flags.LANDED:
                 this.location_state = 'surface'
             else:
                 this.location_state = 'approach'
-        elif StatusFlags.IN_SRV in status or StatusFlags.LANDED in status:
+        elif flags & (status_flags.IN_SRV | status_flags.LANDED):
             this.location_state = 'surface'
-        elif StatusFlags2.ON_FOOT in status2 and StatusFlags2.PLANET_ON_FOOT in status2 \
-                and StatusFlags2.SOCIAL_ON_FOOT not in status2 and StatusFlags2.STATION_ON_FOOT not in status2:
+        elif flags2 & status_flags.ON_FOOT and flags2 & status_flags.PLANET_ON_FOOT \
+                and not flags2 & (status_flags.SOCIAL_ON_FOOT | status_flags.STATION_ON_FOOT):
             this.location_state = 'surface'
 
-    if StatusFlags.FSD_JUMP_IN_PROGRESS in status:
+    if flags & status_flags.FSD_JUMP_IN_PROGRESS:
         refresh = True
         if this.location_state != 'fsd_jump':
             this.location_state = 'fsd_jump'
@@ -1321,7 +1126,7 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
             scroll = True
         refresh = True
 
-    if StatusFlags.HAVE_LATLONG in status:
+    if has_lat_long:
         if 'Altitude' in entry:
             if this.focus_setting.get() == 'Near Surface' and \
                     (this.planet_altitude > this.focus_distance.get() > entry['Altitude'] or
@@ -1331,16 +1136,19 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
             this.planet_altitude = entry['Altitude']
         else:
             this.planet_altitude = 0
+        heading = entry['Heading'] if 'Heading' in entry else None
+        moved = (entry['Latitude'], entry['Longitude'], heading) != \
+            (this.planet_latitude, this.planet_longitude, this.planet_heading)
         this.planet_latitude = entry['Latitude']
         this.planet_longitude = entry['Longitude']
         this.planet_radius = entry['PlanetRadius']
-        this.planet_heading = entry['Heading'] if 'Heading' in entry else None
+        this.planet_heading = heading
         try:
-            if this.location_name != '' and (this.current_scan[0]
-                                             or this.planets[this.location_name].has_waypoint(this.commander.id)):
-                refresh = True
+            # Only the position-dependent display needs updating as the player moves
+            moved = moved and this.location_name != '' and (this.current_scan[0] or location_has_waypoints())
         except KeyError:
-            log(f"Current location ({this.location_name}) has no planet data")
+            moved = False
+            log('Current location (%s) has no planet data', this.location_name)
     else:
         this.planet_latitude = None
         this.planet_longitude = None
@@ -1348,28 +1156,23 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
         this.planet_altitude = 0 if this.location_state == 'surface' else 10000
         this.planet_radius = 0
 
-    if this.analysis_mode != (StatusFlags.IS_ANALYSIS_MODE in status):
-        this.analysis_mode = (StatusFlags.IS_ANALYSIS_MODE in status)
+    analysis_mode = bool(flags & status_flags.IS_ANALYSIS_MODE)
+    if this.analysis_mode != analysis_mode:
+        this.analysis_mode = analysis_mode
         this.mode_changed = True
         refresh = True
 
-    if StatusFlags2.PLANET_ON_FOOT in status2:
-        if (StatusFlags2.SOCIAL_ON_FOOT in status2) or (StatusFlags2.HANGAR_ON_FOOT in status2):
-            on_foot = False
-        else:
-            on_foot = True
-    else:
-        on_foot = False
+    on_foot = bool(flags2 & status_flags.PLANET_ON_FOOT) and \
+        not flags2 & (status_flags.SOCIAL_ON_FOOT | status_flags.HANGAR_ON_FOOT)
 
-    if StatusFlags.HAVE_LATLONG in status:
-        if StatusFlags.IN_SHIP in status:
-            if StatusFlags.LANDED in status:
-                if not this.ship_location and this.planet_latitude:
-                    this.ship_location = (this.planet_latitude, this.planet_longitude)
-                    refresh = True
+    if has_lat_long and flags & status_flags.IN_SHIP and flags & status_flags.LANDED:
+        if not this.ship_location and this.planet_latitude:
+            this.ship_location = (this.planet_latitude, this.planet_longitude)
+            refresh = True
 
-    if this.in_supercruise != (StatusFlags.SUPERCRUISE in status):
-        this.in_supercruise = (StatusFlags.SUPERCRUISE in status)
+    in_supercruise = bool(flags & status_flags.SUPERCRUISE)
+    if this.in_supercruise != in_supercruise:
+        this.in_supercruise = in_supercruise
         this.mode_changed = True
         refresh = True
 
@@ -1378,8 +1181,7 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
         this.mode_changed = True
         refresh = True
 
-    docked = True if (StatusFlags.DOCKED in status) else False
-
+    docked = bool(flags & status_flags.DOCKED)
     if this.docked != docked:
         this.docked = docked
         this.mode_changed = True
@@ -1387,6 +1189,8 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
 
     if refresh:
         update_display()
+    elif moved:
+        update_position()
     if scroll:
         try:
             this.scroll_canvas.yview_moveto(0.0)
@@ -1396,31 +1200,11 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
     return ''
 
 
-def calc_distance(lat_long: tuple[float, float], lat_long2: tuple[float, float] | None = None) -> float:
-    """
-    Use the haversine formula to get the distance between two points of latitude/longitude.
-
-    :param lat_long: The lat/long coordinates of the first (target) position.
-    :param lat_long2: Optional. The lat/long coordinates of the second position. Defaults to the player's position.
-    :return: The calculated distance (in meters).
-    """
-
-    lat_long2 = lat_long2 if lat_long2 else (this.planet_latitude, this.planet_longitude)
-    phi_1 = math.radians(lat_long2[0])
-    phi_2 = math.radians(lat_long[0])
-    delta_phi = math.radians(lat_long[0] - lat_long2[0])
-    delta_lambda = math.radians(lat_long[1] - lat_long2[1])
-    a = math.sin(delta_phi / 2.0) ** 2 + \
-        math.cos(phi_1) * math.cos(phi_2) * \
-        math.sin(delta_lambda / 2.0) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return this.planet_radius * c
-
-
 def get_distance(lat_long: tuple[float, float] | None = None, genus: str | None = None, species: str | None = None, all: bool = False) -> float | list[float] | None:
     """
     Get all distances or the shortest distance to a scan location for a species.
-    Defaults to the currently in-progress species.
+    Defaults to the currently in-progress species. Only one species of a genus can be found on a body, so the sample
+    sites are looked up by genus.
 
     :param lat_long: The lat/long coordinates to consider for the distance. Defaults to the player's location.
     :param genus: (optional) Genus of target species
@@ -1434,43 +1218,78 @@ def get_distance(lat_long: tuple[float, float] | None = None, genus: str | None
             genus = this.current_scan[0]
             species = this.current_scan[1]
 
-    distance_list = []
     if this.planet_latitude is not None and this.planet_longitude is not None:
-        if this.location_name and genus:
-            waypoints: list[Waypoint] = (this.planets[this.location_name]
-                                         .get_flora(genus, species)[0].waypoints)
-            waypoints = list(
-                filter(lambda item: item.type == 'scan' and item.commander_id == this.commander.id, waypoints))
-            for waypoint in waypoints:
-                distance_list.append(calc_distance((waypoint.latitude, waypoint.longitude), lat_long))
+        index = get_waypoint_index()
+        if index and genus:
+            origin = lat_long if lat_long else (this.planet_latitude, this.planet_longitude)
+            distance_list = geodesy.distances(origin, index.scan_sites(genus), this.planet_radius)
             if all:
                 return distance_list
             return min(distance_list, default=None)
     return None
 
 
-def get_nearest(genus: str, waypoints: list[Waypoint]) -> str:
+def get_waypoint_index() -> WaypointIndex | None:
+    """
+    Get the waypoint index of the current body, building it when the body is first focused. The index is updated as
+    waypoints are added, and discarded when waypoints are deleted or the system changes.
+
+    :return: The waypoint index, or None if the player isn't at a known planet
+    """
+
+    if not this.commander or not this.planet_radius or this.location_name not in this.planets:
+        return None
+    index = this.waypoint_index
+    if index is None or index.body != this.location_name or index.radius != this.planet_radius:
+        index = WaypointIndex(this.location_name, this.planet_radius,
+                              {genus: data['distance'] for genus, data in bio_genus.items()})
+        tags: list[tuple[str, tuple[float, float]]] = []
+        for flora in this.planets[this.location_name].get_flora():
+            for waypoint in flora.waypoints:
+                if waypoint.commander_id == this.commander.id:
+                    if waypoint.type == 'scan':
+                        index.add_scan(flora.genus, (waypoint.latitude, waypoint.longitude))
+                    elif waypoint.type == 'tag':
+                        tags.append((flora.genus, (waypoint.latitude, waypoint.longitude)))
+        for genus, lat_long in tags:  # Added after the sample sites, so each tag is only checked once
+            index.add_tag(genus, lat_long)
+        this.waypoint_index = index
+    return index
+
+
+def index_waypoint(body_name: str, genus: str, lat_long: tuple[float, float], waypoint_type: str) -> None:
+    """
+    Add a new waypoint to the waypoint index, if the index is built for its body.
+
+    :param body_name: The body name
+    :param genus: The genus ID
+    :param lat_long: The lat/long coordinates of the waypoint
+    :param waypoint_type: 'scan' for sample sites, 'tag' for tagged waypoints
+    """
+
+    index = this.waypoint_index
+    if index is None or index.body != body_name:
+        return
+    if waypoint_type == 'scan':
+        index.add_scan(genus, lat_long)
+    else:
+        index.add_tag(genus, lat_long)
+
+
+def get_nearest(genus: str) -> str:
     """
     Check logged waypoints and return the nearest one that's not within a previous sample radius.
 
     :param genus: The genus ID
-    :param waypoints: A list of logged waypoints
     :return: Display string with the distance and bearing to the nearest qualifying waypoint. If none is found, return
              an empty string.
     """
 
     if this.planet_heading and this.planet_latitude and this.planet_longitude:
-        distances: list[tuple[float, float]] = []
-        for waypoint in waypoints:
-            min_distance = get_distance((waypoint.latitude, waypoint.longitude))
-            genus_distance = bio_genus[genus]["distance"] if genus in bio_genus else 100
-            if min_distance is None or min_distance > genus_distance:
-                distance = calc_distance((waypoint.latitude, waypoint.longitude))
-                bearing = calc_bearing((waypoint.latitude, waypoint.longitude))
-                distances.append((distance, bearing))
-
-        if len(distances):
-            distance, bearing = sorted(distances, key=lambda item: item[0])[0]
+        index = get_waypoint_index()
+        nearest = index.nearest_tag(genus, (this.planet_latitude, this.planet_longitude)) if index else None
+        if nearest:
+            distance, bearing = nearest
             # LANG: Meters unit
             distance_formatted = this.formatter.format_distance(int(distance), tr.tl('m', this.translation_context), False)
             bearing_diff = abs(bearing - this.planet_heading) % 360
@@ -1512,37 +1331,11 @@ def get_bodies_summary(bodies: dict[str, PlanetData], focused: bool = False) ->
                     complete = False
                 else:
                     if scan[0].scanned_at:
-                        next_death = this.sql_session.scalar(select(Death).where(Death.commander_id == this.commander.id)
-                                                             .where(Death.died_at > scan[0].scanned_at)
-                                                             .order_by(asc(Death.died_at)))
-                        next_resurrection = this.sql_session.scalar(select(Resurrection).where(Resurrection.commander_id == this.commander.id)
-                                                                    .where(Resurrection.type.in_(['escape', 'recover', 'rejoin']))
-                                                                    .where(Resurrection.resurrected_at > scan[0].scanned_at)
-                                                                    .order_by(asc(Resurrection.resurrected_at)))
-                        lost_date = None
-                        if next_death and next_resurrection:
-                            lost_date = next_death.died_at if next_death.died_at < next_resurrection.resurrected_at else next_resurrection.resurrected_at
-                        elif next_death:
-                            lost_date = next_death.died_at
-                        elif next_resurrection:
-                            lost_date = next_resurrection.resurrected_at
-                        if lost_date:
-                            sale = this.sql_session.scalar(
-                                select(ExoBioSale).where(ExoBioSale.commander_id == this.commander.id)
-                                .where(ExoBioSale.sold_at > scan[0].scanned_at).where(ExoBioSale.sold_at < lost_date))
-                            if sale:
-                                num_complete += 1
-                                was_sold = True
-                            else:
-                                complete = False
-                                was_lost = True
+                        was_sold, was_lost = this.data_timeline.scan_status(scan[0].scanned_at)
+                        if was_lost:
+                            complete = False
                         else:
                             num_complete += 1
-                            sale = this.sql_session.scalar(
-                                select(ExoBioSale).where(ExoBioSale.commander_id == this.commander.id)
-                                .where(ExoBioSale.sold_at > scan[0].scanned_at))
-                            if sale:
-                                was_sold = True
                 flora_status[flora.id] = (was_sold, was_lost)
         else:
             complete = False
@@ -1614,8 +1407,10 @@ def get_bodies_summary(bodies: dict[str, PlanetData], focused: bool = False) ->
                             detail_text += (f'{genus_name} - ' +
                                             tr.tl('Multiple Possible', this.translation_context) + ':\n') # LANG: Indicator for multiple possible bio variants
                     if show:
-                        waypoint = get_nearest(genus, waypoints) if (this.waypoints_enabled.get() and focused
+                        waypoint = get_nearest(genus) if (this.waypoints_enabled.get() and focused
                                                                      and not this.current_scan[0] and waypoints) else ''
+                        if waypoint:
+                            this.details_waypoints = True
                         codex = not check_codex(this.commander.id, this.system.region, genus, species, color)
                         codex_galaxy = not check_codex(this.commander.id, None, genus, species, color)
                         codex_symbol = '\N{MILKY WAY} ' if codex_galaxy else '\N{MEMO} ' if codex else ''
@@ -1782,49 +1577,76 @@ def get_bodies_summary(bodies: dict[str, PlanetData], focused: bool = False) ->
 
 
 def get_unsold_data() -> int:
-    last_death: Death = this.sql_session.scalar(select(Death).where(Death.commander_id == this.commander.id).order_by(desc(Death.died_at)))
-    last_resurrect: Resurrection = this.sql_session.scalar(select(Resurrection).where(Resurrection.commander_id == this.commander.id)
-                                             .where(Resurrection.type.in_(['escape', 'recover', 'rejoin'])).order_by(desc(Resurrection.resurrected_at)))
-    last_sold = this.sql_session.scalar(select(ExoBioSale).where(ExoBioSale.commander_id == this.commander.id).order_by(desc(ExoBioSale.sold_at)))
+    """
+    Get the value of all completed scans which haven't been sold or lost. The value is kept as a running total,
+    and only recalculated from the database after it has been invalidated.
 
-    last_data_loss: datetime = datetime.min
-    last_sold_time: datetime = datetime.min
-    if last_death or last_resurrect:
-        last_death_time: datetime = last_death.died_at if last_death else None
-        last_resurrect_time: datetime = last_resurrect.resurrected_at if last_resurrect else None
-        last_data_loss = last_death_time if last_death_time else last_resurrect_time
+    :return: The unsold data value
+    """
 
-    if last_sold:
-        last_sold_time = last_sold.sold_at
+    if this.unsold_value is None:
+        this.unsold_value = calc_unsold_data()
+    return this.unsold_value
 
-    data_cutoff_time = last_data_loss if last_data_loss > last_sold_time else last_sold_time
 
-    recent_scans = []
-    if data_cutoff_time:
-        recent_scans: list[FloraScans] = this.sql_session.scalars(select(FloraScans).where(FloraScans.commander_id == this.commander.id)
-                                                                  .where(FloraScans.scanned_at > data_cutoff_time).where(FloraScans.count == 3)).all()
+def calc_unsold_data() -> int:
+    """
+    Calculate the unsold data value from all completed scans since the last sale or data loss, in a single query.
+
+    :return: The unsold data value
+    """
+
+    if not this.commander:
+        return 0
+
+    stmt = select(PlanetFlora.genus, PlanetFlora.species, PlanetStatus.was_footfalled, System.population) \
+        .select_from(FloraScans) \
+        .join(PlanetFlora, PlanetFlora.id == FloraScans.flora_id) \
+        .join(Planet, Planet.id == PlanetFlora.planet_id) \
+        .join(System, System.id == Planet.system_id) \
+        .outerjoin(PlanetStatus, (PlanetStatus.planet_id == Planet.id)
+                   & (PlanetStatus.commander_id == this.commander.id)) \
+        .where(FloraScans.commander_id == this.commander.id) \
+        .where(FloraScans.scanned_at > this.data_timeline.last_cutoff()).where(FloraScans.count == 3)
 
     value = 0
-    if len(recent_scans) > 0:
-        for scan in recent_scans:
-            flora: PlanetFlora = this.sql_session.scalar(select(PlanetFlora).where(PlanetFlora.id == scan.flora_id))
-            planet: Planet = this.sql_session.scalar(select(Planet).where(Planet.id == flora.planet_id))
-            planet_status: PlanetStatus = this.sql_session.scalar(select(PlanetStatus).where(PlanetStatus.planet_id == planet.id)
-                                                                  .where(PlanetStatus.commander_id == this.commander.id))
-            system: System = this.sql_session.scalar(select(System).where(System.id == planet.system_id))
-
-            base_value = bio_types[flora.genus][flora.species]['value']
-            if planet_status.was_footfalled is False:
-                if system.population > 0:
-                    value += base_value
-                else:
-                    value += base_value * 5
-            else:
-                value += base_value
+    for genus, species, was_footfalled, population in this.sql_session.execute(stmt):
+        base_value = bio_types[genus][species]['value']
+        if was_footfalled is False and not population > 0:
+            value += base_value * 5
+        else:
+            value += base_value
 
     return value
 
 
+def add_unsold_scan(body_name: str, genus: str, species: str) -> None:
+    """
+    Add a newly analysed species to the running unsold data value. Must be run before the scan is saved, so
+    species which were already counted can be skipped.
+
+    :param body_name: The short name of the planet
+    :param genus: The genus code
+    :param species: The species code
+    """
+
+    if this.unsold_value is None or genus not in bio_types or species not in bio_types[genus]:
+        return
+
+    body = this.planets[body_name]
+    flora = body.get_flora(genus, species)
+    if flora:
+        scans: list[FloraScans] = [scan for scan in flora[0].scans if scan.commander_id == this.commander.id]
+        if scans and scans[0].count == 3 and scans[0].scanned_at \
+                and scans[0].scanned_at > this.data_timeline.last_cutoff():
+            return
+
+    value = bio_types[genus][species]['value']
+    if body.was_footfalled(this.commander.id) is False and not this.system.population > 0:
+        value *= 5
+    this.unsold_value += value
+
+
 def render_radar(message_id: str) -> None:
     """
     Render overlay radar display for waypoints.
@@ -1856,52 +1678,39 @@ def render_radar(message_id: str) -> None:
                 if get_distance() >= bio_genus[this.current_scan[0]]['distance']:
                     color = '#83fe99'
                 radar_circles.append({'radius': distance_radius, 'color': color})
-        radar_markers: list[dict] = []
-        for flora in this.planets[this.location_name].get_flora():
-            scans: list[Waypoint] = list(
-                filter(
-                    lambda item: item.commander_id == this.commander.id and item.type == 'scan',
-                    flora.waypoints
-                )
-            )
+        # Marker positions are collected first, so distances and bearings are computed in one batch
+        marker_points: list[tuple[float, float]] = []
+        marker_styles: list[tuple[str, str]] = []
+        index = get_waypoint_index()
+        floras = this.planets[this.location_name].get_flora()
+        genera = list(dict.fromkeys(flora.genus for flora in floras)) if index else []
+        for genus in genera:
+            label = translate_genus(bio_genus[genus]['name'] if genus in bio_genus else 'Unknown')[0:3]
+            scans = index.scan_sites(genus)
             color = '#83fef6'
-            if this.current_scan[0] and this.current_scan[0] == flora.genus:
+            if this.current_scan[0] and this.current_scan[0] == genus:
                 color = '#fe9900'
-            for scan in scans:
-                distance = calc_distance((scan.latitude, scan.longitude))
-                bearing = calc_bearing((scan.latitude, scan.longitude))
-                bearing = bearing - 90 - this.planet_heading
-                radar_markers.append({'text': translate_genus(bio_genus[flora.genus]['name'] if flora.genus in bio_genus else 'Unknown')[0:3],
-                                        'distance': distance, 'bearing': bearing, 'color': color})
-            waypoints: list[Waypoint] = list(
-                filter(
-                    lambda item: item.commander_id == this.commander.id and item.type == 'tag',
-                    flora.waypoints
-                )
-            )
+            marker_points.extend(scans)
+            marker_styles.extend([(label, color)] * len(scans))
+            # Tags within the clonal distance of an existing sample are already excluded by the index
+            tags = index.open_tags(genus)
             color = '#ffffff'
-            if this.current_scan[0] == flora.genus:
+            if this.current_scan[0] == genus:
                 color = '#83fe99'
             elif this.current_scan[0]:
                 color = '#888888'
-            for waypoint in waypoints:
-                skip = False
-                for scan in scans:
-                    if calc_distance((waypoint.latitude, waypoint.longitude), (scan.latitude, scan.longitude)) < bio_genus[flora.genus]['distance']:
-                        skip = True
-                        continue
-                if skip:
-                    continue
-                distance = calc_distance((waypoint.latitude, waypoint.longitude))
-                bearing = calc_bearing((waypoint.latitude, waypoint.longitude))
-                bearing = bearing - 90 - this.planet_heading
-                radar_markers.append({'text': translate_genus(bio_genus[flora.genus]['name'] if flora.genus in bio_genus else 'Unknown')[0:3],
-                                        'distance': distance, 'bearing': bearing, 'color': color})
-            if this.ship_location and this.radar_ship_loc_enabled.get():
-                distance = calc_distance(this.ship_location)
-                bearing = calc_bearing(this.ship_location)
-                bearing = bearing - 90 - this.planet_heading
-                radar_markers.append({'text': 'Ship', 'distance': distance, 'bearing': bearing, 'color': '#3bfff2'})
+            marker_points.extend(tags)
+            marker_styles.extend([(label, color)] * len(tags))
+        if floras and this.ship_location and this.radar_ship_loc_enabled.get():
+            marker_points.append(this.ship_location)
+            marker_styles.append(('Ship', '#3bfff2'))
+
+        distances, bearings = geodesy.distances_and_bearings((this.planet_latitude, this.planet_longitude),
+                                                             marker_points, this.planet_radius)
+        radar_markers: list[dict] = [
+            {'text': text, 'distance': distance, 'bearing': bearing - 90 - this.planet_heading, 'color': color}
+            for (text, color), distance, bearing in zip(marker_styles, distances, bearings)
+        ]
 
         if radar_markers:
             north_bearing = 0 - 90 - this.planet_heading
@@ -1912,8 +1721,139 @@ def render_radar(message_id: str) -> None:
             this.overlay.clear_radar(message_id)
 
 
-def update_display() -> None:
-    """ Primary display update function. This is run whenever something could change the display state. """
+def get_location_header(body: PlanetData) -> str:
+    """
+    Get the heading line of the current body display, with the number of completed species.
+
+    :param body: The current planet
+    :return: The heading display text
+    """
+
+    complete = 0
+    for flora in body.get_flora():
+        for scan in filter(lambda item: item.commander_id == this.commander.id,
+                           flora.scans):  # type: FloraScans
+            if scan.count == 3:
+                complete += 1
+    return '{} - {} [{}G] - {}/{} {}'.format(
+        body.get_name(),
+        translate_body(body.get_type()),
+        locale.format_string('%.2f', body.get_gravity() / 9.797759, True, False).rstrip('0').rstrip('.'),
+        # LANG: Bio scans completed indicator label
+        complete, len(body.get_flora()), tr.tl('Analysed', this.translation_context)
+    )
+
+
+def get_scan_progress(body: PlanetData) -> str:
+    """
+    Get the in-progress scan line of the current body display, with the distance from the previous samples and the
+    nearest saved waypoint. This is the only part of the display that depends on the player's position.
+
+    :param body: The current planet
+    :return: The in-progress display text, or an empty string if no scan is in progress
+    """
+
+    for flora in body.get_flora():
+        genus: str = flora.genus
+        species: str = flora.species
+        scan_list: list[FloraScans] = list(
+            filter(lambda item: item.commander_id == this.commander.id, flora.scans))
+        scan: int = scan_list[0].count if scan_list else 0
+        if 0 < scan < 3:
+            waypoints: list[Waypoint] = list(
+                filter(
+                    lambda item: item.commander_id == this.commander.id and item.type == 'tag',
+                    flora.waypoints
+                )
+            )
+            if not this.current_scan[0]:
+                this.current_scan = (genus, '')
+            distance = get_distance()
+            distance_format = locale.format_string('%.2f', distance) if distance is not None else 'unk'
+            distance = distance if distance is not None else 0
+            waypoint = get_nearest(genus) if (waypoints and this.waypoints_enabled.get()) else ''
+            genus_distance = bio_genus[genus]['distance'] if genus in bio_genus else 100
+            return '\n{}: {} - {} ({}/3) [{}]{}'.format(
+                tr.tl('In Progress', this.translation_context),  # LANG: Scan in progress indicator
+                translate_genus(bio_types[genus][species]['name'] if genus in bio_types else 'Unknown'),
+                scan_label(scan),
+                scan,
+                '{}/{}{}'.format(
+                    distance_format
+                    if distance < genus_distance
+                    else f'> {genus_distance}',
+                    genus_distance,
+                    tr.tl('m', this.translation_context)
+                ),
+                '\n' + tr.tl('Nearest Saved Waypoint', this.translation_context) + f': {waypoint}' if waypoint else ''
+            )
+    return ''
+
+
+def location_has_waypoints() -> bool:
+    """
+    Check whether the current body has any waypoints for the commander.
+
+    :return: True if there are waypoints for the current body
+    """
+
+    index = get_waypoint_index()
+    return index is not None and index.has_waypoints()
+
+
+def update_position() -> None:
+    """
+    Refresh only the parts of the display that depend on the player's position: the in-progress scan distance, the
+    nearest waypoint, and the radar. Used for Status.json updates when nothing else has changed. Skipped when a full
+    render is already scheduled. Falls back to a full render while the details list the nearest waypoint of each genus.
+    """
+
+    if this.details_waypoints:
+        update_display()
+        return
+    if not this.started or this.display_pending is not None or not this.location_text \
+            or this.location_name not in this.planets:
+        return
+
+    text = this.location_header + get_scan_progress(this.planets[this.location_name])
+    if text != this.location_text:
+        this.location_text = text
+        if not this.display_hidden:
+            this.label['text'] = this.display_prefix + text
+        if this.summary_on_overlay:
+            this.overlay.display('bioscan_summary', text,
+                                 x=this.overlay_summary_x.get(), y=this.overlay_summary_y.get(),
+                                 size='large', color=this.overlay_color.get())
+    if this.summary_on_overlay and this.radar_enabled.get() and this.planet_longitude:
+        render_radar('bioscan_radar')
+
+
+def update_display(immediate: bool = False) -> None:
+    """
+    Request a display update. This is run whenever something could change the display state.
+    Requests are coalesced into a single render, scheduled on the Tk event loop.
+
+    :param immediate: Render right away, replacing any scheduled render. Used for organic scans.
+    """
+
+    if immediate or not this.frame:
+        if this.display_pending is not None:
+            this.frame.after_cancel(this.display_pending)
+            this.display_pending = None
+        render_display()
+    elif this.display_pending is None:
+        this.display_pending = this.frame.after(bio_scan.const.display_interval, flush_display)
+
+
+def flush_display() -> None:
+    """ Run a scheduled display render """
+
+    this.display_pending = None
+    render_display()
+
+
+def render_display() -> None:
+    """ Primary display render function. Only run through update_display. """
 
     if not this.started:
         return
@@ -1956,6 +1896,7 @@ def update_display() -> None:
         in filter(lambda item: item[1].get_bio_signals() > 0 or len(item[1].get_flora()) > 0, bio_bodies.items())
     ]
 
+    this.details_waypoints = False
     if display_planetary_data(bio_bodies, True):
         detail_text, total_value, bonus_value = get_bodies_summary({this.location_name: this.planets[this.location_name]}, True)
     else:
@@ -1981,58 +1922,8 @@ def update_display() -> None:
                     signal_summary += '\n'
 
         if display_planetary_data(bio_bodies):
-            if text and text[-1] != '\n':
-                text += '\n'
-            complete = 0
-            floras = bio_bodies[this.location_name].get_flora()
-            for flora in floras:
-                for scan in filter(lambda item: item.commander_id == this.commander.id,
-                                   flora.scans):  # type: FloraScans
-                    if scan.count == 3:
-                        complete += 1
-            text += '{} - {} [{}G] - {}/{} {}'.format(
-                bio_bodies[this.location_name].get_name(),
-                translate_body(bio_bodies[this.location_name].get_type()),
-                locale.format_string('%.2f', bio_bodies[this.location_name].get_gravity() / 9.797759, True, False)
-                    .rstrip('0').rstrip('.'),
-                # LANG: Bio scans completed indicator label
-                complete, len(bio_bodies[this.location_name].get_flora()), tr.tl('Analysed', this.translation_context)
-            )
-            for flora in this.planets[this.location_name].get_flora():
-                genus: str = flora.genus
-                species: str = flora.species
-                scan_list: list[FloraScans] = list(
-                    filter(lambda item: item.commander_id == this.commander.id, flora.scans))
-                scan: int = scan_list[0].count if scan_list else 0
-                waypoints: list[Waypoint] = list(
-                    filter(
-                        lambda item: item.commander_id == this.commander.id and item.type == 'tag',
-                        flora.waypoints
-                    )
-                )
-                if 0 < scan < 3:
-                    if not this.current_scan[0]:
-                        this.current_scan = (genus, '')
-                    distance = get_distance()
-                    distance_format = locale.format_string('%.2f', distance) if distance is not None else 'unk'
-                    distance = distance if distance is not None else 0
-                    waypoint = get_nearest(genus, waypoints) if (waypoints and this.waypoints_enabled.get()) else ''
-                    genus_distance = bio_genus[genus]['distance'] if genus in bio_genus else 100
-                    text += '\n{}: {} - {} ({}/3) [{}]{}'.format(
-                        tr.tl('In Progress', this.translation_context),  # LANG: Scan in progress indicator
-                        translate_genus(bio_types[genus][species]['name'] if genus in bio_types else 'Unknown'),
-                        scan_label(scan),
-                        scan,
-                        '{}/{}{}'.format(
-                            distance_format
-                            if distance < genus_distance
-                            else f'> {genus_distance}',
-                            genus_distance,
-                            tr.tl('m', this.translation_context)
-                        ),
-                        '\n' + tr.tl('Nearest Saved Waypoint', this.translation_context) + f': {waypoint}' if waypoint else ''
-                    )
-                    break
+            this.location_header = get_location_header(bio_bodies[this.location_name])
+            text = this.location_header + get_scan_progress(bio_bodies[this.location_name])
         totals = '{} | Bonus: {} | Total: {}'.format(
             this.formatter.format_credits(total_value),
             this.formatter.format_credits(bonus_value),
@@ -2052,8 +1943,11 @@ def update_display() -> None:
         totals = ''
         this.total_label['text'] = f'Unsold: {unsold_data}' if unsold_data else 'No Unsold Data'
 
+    this.display_prefix = title + signal_summary + ('\n' if signal_summary else '')
+    this.location_text = text
+    this.summary_on_overlay = False
     if not this.display_hidden:
-        this.label['text'] = title + signal_summary + ('\n' if signal_summary else '') + text
+        this.label['text'] = this.display_prefix + text
     redraw_overlay = True if this.values_label['text'] != detail_text.strip() else False
     if this.mode_changed:
         redraw_overlay = True
@@ -2075,6 +1969,7 @@ def update_display() -> None:
                 this.overlay.display('bioscan_summary', text,
                                      x=this.overlay_summary_x.get(), y=this.overlay_summary_y.get(),
                                      size='large', color=this.overlay_color.get())
+                this.summary_on_overlay = True
                 if this.radar_enabled.get() and this.planet_longitude and text:
                     render_radar('bioscan_radar')
                 else: